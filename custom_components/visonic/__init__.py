@@ -10,7 +10,7 @@ import serialx
 import voluptuous as vol
 import collections
 from collections import namedtuple
-from .config_flow import validate_ethernet_connection
+from .config_flow import async_validate_ethernet_connection
 from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.core import HomeAssistant, ServiceValidationError, valid_entity_id, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.exceptions import ConfigEntryNotReady
@@ -46,7 +46,9 @@ from .const import (
     ALARM_PANEL_X10,
     ALARM_SENSOR_BYPASS,
     ALARM_SENSOR_IMAGE,
+    ALARM_SENSOR_IMAGE_FRAME,
     ATTR_BYPASS,
+    ATTR_FRAME,
     CONF_PANEL_NUMBER,
     CONF_ALARM_NOTIFICATIONS,
     CONF_RETRY_CONNECTION_COUNT,
@@ -120,6 +122,13 @@ ALARM_SCHEMA_IMAGE = vol.Schema(
     }
 )
 
+ALARM_SCHEMA_IMAGE_FRAME = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Required(ATTR_FRAME, default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    }
+)
+
 update_version_panel_number = 0
 translatedLanguageAlready = False
 
@@ -468,12 +477,23 @@ async def async_setup(hass: HomeAssistant, base_config: dict):
             sendHANotification(f"Service sensor image update - Panel {panel} not found")
         else:
             sendHANotification(f"Service sensor image update failed - Panel not found")
+
+    async def async_service_sensor_image_frame(call):
+        """Handler for sensor image frame service"""
+        _LOGGER.info("Service Panel sensor image frame called")
+        client, panel = getClient(call)
+        if client is not None:
+            await client.async_service_sensor_image_frame(call)
+        elif panel is not None:
+            sendHANotification(f"Service sensor image frame - Panel {panel} not found")
+        else:
+            sendHANotification(f"Service sensor image frame failed - Panel not found")
  
 
     _LOGGER.info("Starting Visonic Component")
     hass.data[VisonicConfigKey] = {}
 
-    # Install the 7 handlers for the HA service calls
+    # Install the 8 handlers for the HA service calls
     hass.services.async_register(
         domain = DOMAIN,
         service = ALARM_PANEL_EVENTLOG,
@@ -519,6 +539,12 @@ async def async_setup(hass: HomeAssistant, base_config: dict):
         async_service_sensor_image,
         schema=ALARM_SCHEMA_IMAGE,
     )
+    hass.services.async_register(
+        DOMAIN,
+        ALARM_SENSOR_IMAGE_FRAME,
+        async_service_sensor_image_frame,
+        schema=ALARM_SCHEMA_IMAGE_FRAME,
+    )
     
     return True
 
@@ -570,7 +596,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: VisonicConfigEntry) -> b
     elif device_type == DEVICE_TYPE_ETHERNET:
         host = entry.data.get(CONF_HOST, "")
         port = entry.data.get(CONF_PORT, "")
-        if validate_ethernet_connection(host, port) is not None: # not None means an error
+        if await async_validate_ethernet_connection(host, port) is not None: # not None means an error
             raise ConfigEntryNotReady("Ethernet connection not ready, cannot continue")
 
     if not translatedLanguageAlready:
@@ -33,6 +33,9 @@ from .pyconst import (
     TEXT_DL_MESSAGE_RETRIES,
     TEXT_PROTOCOL_VERSION,
     TEXT_POWER_MASTER,
+    TEXT_CRC_FAILURES,
+    TEXT_RESENDS,
+    TEXT_RESPONSE_TIMEOUTS,
 )
 from .const import (
     DOMAIN,
@@ -87,7 +90,7 @@ class VisonicAlarm(AlarmControlPanelEntity):
     _unrecorded_attributes = frozenset(
         {TEXT_PANEL_MODEL, TEXT_WATCHDOG_TIMEOUT_TOTAL, TEXT_WATCHDOG_TIMEOUT_DAY, TEXT_DOWNLOAD_TIMEOUT, 
           TEXT_DL_MESSAGE_RETRIES, TEXT_DISCONNECTION_COUNT, TEXT_CLIENT_VERSION,
-          TEXT_PROTOCOL_VERSION, TEXT_POWER_MASTER }
+          TEXT_PROTOCOL_VERSION, TEXT_POWER_MASTER, TEXT_CRC_FAILURES, TEXT_RESENDS, TEXT_RESPONSE_TIMEOUTS }
     )
 
     def __init__(self, hass : HomeAssistant, client : VisonicClient, partition : int = None):
@@ -85,6 +85,7 @@ class VisonicBinarySensor(BinarySensorEntity):
 
         self._visonic_device = sensor
         self.timerTask = None
+        self._attr_cache = None    # The last extra state attributes as (key, attributes)
 
         self._dname = sensor.createFriendlyName()
         pname = client.getMyString()
@@ -197,6 +198,11 @@ class VisonicBinarySensor(BinarySensorEntity):
         """Return the state attributes of the device."""
         # _LOGGER.debug("in extra_state_attributes")
         if self._client is not None and self._visonic_device is not None:
+            # The attributes only change when the sensor does, so reuse them while the sensor change version is the same
+            key = (self._visonic_device.getChangeVersion(), self._client.isPowerMaster(), self._client.getPartitionsInUse() is not None)
+            if key[0] is not None and self._attr_cache is not None and self._attr_cache[0] == key:
+                return self._attr_cache[1]
+
             stype = self._visonic_device.getSensorType()
 
             attr = {}
@@ -269,6 +275,7 @@ class VisonicBinarySensor(BinarySensorEntity):
                     attr["partition"] = list(p)
 
             attr[PANEL_ATTRIBUTE_NAME] = self._panel
+            self._attr_cache = (key, attr)
             return attr
             
         return { }
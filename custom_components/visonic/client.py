@@ -2,13 +2,15 @@
 import asyncio
 import collections
 from collections.abc import Callable
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from enum import IntEnum
 from functools import partial
 import logging
+import os
 import re
 import socket
-import threading
+import tempfile
+import time
 from typing import Any
 
 import aioesphomeapi
@@ -62,6 +64,7 @@ from .const import (
     ALARM_PANEL_LOG_FILE_ENTRY,
     ALARM_SENSOR_CHANGE_EVENT,
     ATTR_BYPASS,
+    ATTR_FRAME,
     CONF_ALARM_NOTIFICATIONS,
     CONF_ARM_CODE_AUTO,
     CONF_ARM_HOME_ENABLED,
@@ -76,6 +79,8 @@ from .const import (
     CONF_ENABLE_REMOTE_DISARM,
     CONF_ENABLE_SENSOR_BYPASS,
     CONF_EPROM_ATTRIBUTES,
+    CONF_EPROM_CACHE,
+    CONF_IMAGE_CACHE,
     CONF_ESPHOME_ENTITY_SELECT,
     CONF_EXCLUDE_SENSOR,
     CONF_EXCLUDE_X10,
@@ -139,11 +144,23 @@ from .pyconst import (
     AlX10Command,
     PanelConfig,
 )
+from .pyenum import ChecksumVariant, Packet, Receive
+from .pyhelper import MyChecksumCalc, openTcpSocket
 from .pyvisonic import VisonicProtocol
 
+# After connecting to an ethernet device, receive and dump any old data it has until the first data or for this many seconds
+TCP_FLUSH_WINDOW = 1.0
+
+# Before connecting to a usb/rs232 device, open the port once and try each of these baud rates in place (the current rate is tried first).
+#    For each rate send a Stop PDU and wait up to BAUD_PROBE_WINDOW seconds for a valid PDU back from the panel (or the loopback of the Stop)
+BAUD_PROBE_RATES = [ 9600, 38400 ]
+BAUD_PROBE_WINDOW = 0.6
+
 CLIENT_VERSION = "0.12.6.0"
 
+# The client log is a ring buffer of (monotonic time, level, message) records, the time is only formatted when the log is read (diagnostics)
 MAX_CLIENT_LOG_ENTRIES = 1000
+CLIENT_LOG_LETTER = { logging.DEBUG : "D", logging.INFO : "I", logging.WARNING : "W" }
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -376,13 +393,16 @@ class VisonicClient:
         self.entry = entry
         # Get the user defined config
         self.config = cf.copy()
-        self.strlog = []
+        self.strlog = collections.deque(maxlen = MAX_CLIENT_LOG_ENTRIES)
+        # Wall clock and monotonic time at the same instant, used to convert the monotonic time of each log record when it is formatted
+        self.strlogEpoch = (datetime.now(timezone.utc), time.monotonic())
         self.panelident = panelident
         self.doingRestart = None
         self.logstate_debug(f"init panel {str(panelident)}  language {str(self.hass.config.language)}")
         self._initialise()
         self.logstate_debug(f"Exclude sensor list = {self.exclude_sensor_list}     Exclude x10 list = {self.exclude_x10_list}")
         self.panel_disconnection_counter = 0
+        self.tcp_connection_stats = { "attempts": 0, "failures": 0, "family": None, "connect time": None, "flush time": None, "flushed bytes": 0 }
         
     # get the current date and time
     def _getTimeFunction(self) -> datetime:
@@ -413,6 +433,7 @@ class VisonicClient:
         # variables for creating the event log for csv and xml
         self.csvdata = None
         self.templatedata = None
+        self.eventLogEnvironment = None         # The jinja Environment for the xml file, created once and kept so the template is cached
 
         self.sensor_task = None
         self.select_task = None
@@ -497,29 +518,37 @@ class VisonicClient:
             return self.TriggerOffDelayList[st]
         return 120
 
+    @staticmethod
+    def _formatLog(msg, args, kwargs) -> str:
+        try:
+            return msg % args % kwargs
+        except (TypeError, ValueError):
+            return str(msg) + " " + str(args)
+
+    def _logstate(self, level : int, msg, args, kwargs):
+        s = self._formatLog(msg, args, kwargs)
+        self.strlog.append((time.monotonic(), level, s))
+        if _LOGGER.isEnabledFor(level):
+            _LOGGER.log(level, (" P" if level == logging.INFO else "P") + str(self.getPanelID()) + "  " + s)
+
     def logstate_debug(self, msg, *args, **kwargs):
-        s = "P" + str(self.getPanelID()) + "  " + (msg % args % kwargs)
-        _LOGGER.debug(s)
-        self.strlog.append(str(datetime.now(timezone.utc).astimezone()) + "  D " + s)
-        while len(self.strlog) > MAX_CLIENT_LOG_ENTRIES:
-            self.strlog.pop(0)
-            
+        self._logstate(logging.DEBUG, msg, args, kwargs)
+
     def logstate_info(self, msg, *args, **kwargs):
-        s = "P" + str(self.getPanelID()) + "  " + (msg % args % kwargs)
-        _LOGGER.info(" " + s)
-        self.strlog.append(str(datetime.now(timezone.utc).astimezone()) + "  I " + s)
-        while len(self.strlog) > MAX_CLIENT_LOG_ENTRIES:
-            self.strlog.pop(0)
+        self._logstate(logging.INFO, msg, args, kwargs)
 
     def logstate_warning(self, msg, *args, **kwargs):
-        s = "P" + str(self.getPanelID()) + "  " + (msg % args % kwargs)
-        _LOGGER.warning(s)
-        self.strlog.append(str(datetime.now(timezone.utc).astimezone()) + "  W " + s)
-        while len(self.strlog) > MAX_CLIENT_LOG_ENTRIES:
-            self.strlog.pop(0)
-
-    def getStrLog(self):
-        return self.strlog
+        self._logstate(logging.WARNING, msg, args, kwargs)
+
+    def getStrLog(self, level : int = logging.NOTSET) -> list:
+        """Format the client log records at or above level, oldest first."""
+        wall, mono = self.strlogEpoch
+        p = "P" + str(self.getPanelID()) + "  "
+        retval = []
+        for t, lvl, s in list(self.strlog):
+            if lvl >= level:
+                retval.append(str((wall + timedelta(seconds = t - mono)).astimezone()) + "  " + CLIENT_LOG_LETTER.get(lvl, "?") + " " + p + s)
+        return retval
 
     def getEntryID(self):
         return self.entry.entry_id if self.entry is not None else ""
@@ -680,7 +709,25 @@ class VisonicClient:
         else:
             self.logstate_warning("Client command processing not defined - is there a panel connection?")
 
-    def _savePanelEventLogFiles(self, available, total):
+    def _writeFileAtomic(self, filename : str, lines):
+        """Write the lines to a uniquely named temporary file in the same directory and then rename it, so the file is never seen half written."""
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(os.path.abspath(filename)), prefix=os.path.basename(filename) + ".", suffix=".tmp", delete=False) as f:
+            tmpname = f.name
+            try:
+                f.writelines(lines)
+                os.chmod(tmpname, 0o644)     # NamedTemporaryFile makes it only readable by the owner
+            except Exception:
+                f.close()
+                os.remove(tmpname)
+                raise
+        try:
+            os.replace(tmpname, filename)
+        except Exception:
+            os.remove(tmpname)
+            raise
+
+    def _savePanelEventLogFiles(self, csvdata : list, templatedata : list, available, total):
+        # This is run in an executor so the event loop is not blocked while the template is rendered and the files are written
         # create a new XML file with the results
         try:
             if len(self.config.get(CONF_LOG_XML_FN, "")) > 0:
@@ -690,28 +737,26 @@ class VisonicClient:
                         str(self.config.get(CONF_LOG_XML_FN)),
                         str(self.hass.config.path()),
                     )
-                    file_loader = FileSystemLoader(
-                        [
-                            self.hass.config.path() + "/templates",
-                            self.hass.config.path() + "/xml",
-                            self.hass.config.path() + "/www",
-                            self.hass.config.path(),
-                        ],
-                        followlinks=True,
-                    )
-                    env = Environment(loader=file_loader)
+                    if self.eventLogEnvironment is None:
+                        file_loader = FileSystemLoader(
+                            [
+                                self.hass.config.path() + "/templates",
+                                self.hass.config.path() + "/xml",
+                                self.hass.config.path() + "/www",
+                                self.hass.config.path(),
+                            ],
+                            followlinks=True,
+                        )
+                        self.eventLogEnvironment = Environment(loader=file_loader)
                     self.logstate_debug("Panel Event Log - Setting up xml - getting the template")
-                    template = env.get_template(TEXT_XML_LOG_FILE_TEMPLATE)
-                    output = template.render(
-                        entries=self.templatedata,
+                    # The Environment caches the template and only loads it again when the file has changed
+                    template = self.eventLogEnvironment.get_template(TEXT_XML_LOG_FILE_TEMPLATE)
+                    self.logstate_debug("Panel Event Log - Writing xml file")
+                    self._writeFileAtomic(self.config.get(CONF_LOG_XML_FN), template.generate(
+                        entries=templatedata,
                         total=total,
                         available=f"{available}",
-                    )
-                    with open(self.config.get(CONF_LOG_XML_FN), "w") as f:
-                        self.logstate_debug("Panel Event Log - Writing xml file")
-                        f.write(output.rstrip())
-                        self.logstate_debug("Panel Event Log - Closing xml file")
-                        f.close()
+                    ))
                 except (IOError, AttributeError, TypeError):
                     self.createNotification(
                         AvailableNotifications.EVENTLOG_PROBLEM,
@@ -725,14 +770,10 @@ class VisonicClient:
                         self.config.get(CONF_LOG_CSV_FN),
                     )
                     if self.toBool(self.config.get(CONF_LOG_CSV_TITLE, False)):
-                        self.logstate_debug("Panel Event Log - Adding header to string")
-                        self.csvdata = "current, total, partition, date, time, zone, event\n" + self.csvdata
-                    self.logstate_debug("Panel Event Log - Opening csv file")
-                    with open(self.config.get(CONF_LOG_CSV_FN), "w") as f:
-                        self.logstate_debug("Panel Event Log - Writing csv file")
-                        f.write(self.csvdata.rstrip())
-                        self.logstate_debug("Panel Event Log - Closing csv file")
-                        f.close()
+                        self.logstate_debug("Panel Event Log - Adding header")
+                        csvdata.insert(0, "current, total, partition, date, time, zone, event")
+                    self.logstate_debug("Panel Event Log - Writing csv file")
+                    self._writeFileAtomic(self.config.get(CONF_LOG_CSV_FN), "\n".join(csvdata))
                 except (IOError, AttributeError, TypeError):
                     self.createNotification(
                         AvailableNotifications.EVENTLOG_PROBLEM,
@@ -745,10 +786,13 @@ class VisonicClient:
                 "Panel Event Log - Failed to Create Valid Event Log Files"
             )
 #                self._exc_info = sys.exc_info()
-        finally:
-            # Ensure that these are set back to None to indicate not collecting data so we can start again
-            self.csvdata = None
-            self.templatedata = None
+
+    async def _async_savePanelEventLogFiles(self, csvdata : list, templatedata : list, available, total):
+        await self.hass.async_add_executor_job(self._savePanelEventLogFiles, csvdata, templatedata, available, total)
+        if self.toBool(self.config.get(CONF_LOG_DONE, False)):
+            self.logstate_debug("Panel Event Log - Firing Completion Event")
+            self._fireHAEvent(event_id = PanelCondition.PANEL_LOG_COMPLETE, datadictionary = {"total": total, "available": available})
+        self.logstate_debug("Panel Event Log - Complete")
 
     def process_panel_event_log(self, entry: AlLogPanelEvent):
         """Process a sequence of panel log events."""
@@ -774,7 +818,7 @@ class VisonicClient:
         # Initialise values
         if entry.current == 1:
             self.templatedata = []
-            self.csvdata = ""
+            self.csvdata = []
             self.logstate_debug(f"Panel Event Log - Processing")
 
         eventStr = "Unknown"
@@ -810,15 +854,11 @@ class VisonicClient:
         
         if self.csvdata is not None and self.templatedata is not None:
             # Accumulating CSV Data
+            #   The entries are always appended, when reverse is set both lists are reversed once at the end
             if piu is not None and len(piu) > 0:
-                csvtemp = (f"{current}, {total}, {entry.partition}, {entry.dateandtime}, {zoneStr}, {eventStr}\n")
+                self.csvdata.append(f"{current}, {total}, {entry.partition}, {entry.dateandtime}, {zoneStr}, {eventStr}")
             else:
-                csvtemp = (f"{current}, {total}, 0, {entry.dateandtime}, {zoneStr}, {eventStr}\n")
-            
-            if reverse:
-                self.csvdata = csvtemp + self.csvdata
-            else:
-                self.csvdata = self.csvdata + csvtemp
+                self.csvdata.append(f"{current}, {total}, 0, {entry.dateandtime}, {zoneStr}, {eventStr}")
 
             # Accumulating Data for the XML generation
             dd = {
@@ -844,16 +884,13 @@ class VisonicClient:
                 )
 
                 if reverse:
+                    self.csvdata.reverse()
                     self.templatedata.reverse()
 
-                x = threading.Thread(target=self._savePanelEventLogFiles, args=(entry.total, total), name=f"VisonicSaveEventLog{self.getPanelID()}",)
-                x.start()
-                x.join()
-
-                if self.toBool(self.config.get(CONF_LOG_DONE, False)):
-                    self.logstate_debug("Panel Event Log - Firing Completion Event")
-                    self._fireHAEvent(event_id = PanelCondition.PANEL_LOG_COMPLETE, datadictionary = {"total": total, "available": entry.total})
-                self.logstate_debug("Panel Event Log - Complete")
+                # Hand the data over to the executor and set these back to None to indicate not collecting data so we can start again
+                self.hass.loop.create_task(self._async_savePanelEventLogFiles(self.csvdata, self.templatedata, entry.total, total))
+                self.csvdata = None
+                self.templatedata = None
 
     # This is not called from anywhere, use it for debug purposes and/or to clear all entities from HA
     def printAllEntities(self, delete_as_well : bool = False):
@@ -1288,7 +1325,7 @@ class VisonicClient:
                 # Close existing connection
                 #    Calling close() means that the callback is not called on "connection_lost"
                 await self._stopCommsTask()
-                self.cvp = await self.async_create_usb_visonic_connection(vp=self.visonicProtocol, path=path, baud=baud)
+                self.cvp = await self.async_create_usb_visonic_connection(vp=self.visonicProtocol, path=path, baud=baud, probe=False)   # The panel has just been told this rate
                 self.logstate_debug(f"Baud rate updated successfully!")
             else:
                 self.logstate_debug(f"Panel baud not changed {retval}")
@@ -1461,7 +1498,9 @@ class VisonicClient:
         return {
             AlConfiguration.DownloadCode: self.config.get(CONF_DOWNLOAD_CODE, ""),
             AlConfiguration.ForceStandard: self.ForceStandardMode,
-            AlConfiguration.DisableAllCommands: self.DisableAllCommands
+            AlConfiguration.DisableAllCommands: self.DisableAllCommands,
+            AlConfiguration.EPROMCacheDir: self.hass.config.path(".storage") if self.toBool(self.config.get(CONF_EPROM_CACHE, False)) else "",
+            AlConfiguration.ImageCacheDir: self.hass.config.path(".storage", f"visonic_images_{self.getPanelID()}") if self.toBool(self.config.get(CONF_IMAGE_CACHE, False)) else "",
             #AlConfiguration.SirenTriggerList: self.config.get(CONF_SIREN_SOUNDING, ["Intruder"])
         }
 
@@ -1826,6 +1865,24 @@ class VisonicClient:
         else:
             self.createNotification(AvailableNotifications.COMMAND_NOT_SENT, f"Visonic Alarm Panel: Panel Commands Disabled")
 
+    def getImageFrameCount(self, ident: int) -> int:
+        """Get the number of images kept from a camera"""
+        if self.visonicProtocol is not None:
+            return self.visonicProtocol.getImageFrameCount(ident)
+        return 0
+
+    async def async_get_image_frame(self, ident: int, index: int) -> bytes | bytearray | None:
+        """Get a kept image from a camera, index 0 is the oldest and -1 is the newest"""
+        if self.visonicProtocol is not None:
+            frame = self.visonicProtocol.getImageFrame(ident, index)
+            if frame is not None:
+                data = frame.data
+                if data is None:
+                    # The image has been moved to the spill directory
+                    data = await self.hass.async_add_executor_job(frame.read)
+                return data
+        return None
+
     async def async_service_sensor_image(self, call):
         """Service call to bypass a sensor in the panel."""
         if await self.check_the_basics(call, "sensor image"):
@@ -1838,6 +1895,18 @@ class VisonicClient:
                 self.createNotification(AvailableNotifications.IMAGE_PROBLEM, f"Attempt to retrieve sensor image for panel {self.getPanelID()}, entity not found")
         # The check_the_basics function sends a failure notification so no need to here
 
+    async def async_service_sensor_image_frame(self, call):
+        """Service call to show a kept image from a camera PIR."""
+        if await self.check_the_basics(call, "sensor image frame"):
+            devid, eid = await self.decode_entity(call, Platform.IMAGE, "show sensor image frame", AvailableNotifications.IMAGE_PROBLEM)
+            if devid is not None and devid >= 1 and devid <= 64:
+                async_dispatcher_send(self.hass, f"{DOMAIN}_{self.getEntryID()}_{IMAGE_DOMAIN}_frame", devid, call.data.get(ATTR_FRAME, 0))
+            elif eid is not None:
+                self.createNotification(AvailableNotifications.IMAGE_PROBLEM, f"Attempt to show sensor image frame for panel {self.getPanelID()}, entity {eid} not found")
+            else:
+                self.createNotification(AvailableNotifications.IMAGE_PROBLEM, f"Attempt to show sensor image frame for panel {self.getPanelID()}, entity not found")
+        # The check_the_basics function sends a failure notification so no need to here
+
     def sendBypass(self, devid: int, bypass: bool, code: str) -> AlCommandStatus:
         """Send the bypass command to the panel."""
         if not self.DisableAllCommands:
@@ -2074,85 +2143,127 @@ class VisonicClient:
     # Create a connection using asyncio using an ip and port
     async def async_create_tcp_visonic_connection(self, vp : VisonicProtocol, address, port):
         """Create Visonic manager class, returns tcp transport coroutine."""
-
-        def createSocketConnection(address, port):
-            """Create the Socket Connection to the Device in the Panel"""
+        stats = self.tcp_connection_stats
+        stats["attempts"] = stats["attempts"] + 1
+        sock = None
+        try:
+            self.logstate_debug(f"Creating TCP Connection to {address}")
+            start = self.hass.loop.time()
+            sock = await openTcpSocket(address, int(port))
+            connected = self.hass.loop.time()
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+            # Flush the buffer, receive any data and dump it
+            flushed = 0
             try:
-                #self.logstate_debug(f"Setting TCP socket Options {address} {port}")
-                self.logstate_debug("Creating TCP Connection, Creating socket and setting socket options")
-
-                # Detect if the address is IPv6 (contains a colon)
-                if ":" in address:
-                    family = socket.AF_INET6
-                    timeout = 5.0         # timout longer as may take longer over v6 or thread networks
-                else:
-                    family = socket.AF_INET
-                    timeout = 1.0
-
-                # Create the socket using the detected family
-                sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
-
-                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-                sock.setblocking(1)   # Set blocking to on, this is the default but just make sure
-
-                # Connection Logic
-                sock.settimeout(timeout) 
-
-                # sock.connect works for both v4 and v6 tuples
-                self.logstate_debug(f"Creating TCP {family.name} Connection to {address}")
-                sock.connect((address, port))
+                async with asyncio.timeout(TCP_FLUSH_WINDOW):
+                    flushed = len(await self.hass.loop.sock_recv(sock, 10000))  # try to receive 10000 bytes
+                self.logstate_debug("Creating TCP Connection, Buffer Flushed and Received some data!")
+            except TimeoutError:  # fail after TCP_FLUSH_WINDOW seconds of no activity
+                pass
+
+            _, protocol = await self.hass.loop.create_connection(
+                lambda: ClientVisonicProtocol(vp=vp, client=self),
+                sock=sock,
+            )
+            stats["family"] = sock.family.name
+            stats["connect time"] = round(connected - start, 3)
+            stats["flush time"] = round(self.hass.loop.time() - connected, 3)
+            stats["flushed bytes"] = flushed
+            self.logstate_debug(f"Creating TCP Connection, {sock.family.name} connected in {stats['connect time']} seconds and flushed {flushed} bytes")
+            sock = None    # The transport has it now
+            return protocol
+        except (OSError, TimeoutError) as ex:
+            # Do not cause a full Home Assistant Exception, keep it local here
+            stats["failures"] = stats["failures"] + 1
+            self.logstate_debug(f"Creating TCP Connection, TCP Connection Error {type(ex).__name__} {ex}")
+        except Exception as ex:
+            # Do not cause a full Home Assistant Exception, keep it local here
+            stats["failures"] = stats["failures"] + 1
+            self.logstate_warning(f"Creating TCP Connection, TCP Connection Exception {ex}")
+        finally:
+            if sock is not None:
+                sock.close()
+        self.logstate_info(f"Creating TCP has a Connection problem, returning not-connected condition")
+            
+        return None
 
-                sock.settimeout(1.0) # Reset to original 1s timeout for flushing
+    def getConnectionStats(self) -> dict:
+        return self.tcp_connection_stats
 
-                #sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
-                #sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-                #sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-                #sock.setblocking(1)  # Set blocking to on, this is the default but just make sure
-                #sock.settimeout(1.0)  # set timeout to 1 second to flush the receive buffer
-                #self.logstate_debug("Creating TCP Connection, Making Connection")
-                #sock.connect((address, port))
+    def getProtocolMetrics(self) -> dict:
+        if self.visonicProtocol is not None:
+            return self.visonicProtocol.getProtocolMetrics()
+        return {}
 
-                # Flush the buffer, receive any data and dump it
-                try:
-                    dummy = sock.recv(10000)  # try to receive 10000 bytes
-                    self.logstate_debug("Creating TCP Connection, Buffer Flushed and Received some data!")
-                except socket.timeout:  # fail after 1 second of no activity
-                    #self.logstate_debug("Buffer Flushed and Didn't receive data! [Timeout]")
-                    pass
-
-                # set the timeout to infinite
-                sock.settimeout(None)
-                # return the socket
-                return sock
-                
-            except socket.error as err:
-                # Do not cause a full Home Assistant Exception, keep it local here
-                self.logstate_debug(f"Setting TCP socket Options Exception {err}")
-                if sock is not None:
-                    sock.close()
+    # Find the baud rate of the panel by opening the port once and changing the rate in place, returns the rate or None when nothing valid was received
+    async def async_probe_usb_baud(self, path, baud) -> int | None:
+
+        checker = MyChecksumCalc()
+        # The message types that the panel sends, not the loopback (the local echo of the Stop sent below) or the ringback of a command
+        panelTypes = frozenset(Receive) - { Receive.DUMMY_MESSAGE, Receive.LOOPBACK_TEST, Receive.PROXY_COMMAND }
+
+        def containsValidPDU(data : bytearray) -> bool:
+            # Look for a complete PDU (header to footer) of a type that the panel sends with an exact or alternative checksum
+            #    The plus and minus one checksum variants are not accepted as they match too much random data at the wrong baud rate
+            start = data.find(Packet.HEADER)
+            while start >= 0:
+                end = data.find(Packet.FOOTER, start + 3)
+                while end >= 0:
+                    if data[start + 1] in panelTypes and checker._checkPDU(data[start:end + 1]) in (ChecksumVariant.EXACT, ChecksumVariant.ALT):
+                        return True
+                    end = data.find(Packet.FOOTER, end + 1)
+                start = data.find(Packet.HEADER, start + 1)
+            return False
 
-            return None
+        stop = bytearray([Packet.HEADER, 0x0B, checker._crcFromSum(0x0B), Packet.FOOTER])   # Send.STOP as a complete PDU
+        rates = [baud] + [b for b in BAUD_PROBE_RATES if b != baud]
 
+        port = None
         try:
-            sock = createSocketConnection(address, int(port))
-            if sock is not None:
-                _, protocol = await self.hass.loop.create_connection(
-                    lambda: ClientVisonicProtocol(vp=vp, client=self),
-                    sock=sock,
-                )
-                return protocol
+            port = serialx.async_serial_for_url(url=path, baudrate=rates[0])
+            await port.open()
+            for rate in rates:
+                if rate != port.baudrate:
+                    await port.reconfigure_port(baudrate=rate)
+                data = bytearray()
+                start = self.hass.loop.time()
+                await port.write(stop)
+                try:
+                    async with asyncio.timeout(BAUD_PROBE_WINDOW):
+                        while not containsValidPDU(data):
+                            if not (chunk := await port.read(64)):
+                                raise serialx.common.SerialException("Port closed")
+                            data.extend(chunk)
+                except TimeoutError:
+                    self.logstate_debug(f"    Baud probe {rate} nothing valid in {BAUD_PROBE_WINDOW} seconds, received {len(data)} bytes")
+                    continue
+                self.logstate_debug(f"    Baud probe {rate} received a valid PDU in {self.hass.loop.time() - start:.3f} seconds")
+                return rate
+        except (aioesphomeapi.core.APIConnectionError, serialx.common.SerialException, OSError) as ex:
+            self.logstate_debug(f"    Baud probe failed, connection error {ex}")
         except Exception as ex:
-            # Do not cause a full Home Assistant Exception, keep it local here
-            self.logstate_warning(f"Creating TCP Connection, TCP Connection Exception {ex}")
-        self.logstate_info(f"Creating TCP has a Connection problem, returning not-connected condition")
-            
+            # Do not cause a full Home Assistant Exception, keep it local here and connect at the configured baud
+            self.logstate_warning(f"Baud probe, USB Connection Exception {ex}")
+        finally:
+            if port is not None:
+                try:
+                    await port.close()
+                except Exception as ex:
+                    self.logstate_debug(f"    Baud probe, failed to close the port {ex}")
         return None
 
     # Create a connection using asyncio through a linux port (usb or rs232)
-    async def async_create_usb_visonic_connection(self, vp : VisonicProtocol, path, baud):
+    async def async_create_usb_visonic_connection(self, vp : VisonicProtocol, path, baud, probe : bool = True):
         """Create Visonic manager class, returns rs232 transport coroutine."""
 
+        if probe and (detected := await self.async_probe_usb_baud(path, baud)) is not None:
+            if detected != baud:
+                self.logstate_debug(f"Baud probe found the panel at {detected} not {baud}")
+            baud = detected
+            self._serial_baud_rate = detected
+
         # setup serial connection
         # use default protocol if not specified
         protocol = partial(
@@ -4,7 +4,6 @@ from typing import Any
 from copy import deepcopy
 import logging
 import voluptuous as vol
-import socket
 
 from .const import (
     CONF_DEVICE_BAUD,
@@ -45,6 +44,7 @@ from homeassistant.const import CONF_DEVICE, CONF_HOST, CONF_PATH, CONF_PORT
 from homeassistant.core import callback
 
 from .create_schema import VisonicSchema
+from .pyhelper import openTcpSocket
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -58,26 +58,18 @@ TRANSLATE_ERROR_UNKNOWN = "unknown"
 TRANSLATE_ERROR_CONNECTION_TIMEOUT = "cannot_connect_timeout"
 TRANSLATE_ERROR_CONNECTION_REFUSED = "cannot_connect_refused"
 
-def validate_ethernet_connection(host: str, port: int) -> str:
+async def async_validate_ethernet_connection(host: str, port: int) -> str | None:
     """Attempt to open a socket to the ethernet/thread device. Returns error key or None."""
+    _LOGGER.debug(f"Validate_ethernet_connection, host {host}   port {port}")
     try:
-        # Detect family
-        family = socket.AF_INET6 if ":" in host else socket.AF_INET
-
-        _LOGGER.debug(f"Validate_ethernet_connection, family {family.name}   host {host}   port {port}")
-        
         # We use a short 3s timeout for the UI check to keep it snappy
-        sock = socket.socket(family, socket.SOCK_STREAM)
-        sock.settimeout(3.0)
-        
-        # Attempt the connection
-        sock.connect((host, int(port)))
+        sock = await openTcpSocket(host, int(port), timeout = 3.0)
         sock.close()
         return None  # Success!
-        
-    except socket.timeout:
+
+    except TimeoutError:
         return TRANSLATE_ERROR_CONNECTION_TIMEOUT
-    except socket.error:
+    except (OSError, ValueError):
         return TRANSLATE_ERROR_CONNECTION_REFUSED
     return TRANSLATE_ERROR_UNKNOWN
 
@@ -313,7 +305,7 @@ class VisonicConfigFlow(ConfigFlow, MyHandlers, domain=DOMAIN):
             if not errors:
                 host = user_input.get(CONF_HOST, "")
                 port = user_input.get(CONF_PORT, "0")
-                error_key = validate_ethernet_connection(host, int(port))
+                error_key = await async_validate_ethernet_connection(host, int(port))
                 
                 if error_key is None:
                     self.config.update(user_input)
@@ -414,7 +406,7 @@ class VisonicConfigFlow(ConfigFlow, MyHandlers, domain=DOMAIN):
         if user_input is not None:
             _LOGGER.debug(f"[async_step_zeroconf_confirm] Start")
             # This check should always pass because the device has sent us its IP address
-            if validate_ethernet_connection(self.config[CONF_HOST], int(self.config[CONF_PORT])) is not None:
+            if await async_validate_ethernet_connection(self.config[CONF_HOST], int(self.config[CONF_PORT])) is not None:
                 _LOGGER.debug(f"[async_step_zeroconf_confirm] Aborting - TRANSLATE_ERROR_CONNECTION_REFUSED")
                 return self.async_abort(reason=TRANSLATE_ERROR_CONNECTION_REFUSED)
 
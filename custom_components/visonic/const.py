@@ -38,6 +38,7 @@ ALARM_PANEL_RECONNECT = "alarm_panel_reconnect"
 ALARM_PANEL_ZONEINFO = "alarm_panel_zoneinfo"
 ALARM_SENSOR_BYPASS = "alarm_sensor_bypass"
 ALARM_SENSOR_IMAGE = "alarm_sensor_image"
+ALARM_SENSOR_IMAGE_FRAME = "alarm_sensor_image_frame"
 
 PANEL_ATTRIBUTE_NAME = "panel"
 DEVICE_ATTRIBUTE_NAME = "visonic_device"
@@ -73,6 +74,9 @@ TEXT_XML_LOG_FILE_TEMPLATE = "visonic_template.xml"
 # Supplement the HA attributes with a bypass, this is for individual sensors in the service call. It is used as a boolean.
 ATTR_BYPASS = "bypass"
 
+# The kept camera image to show in the image entity, 0 is the newest image and follows new images, 1 is the oldest. It is used as an integer.
+ATTR_FRAME = "frame"
+
 # used in the string translation for autoconf
 CONF_NAME = "name"
 
@@ -108,6 +112,8 @@ CONF_SIREN_SOUNDING = "siren_sounding"
 CONF_RETRY_CONNECTION_COUNT = "retry_connection_count"
 CONF_RETRY_CONNECTION_DELAY = "retry_connection_delay"
 CONF_EPROM_ATTRIBUTES = "show_eeprom_attributes"        # leave as eeprom as this will change the config params in HA
+CONF_EPROM_CACHE = "eprom_cache"                        # save the downloaded EPROM (without the codes) in .storage
+CONF_IMAGE_CACHE = "image_cache"                        # move older camera images to .storage when they do not fit in memory
 
 PIN_REGEX = "^[0-9]{4}$"
 
@@ -39,6 +39,8 @@ from .const import (
     CONF_INSTANT_ARM_AWAY,
     CONF_INSTANT_ARM_HOME,
     CONF_EPROM_ATTRIBUTES,
+    CONF_EPROM_CACHE,
+    CONF_IMAGE_CACHE,
     CONF_DEVICE_BAUD,
     CONF_PANEL_NUMBER,
     CONF_ESPHOME_ENTITY_SELECT,
@@ -191,6 +193,14 @@ class VisonicSchema:
                 CONF_EPROM_ATTRIBUTES,
                 default=self.create_default(options, CONF_EPROM_ATTRIBUTES, False),
             ): bool,
+            vol.Optional(
+                CONF_EPROM_CACHE,
+                default=self.create_default(options, CONF_EPROM_CACHE, False),
+            ): bool,
+            vol.Optional(
+                CONF_IMAGE_CACHE,
+                default=self.create_default(options, CONF_IMAGE_CACHE, False),
+            ): bool,
         }
 
     def create_parameters10(self, options: dict):
@@ -232,6 +242,14 @@ class VisonicSchema:
                     CONF_EPROM_ATTRIBUTES,
                     default=self.create_default(options, CONF_EPROM_ATTRIBUTES, False),
                 ): bool,
+                vol.Optional(
+                    CONF_EPROM_CACHE,
+                    default=self.create_default(options, CONF_EPROM_CACHE, False),
+                ): bool,
+                vol.Optional(
+                    CONF_IMAGE_CACHE,
+                    default=self.create_default(options, CONF_IMAGE_CACHE, False),
+                ): bool,
             }
         retval.update({
             vol.Optional(
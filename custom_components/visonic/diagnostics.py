@@ -44,6 +44,8 @@ async def async_get_config_entry_diagnostics(
             "visonic": visonic,
             "sensor": client.dumpSensorsToStringList(),
             "switch": client.dumpSwitchesToStringList(),
+            "tcp connection": client.getConnectionStats(),
+            "protocol metrics": client.getProtocolMetrics(),
             "clientlog": client.getStrLog(),
         }
     else:
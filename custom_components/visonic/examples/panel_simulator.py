@@ -0,0 +1,727 @@
+""" Simulate one or more Visonic PowerMax or PowerMaster Alarm Panels so the integration can be tested without the hardware """
+########################################################
+# Panel Simulator for the Visonic Protocol Handler
+########################################################
+
+#  Simulate a PowerMax Pro Part on TCP port 30000, connect the integration (or simple_example.py) to this host and port:
+#      python panel_simulator.py -tcp 30000
+#  Simulate 50 PowerMaster 30 panels on TCP ports 30000 to 30049, each sending a burst of 20 B0 messages every second:
+#      python panel_simulator.py -tcp 30000 -panels 50 -paneltype 8 -b0 1 -burst 20
+#  Simulate a panel on a pseudo-terminal (Linux and macOS), the terminal name is printed so it can be used as the serial port:
+#      python panel_simulator.py -pty
+#  Use the EPROM cache file saved by the integration (or a raw 64KiB EPROM image) and corrupt the checksum of 1% of the messages:
+#      python panel_simulator.py -tcp 30000 -image visonic_eprom_123456.bin -crc 0.01 -delay 20 -jitter 30
+#
+#  The simulator is the panel side of the protocol, it answers:
+#      24 (download, panel details)   0x3C panel information, enters download mode when the download code is correct (after -retry 0x25 download retry messages)
+#                                     otherwise it is followed by 0x08 access denied
+#      3E (download a block)          0x3F with the EPROM data from the image (0x08 when not in download mode)
+#      0B 0F (stop and exit)          leaves download mode
+#      09 (bump)                      0x3C panel information
+#      5A (settings)                  0x33 with 8 bytes of EPROM data from the image
+#      A1 (arm and disarm)            changes the panel state when the user code is correct and sends A5 04 and A7, otherwise 0x08 access denied
+#      A2 (status)                    an A5 message for each status requested
+#      A3 A6 (zone names and types)   A3 and A6 messages from the zone settings in the image
+#      AB 01 (get time)               AB 01 with the time of this computer
+#      AB 0A (enrol and init)         enrols the panel when the download code is correct, the panel then sends an AB 03 keep-alive every -ab seconds
+#      B0 17 (data request)           B0 24 panel state and B0 22 system capabilities when they are requested, other B0 data is not sent
+#  and sends an acknowledge for everything else. Most of the B0 data requests from the integration are acknowledged but not answered,
+#  so for a PowerMaster the integration gets the panel settings by downloading the EPROM.
+#  Once the integration is connected the panel also sends A5 zone status every -a5 seconds, A7 panel events every -a7 seconds and,
+#  for a PowerMaster, a burst of -burst B0 zone open/close messages every -b0 seconds. A rate of 0 turns it off.
+#
+#  The panel state (enrolled, download mode, armed state, open zones) is kept when the integration disconnects, like a real panel,
+#  so the time to reconnect to a panel that is already enrolled can be measured.
+
+# set the parent directory on the import path
+import os,sys,inspect
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.insert(1000000,parentdir)
+
+import asyncio
+import logging
+import argparse
+import random
+import time
+from datetime import datetime
+
+try:
+    import tty
+except ImportError:
+    tty = None     # Not available on Windows, only TCP can be used
+
+from pyconst import AlSensorType
+from pyenum import CFG, EPROM, EVENT_TYPE, RAW, IndexName, Packet, ChecksumVariant
+from pyhelper import MyChecksumCalc
+from pyeprom import pmDecodePanelSettings, MAX_DOWNLOAD_BLOCK_SIZE, EPROM_SIZE, EPROM_SERIAL_ADDR, EPROM_SERIAL_SIZE, EPROM_CACHE_MAGIC, EPROM_CACHE_HEADER_SIZE
+from pyvisonic import pmSendMsg, pmPanelConfig, pmPanelType, pmZoneMax, pmZoneMaster, pmZoneTypeKey, PACKET_MAX_SIZE
+
+DOWNLOAD_IDLE_TIMEOUT = 20     # The panel leaves download mode and sends a 0x06 timeout when it has not received anything for this number of seconds
+FIRST_KEEPALIVE_DELAY = 2      # The number of seconds after a successful enrol before the panel sends its first AB 03 keep-alive
+A5_ZONES = 32                  # The A5 zone bitmaps are for zones 1 to 32
+
+log = logging.getLogger("simulator")
+
+# The length of each command PDU from the integration, from the first byte of the command data.
+#    Commands that share the first byte are the same length. An acknowledge is either 02 or 02 43 and the length of a B0 command is in its 4th data byte so they are not in here.
+hostCommandLength = {}
+for command in pmSendMsg.values():
+    if command.data[0] not in (0x02, 0xB0):
+        hostCommandLength.setdefault(command.data[0], len(command.data) + 3)
+
+# The A7 event sent when the panel state is changed by an A1 command
+armEvent = {
+    0x00 : EVENT_TYPE.DISARM,
+    0x04 : EVENT_TYPE.ARMED_HOME,
+    0x05 : EVENT_TYPE.ARMED_AWAY,
+    0x14 : EVENT_TYPE.ARMED_HOME,
+    0x15 : EVENT_TYPE.ARMED_AWAY,
+}
+
+def poff(setting) -> int:
+    """ The byte address of the setting in the EPROM image """
+    return pmDecodePanelSettings[setting].poff
+
+def sensorType(table : dict, func : AlSensorType) -> int:
+    """ The first device type in the table for this type of sensor """
+    return next(k for k, v in table.items() if v.func == func)
+
+def blankImage(paneltype : int, zones : int, pin : bytes, serial : bytes) -> bytearray:
+    """ Create an EPROM image with just enough in it for the integration to accept the download and create the sensors """
+    image = bytearray(EPROM_SIZE)
+    image[poff(EPROM.PANEL_TYPE_CODE)] = paneltype
+    image[EPROM_SERIAL_ADDR:EPROM_SERIAL_ADDR + EPROM_SERIAL_SIZE] = serial
+    for setting in (EPROM.USERCODE_MAX, EPROM.USERCODE_MAS):
+        image[poff(setting):poff(setting) + 2] = pin
+    powermaster = pmPanelConfig[CFG.POWERMASTER][paneltype]
+    for z in range(zones):
+        # Alternate between door/window magnets and motion sensors
+        magnet = z % 2 == 0
+        zonetype = pmZoneTypeKey.index("perimeter" if magnet else "interior")
+        if powermaster:
+            image[poff(EPROM.ZONEDATA_MAS) + z] = zonetype
+            image[poff(EPROM.ZONENAME_MAS) + z] = z % 21
+            ext = poff(EPROM.ZONEEXT_MAS) + 10 * z
+            devicetype = sensorType(pmZoneMaster, AlSensorType.MAGNET if magnet else AlSensorType.MOTION)
+            image[ext + 4:ext + 9] = bytes([0x01, devicetype, 0x00, 0x00, z + 1])    # bytes 4 to 8 are the sensor id, byte 5 is the device type
+        else:
+            devicetype = sensorType(pmZoneMax, AlSensorType.MAGNET if magnet else AlSensorType.MOTION)
+            zd = poff(EPROM.ZONEDATA_MAX) + 4 * z
+            image[zd:zd + 4] = bytes([z + 1, 0x10, devicetype, zonetype])             # bytes 0 to 2 are the sensor id, byte 2 is the device type and byte 3 the zone type
+            image[poff(EPROM.ZONENAME_MAX) + z] = z % 21
+    return image
+
+def loadImage(path : str) -> tuple:
+    """ Load an EPROM cache file saved by the integration or a raw EPROM image, return the image, the panel type and the model type """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw[:len(EPROM_CACHE_MAGIC)] == EPROM_CACHE_MAGIC and len(raw) >= EPROM_CACHE_HEADER_SIZE + EPROM_SIZE:
+        # header: magic (4) version (1) panel type (1) model type (1) ...   followed by the image
+        return bytearray(raw[EPROM_CACHE_HEADER_SIZE:EPROM_CACHE_HEADER_SIZE + EPROM_SIZE]), raw[5], raw[6]
+    if len(raw) >= EPROM_SIZE:
+        image = bytearray(raw[:EPROM_SIZE])
+        paneltype = image[poff(EPROM.PANEL_TYPE_CODE)]
+        return image, paneltype if paneltype in pmPanelType else None, None
+    raise ValueError(f"{path} is not an EPROM cache file or a {EPROM_SIZE} byte EPROM image")
+
+
+class SimulatorStats:
+    """ Counters for all of the simulated panels, reported every -stats seconds """
+
+    def __init__(self):
+        self.connections = 0           # connections made by the integration
+        self.connected = 0             # currently connected
+        self.bytesIn = 0
+        self.bytesOut = 0
+        self.messagesIn = 0
+        self.messagesOut = 0
+        self.crcInjected = 0           # messages sent with a corrupted checksum
+        self.crcFailed = 0             # messages received with an invalid checksum
+        self.denied = 0                # access denied sent
+        self.downloads = []            # the seconds from the start of each completed EPROM download to the exit
+        self.powerlink = []            # the seconds from each connection to the integration answering the first AB 03 keep-alive
+        self.started = time.monotonic()
+        self._last = (self.started, 0, 0, 0, 0)
+
+    def report(self, panels : int) -> str:
+        now = time.monotonic()
+        t, bi, bo, mi, mo = self._last
+        interval = max(now - t, 0.001)
+        self._last = (now, self.bytesIn, self.bytesOut, self.messagesIn, self.messagesOut)
+
+        def average(values : list) -> str:
+            return f"{sum(values) / len(values):.1f}s (max {max(values):.1f}s)" if len(values) > 0 else "-"
+
+        return (f"{now - self.started:7.0f}s  connected {self.connected}/{panels} ({self.connections} connections)"
+                f"   in {(self.messagesIn - mi) / interval:.0f} msg/s {(self.bytesIn - bi) / interval:.0f} B/s"
+                f"   out {(self.messagesOut - mo) / interval:.0f} msg/s {(self.bytesOut - bo) / interval:.0f} B/s"
+                f"   crc injected {self.crcInjected} failed {self.crcFailed}   denied {self.denied}"
+                f"   downloads {len(self.downloads)} {average(self.downloads)}   powerlink {len(self.powerlink)} {average(self.powerlink)}")
+
+
+class SimulatedPanel(MyChecksumCalc):
+    """ The panel side of the protocol for one simulated panel """
+
+    def __init__(self, name : str, options, stats : SimulatorStats, image : bytearray, paneltype : int, model : int, seed : int):
+        super().__init__()
+        self.name = name
+        self.options = options
+        self.stats = stats
+        self.image = image
+        self.paneltype = paneltype
+        self.model = model
+        self.rnd = random.Random(seed)
+        self.powermaster = pmPanelConfig[CFG.POWERMASTER][paneltype]
+        code = options.code if len(options.code) > 0 else pmPanelConfig[CFG.DLCODE_1][paneltype]
+        self.code = bytes.fromhex(code)
+        self.pin = bytes(image[poff(EPROM.USERCODE_MAS if self.powermaster else EPROM.USERCODE_MAX):][:2])
+
+        # The zone settings from the image, decoded the same way as the integration
+        zoneCnt = min(pmPanelConfig[CFG.WIRELESS][paneltype] + pmPanelConfig[CFG.WIRED][paneltype], 64)
+        self.zoneNames = bytearray(zoneCnt)
+        self.zoneTypes = bytearray(zoneCnt)
+        self.enrolled = set()
+        for z in range(zoneCnt):
+            if self.powermaster:
+                ext = image[poff(EPROM.ZONEEXT_MAS) + 10 * z:][:10]
+                if ext[4:9] != bytes(5) and ext[4:6] != b"\xFF\xFF":
+                    self.enrolled.add(z)
+                self.zoneTypes[z] = image[poff(EPROM.ZONEDATA_MAS) + z] & 0x0F
+                self.zoneNames[z] = image[poff(EPROM.ZONENAME_MAS) + z] & 0x1F
+            elif z < 30:
+                zd = image[poff(EPROM.ZONEDATA_MAX) + 4 * z:][:4]
+                if zd[0:3] != bytes(3):
+                    self.enrolled.add(z)
+                self.zoneTypes[z] = zd[3] & 0x0F
+                self.zoneNames[z] = image[poff(EPROM.ZONENAME_MAX) + z] & 0x1F
+
+        # The panel state, this is kept when the integration disconnects
+        self.sysStatus = 0x00          # disarmed
+        self.openZones = 0             # bitmap of the open zones
+        self.powerlinkEnrolled = False
+        self.downloadMode = False
+        self.downloadStart = None
+        self.downloadBlocks = 0
+        self.retries = options.retry
+        self.b0Counter = 0
+
+        # The connection to the integration
+        self.connection = None
+        self.connectedAt = None
+        self.keepAliveSent = False
+        self.lastReceived = time.monotonic()
+        self.receiveData = bytearray()
+        self.sendQueue = asyncio.Queue()
+
+        self.commandHandlers = {
+            0x09 : self._handle_bump,
+            0x0B : self._handle_exit,
+            0x0F : self._handle_exit,
+            0x24 : self._handle_download,
+            0x3E : self._handle_download_block,
+            0x5A : self._handle_settings,
+            0xA1 : self._handle_arm,
+            0xA2 : self._handle_status,
+            0xA3 : self._handle_zone_names,
+            0xA6 : self._handle_zone_types,
+            0xAB : self._handle_powerlink,
+            0xB0 : self._handle_powermaster,
+            0xE1 : None,                        # Powerlink Bridge commands, there is no bridge so there is no reply
+        }
+
+        self.tasks = [ asyncio.create_task(self._writer()), asyncio.create_task(self._download_watchdog()) ]
+        for interval, func in ((options.a5, self._send_zone_activity), (options.a7, self._send_event), (options.b0, self._send_b0_burst)):
+            if interval > 0:
+                self.tasks.append(asyncio.create_task(self._every(interval, func)))
+        if options.ab > 0:
+            self.tasks.append(asyncio.create_task(self._keep_alive()))
+
+    ###################################################################################################
+    # Connection to the integration
+    ###################################################################################################
+
+    def attach(self, connection):
+        if self.connection is not None:
+            log.info(f"[{self.name}] New connection, closing the old one")
+            self.connection.close()
+        self.connection = connection
+        self.connectedAt = time.monotonic()
+        self.keepAliveSent = False
+        self.receiveData = bytearray()
+        self.stats.connections += 1
+        self.stats.connected += 1
+        log.info(f"[{self.name}] Connected")
+
+    def detach(self, connection):
+        if self.connection is connection:
+            self.connection = None
+            self.stats.connected -= 1
+            log.info(f"[{self.name}] Disconnected")
+
+    def close(self):
+        for t in self.tasks:
+            t.cancel()
+
+    def send(self, body : bytes):
+        """ Add the message to the send queue, the writer task adds the delay and sends it """
+        packet = bytearray([Packet.HEADER]) + body + self._calculateCRC(bytearray(body)) + bytearray([Packet.FOOTER])
+        if self.options.crc > 0 and self.rnd.random() < self.options.crc:
+            packet[-2] = (packet[-2] + 0x80) & 0xFF     # this is never one of the checksum variants that the integration accepts
+            self.stats.crcInjected += 1
+        self.sendQueue.put_nowait(bytes(packet))
+
+    async def _writer(self):
+        while True:
+            packet = await self.sendQueue.get()
+            delay = self.options.delay + (self.rnd.uniform(0, self.options.jitter) if self.options.jitter > 0 else 0)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000.0)
+            if self.connection is not None:
+                log.debug(f"[{self.name}] Sending {packet.hex(' ')}")
+                self.connection.write(packet)
+                self.stats.bytesOut += len(packet)
+                self.stats.messagesOut += 1
+
+    ###################################################################################################
+    # Received data
+    ###################################################################################################
+
+    def _host_pdu_length(self, buf : bytearray) -> int | None:
+        """ The length of the PDU at the start of buf, None when it is only known by finding the footer """
+        msgtype = buf[1]
+        if msgtype == 0xB0:
+            # 0D B0 <2 bytes> <length> <length bytes> 43 <checksum> 0A
+            return 8 + buf[4] if len(buf) > 4 else 5
+        return hostCommandLength.get(msgtype)
+
+    def received(self, data : bytes):
+        self.stats.bytesIn += len(data)
+        self.lastReceived = time.monotonic()
+        buf = self.receiveData
+        buf += data
+        while True:
+            start = buf.find(Packet.HEADER)
+            if start < 0:
+                buf.clear()
+                return
+            if start > 0:
+                del buf[:start]
+            if len(buf) < 2:
+                return
+
+            length = self._host_pdu_length(buf)
+            if length is None:
+                # Unknown length, the PDU ends at the first footer where the checksum is correct
+                length = buf.find(Packet.FOOTER, 2) + 1
+                while length > 0 and self._checkPDU(buf[:length]) < ChecksumVariant.EXACT:
+                    length = buf.find(Packet.FOOTER, length) + 1
+                if length == 0:
+                    if len(buf) > PACKET_MAX_SIZE:
+                        del buf[:1]            # resynchronise on the next header
+                        continue
+                    return
+            elif len(buf) < length:
+                return
+
+            packet = bytes(buf[:length])
+            if self._validatePDU(packet):
+                del buf[:length]
+                self.stats.messagesIn += 1
+                self._process(packet)
+            else:
+                log.debug(f"[{self.name}] Checksum failed {packet.hex(' ')}")
+                self._countChecksum(ChecksumVariant.FAILED)
+                self.stats.crcFailed += 1
+                del buf[:1]
+
+    def _process(self, packet : bytes):
+        log.debug(f"[{self.name}] Received {packet.hex(' ')}")
+        data = packet[1:-2]
+        if data[0] == 0x02:
+            return                             # an acknowledge of a message that we sent
+        if data[0] in self.commandHandlers:
+            if (func := self.commandHandlers[data[0]]) is not None:
+                func(data)
+        else:
+            self._ack(data)
+
+    ###################################################################################################
+    # Commands from the integration
+    ###################################################################################################
+
+    def _ack(self, data : bytes):
+        self.send(b"\x02\x43" if data[0] >= 0x40 and self.powerlinkEnrolled else b"\x02")
+
+    def _deny(self, data : bytes):
+        self.stats.denied += 1
+        self.send(b"\x08\x43" if data[0] >= 0x40 else b"\x08")
+
+    def _send_panel_info(self):
+        self.send(bytes([0x3C, 0x00, 0x00, 0x00, 0x00, self.model, self.paneltype, 0x00, 0x00, 0x00, 0x00]))
+
+    def _handle_bump(self, data : bytes):
+        self._send_panel_info()
+
+    def _handle_download(self, data : bytes):
+        if bytes(data[3:5]) != self.code:
+            # The panel still identifies itself, this is how the integration finds out the panel type and so the default download code
+            log.info(f"[{self.name}] Download code {data[3:5].hex()} is not correct")
+            self._send_panel_info()
+            self._deny(data)
+        elif not self.downloadMode and self.retries > 0:
+            self.retries -= 1
+            self.send(bytes([0x25, 0x00, 0x00, 0x05, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]))    # wait 5 seconds
+        else:
+            if not self.downloadMode:
+                self.downloadMode = True
+                self.downloadStart = time.monotonic()
+                self.downloadBlocks = 0
+                self.retries = self.options.retry
+            self._send_panel_info()
+
+    def _handle_download_block(self, data : bytes):
+        if not self.downloadMode:
+            self._deny(data)
+            return
+        self._ack(data)
+        # 3E <index> <page> <length> ...
+        addr = data[1] + (data[2] << 8)
+        remaining = data[3]
+        while remaining > 0:
+            n = min(remaining, MAX_DOWNLOAD_BLOCK_SIZE)
+            block = self.image[addr:addr + n]
+            self.send(bytes([0x3F, addr & 0xFF, (addr >> 8) & 0xFF, n]) + block + b"\xFF" * (n - len(block)))
+            addr += n
+            remaining -= n
+        self.downloadBlocks += 1
+
+    def _exit_download(self):
+        if self.downloadMode:
+            self.downloadMode = False
+            if self.downloadBlocks > 0:
+                self.stats.downloads.append(time.monotonic() - self.downloadStart)
+
+    def _handle_exit(self, data : bytes):
+        self._exit_download()
+        self._ack(data)
+
+    def _handle_settings(self, data : bytes):
+        # 5A <index> <page> ...   replies with 8 bytes from that address
+        addr = data[1] + (data[2] << 8)
+        self.send(bytes([0x33, data[1], data[2]]) + self.image[addr:addr + 8])
+
+    def _handle_arm(self, data : bytes):
+        # A1 00 00 <arm mode> <user code 2 bytes> ...
+        if bytes(data[4:6]) != self.pin:
+            log.info(f"[{self.name}] User code is not correct")
+            self._deny(data)
+            return
+        self._ack(data)
+        if data[3] in armEvent:
+            self.sysStatus = data[3]
+            self._send_status(0x04)
+            if self.powermaster:
+                self._send_panel_state()
+            self.send(bytes([0xA7, 0x01, 0x00, 0x00, armEvent[data[3]], 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, Packet.POWERLINK_TERMINAL]))
+
+    def _handle_status(self, data : bytes):
+        # A2 00 00 <bit per A5 subtype>
+        self._ack(data)
+        for i in range(6):
+            if data[3] & (1 << i):
+                self._send_status(i + 1)
+
+    def _send_zone_list(self, msgtype : int, values : bytearray):
+        count = (len(values) + 7) // 8
+        for i in range(count):
+            self.send(bytes([msgtype, count, i + 1]) + bytes(values[8 * i:8 * i + 8]).ljust(8, b"\x00") + bytes([Packet.POWERLINK_TERMINAL]))
+
+    def _handle_zone_names(self, data : bytes):
+        self._ack(data)
+        self._send_zone_list(0xA3, self.zoneNames)
+
+    def _handle_zone_types(self, data : bytes):
+        self._ack(data)
+        self._send_zone_list(0xA6, bytearray(0x1E + t for t in self.zoneTypes))
+
+    def _handle_powerlink(self, data : bytes):
+        self._ack(data)
+        match data[1]:
+            case 0x01:    # Get time
+                t = datetime.now()
+                self.send(bytes([0xAB, 0x01, 0x00, t.second, t.minute, t.hour, t.day, t.month, t.year - 2000, 0x00, 0x00, Packet.POWERLINK_TERMINAL]))
+            case 0x03:    # I'm alive, the reply to our keep-alive
+                if self.keepAliveSent and self.connectedAt is not None:
+                    self.stats.powerlink.append(time.monotonic() - self.connectedAt)
+                    self.connectedAt = None
+            case 0x06:    # Restore
+                self._send_status(0x02)
+                self._send_status(0x04)
+            case 0x0A if data[3] == 0x00:    # Enrol with the download code
+                if bytes(data[4:6]) == self.code:
+                    if not self.powerlinkEnrolled:
+                        log.info(f"[{self.name}] Enrolled")
+                        asyncio.get_running_loop().call_later(FIRST_KEEPALIVE_DELAY, self._send_keep_alive)
+                    self.powerlinkEnrolled = True
+
+    def _handle_powermaster(self, data : bytes):
+        # B0 01 17 <length> 01 FF 08 FF <count> <count subtypes> ... 43    is a request for B0 data
+        self._ack(data)
+        if data[1] == 0x01 and data[2] == 0x17 and len(data) > 9:
+            for subtype in data[9:9 + data[8]]:
+                match subtype:
+                    case 0x22:
+                        self._send_capabilities()
+                    case 0x24:
+                        self._send_panel_state()
+
+    ###################################################################################################
+    # Messages from the panel
+    ###################################################################################################
+
+    def _send_b0(self, subtype : int, datasize : int, index : int, values : bytes):
+        # B0 03 <subtype> <length> <chunk> <counter> 43    with one chunk   FF <data size> <index> <length> <data>
+        chunk = bytes([0xFF, datasize, index, len(values)]) + values
+        self.send(bytes([0xB0, 0x03, subtype, len(chunk) + 1]) + chunk + bytes([self.b0Counter, Packet.POWERLINK_TERMINAL]))
+        self.b0Counter = (self.b0Counter + 1) & 0xFF
+
+    def _send_capabilities(self):
+        # A 2 byte little endian count for each IndexName, from the panel type config table
+        capabilities = {
+            IndexName.REPEATERS    : pmPanelConfig[CFG.REPEATERS][self.paneltype],
+            IndexName.PANIC_BUTTONS: 1,
+            IndexName.SIRENS       : pmPanelConfig[CFG.SIRENS][self.paneltype],
+            IndexName.ZONES        : pmPanelConfig[CFG.WIRELESS][self.paneltype] + pmPanelConfig[CFG.WIRED][self.paneltype],
+            IndexName.KEYPADS      : pmPanelConfig[CFG.TWO_WKEYPADS][self.paneltype],
+            IndexName.KEYFOBS      : pmPanelConfig[CFG.KEYFOBS][self.paneltype],
+            IndexName.USERS        : pmPanelConfig[CFG.USERCODES][self.paneltype],
+            IndexName.X10_DEVICES  : pmPanelConfig[CFG.X10][self.paneltype],
+            IndexName.GSM_MODULES  : 1,
+            IndexName.POWERLINK    : 1,
+            IndexName.PROXTAGS     : pmPanelConfig[CFG.PROXTAGS][self.paneltype],
+            IndexName.PGM          : pmPanelConfig[CFG.PGM][self.paneltype],
+            IndexName.PANEL        : 1,
+            IndexName.GUARDS       : 1,
+            IndexName.PARTITIONS   : pmPanelConfig[CFG.PARTITIONS][self.paneltype],
+        }
+        self._send_b0(0x22, RAW.WORD, IndexName.MIXED, b"".join(v.to_bytes(2, "little") for v in capabilities.values()))
+
+    def _send_panel_state(self):
+        # 8 unknown bytes, the date and time, 2 unknown bytes, the partition count and then for the partition:
+        #     system status, system flags (0x80 partition enabled, 0x01 ready), system status 2 (bit 0 is the instant bit of the system status), unknown
+        t = datetime.now()
+        ready = 0x01 if self.openZones == 0 else 0x00
+        values = bytes(8) + bytes([t.second, t.minute, t.hour, t.day, t.month, t.year - 2000]) + bytes(2) + bytes([0x01])
+        values += bytes([self.sysStatus & 0x0F, 0x80 | ready, (self.sysStatus >> 4) & 0x01, 0x00])
+        self._send_b0(0x24, RAW.BYTE, IndexName.MIXED, values)
+
+    def _bitmap(self, bits : int) -> bytes:
+        return (bits & ((1 << A5_ZONES) - 1)).to_bytes(4, "little")
+
+    def _send_status(self, subtype : int):
+        match subtype:
+            case 0x02:
+                data = self._bitmap(self.openZones) + bytes(4)                                   # open zones, low battery zones
+            case 0x04:
+                ready = 0x01 if self.openZones == 0 else 0x00
+                data = bytes([self.sysStatus, ready, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])        # system status, system flags, event zone, event type ...
+            case 0x06:
+                data = self._bitmap(sum(1 << z for z in self.enrolled)) + bytes(4)               # enrolled zones, bypassed zones
+            case _:
+                data = bytes(8)
+        self.send(bytes([0xA5, 0x00, subtype]) + data + bytes([Packet.POWERLINK_TERMINAL]))
+
+    def _toggle_zone(self) -> int | None:
+        if len(self.enrolled) == 0:
+            return None
+        zone = self.rnd.choice(sorted(self.enrolled))
+        self.openZones ^= 1 << zone
+        return zone
+
+    def _send_zone_activity(self):
+        if self._toggle_zone() is not None:
+            self._send_status(0x02)
+
+    def _send_event(self):
+        zone = self._toggle_zone()
+        if zone is not None:
+            self.send(bytes([0xA7, 0x01, 0x00, zone + 1, EVENT_TYPE.GENERAL_RESTORE, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, Packet.POWERLINK_TERMINAL]))
+
+    def _send_b0_burst(self):
+        if not self.powermaster:
+            return
+        for i in range(self.options.burst):
+            self._toggle_zone()
+            self._send_b0(0x18, RAW.BITS, IndexName.ZONES, self.openZones.to_bytes(8, "little"))
+
+    def _send_keep_alive(self):
+        if self.connection is not None and self.powerlinkEnrolled and not self.downloadMode:
+            self.keepAliveSent = True
+            self.send(bytes([0xAB, 0x03, 0x00, 0x1E, 0x00, 0x31, 0x2E, 0x31, 0x35, 0x00, 0x00, Packet.POWERLINK_TERMINAL]))
+
+    async def _every(self, interval : float, func):
+        while True:
+            await asyncio.sleep(interval)
+            if self.connection is not None and not self.downloadMode:
+                func()
+
+    async def _keep_alive(self):
+        while True:
+            await asyncio.sleep(self.options.ab)
+            self._send_keep_alive()
+
+    async def _download_watchdog(self):
+        while True:
+            await asyncio.sleep(1.0)
+            if self.downloadMode and time.monotonic() - self.lastReceived > DOWNLOAD_IDLE_TIMEOUT:
+                log.info(f"[{self.name}] Nothing received in download mode, sending a timeout")
+                self._exit_download()
+                self.send(b"\x06")
+
+
+class PanelConnection(asyncio.Protocol):
+    """ A TCP connection from the integration to a simulated panel """
+
+    def __init__(self, panel : SimulatedPanel):
+        self.panel = panel
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.panel.attach(self)
+
+    def data_received(self, data):
+        self.panel.received(data)
+
+    def connection_lost(self, exc):
+        self.panel.detach(self)
+
+    def write(self, data : bytes):
+        self.transport.write(data)
+
+    def close(self):
+        self.transport.close()
+
+
+class PanelTerminal:
+    """ A pseudo-terminal for a simulated panel, the integration opens the terminal name as if it was the serial port """
+
+    def __init__(self, loop, panel : SimulatedPanel):
+        self.panel = panel
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        self.name = os.ttyname(self.slave)
+        loop.add_reader(self.master, self._read)
+        panel.attach(self)
+
+    def _read(self):
+        try:
+            data = os.read(self.master, 4096)
+        except OSError:
+            return                             # the terminal has been closed by the integration, the slave is kept open so it can be opened again
+        if len(data) > 0:
+            self.panel.received(data)
+
+    def write(self, data : bytes):
+        try:
+            os.write(self.master, data)
+        except OSError:
+            pass                               # the terminal buffer is full as nothing is reading it
+
+    def close(self):
+        pass                                   # a terminal is not closed when the integration reconnects
+
+
+async def simulate(args) -> None:
+    loop = asyncio.get_running_loop()
+    stats = SimulatorStats()
+
+    if len(args.image) > 0:
+        template, paneltype, model = loadImage(args.image)
+        paneltype = paneltype if paneltype is not None else args.paneltype
+        model = model if model is not None and model != 0xFF else args.model
+    else:
+        template = None
+        paneltype = args.paneltype
+        model = args.model
+    print(f"Simulating {args.panels} {pmPanelType.get(paneltype, 'Unknown')} panels (panel type {paneltype}, model {model})")
+
+    panels = []
+    servers = []
+    for i in range(args.panels):
+        # Each panel has its own serial number so the integration keeps a separate EPROM cache file for each one
+        serial = bytes([0x10, 0x00, 0x00, 0x00, (i >> 8) & 0xFF, i & 0xFF])
+        if template is None:
+            image = blankImage(paneltype, args.zones, bytes.fromhex(args.pin), serial)
+        else:
+            image = bytearray(template)
+            if args.panels > 1:
+                image[EPROM_SERIAL_ADDR + EPROM_SERIAL_SIZE - 2:EPROM_SERIAL_ADDR + EPROM_SERIAL_SIZE] = serial[-2:]
+        panel = SimulatedPanel(f"panel {i}", args, stats, image, paneltype, model, args.seed + i)
+        panels.append(panel)
+        if args.pty:
+            terminal = PanelTerminal(loop, panel)
+            print(f"    {panel.name} on {terminal.name}")
+        else:
+            port = args.tcp + i
+            servers.append(await loop.create_server(lambda panel=panel: PanelConnection(panel), args.host, port))
+            print(f"    {panel.name} on {args.host}:{port}")
+
+    try:
+        while True:
+            await asyncio.sleep(args.stats)
+            print(stats.report(len(panels)))
+    finally:
+        for s in servers:
+            s.close()
+        for p in panels:
+            p.close()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Simulate Visonic PowerMax and PowerMaster alarm panels")
+    parser.add_argument("-tcp", help="the TCP port of the first panel, each panel has the next port", type=int, default=0)
+    parser.add_argument("-host", help="the address to listen on for TCP connections", default="127.0.0.1")
+    parser.add_argument("-pty", help="use a pseudo-terminal for each panel instead of TCP", action="store_true")
+    parser.add_argument("-panels", help="the number of panels to simulate", type=int, default=1)
+    parser.add_argument("-paneltype", help="the panel type, see pmPanelType in pyvisonic.py", type=int, default=4)
+    parser.add_argument("-model", help="the panel model type sent in the 0x3C panel information", type=int, default=0)
+    parser.add_argument("-image", help="an EPROM cache file saved by the integration or a raw EPROM image, otherwise a blank image with -zones sensors is used", default="")
+    parser.add_argument("-zones", help="the number of sensors in the blank image", type=int, default=8)
+    parser.add_argument("-code", help="the download code in hex, the default is the default code for the panel type", default="")
+    parser.add_argument("-pin", help="the user code in the blank image", default="1234")
+    parser.add_argument("-retry", help="the number of 0x25 download retry messages to send before accepting a download", type=int, default=0)
+    parser.add_argument("-a5", help="seconds between A5 zone status messages, 0 for none", type=float, default=10.0)
+    parser.add_argument("-a7", help="seconds between A7 panel events, 0 for none", type=float, default=0.0)
+    parser.add_argument("-ab", help="seconds between AB 03 keep-alives once enrolled, 0 for none", type=float, default=30.0)
+    parser.add_argument("-b0", help="seconds between bursts of B0 messages (PowerMaster only), 0 for none", type=float, default=0.0)
+    parser.add_argument("-burst", help="the number of B0 messages in a burst", type=int, default=10)
+    parser.add_argument("-crc", help="the probability of sending a message with a corrupted checksum", type=float, default=0.0)
+    parser.add_argument("-delay", help="milliseconds to wait before sending each message", type=float, default=0.0)
+    parser.add_argument("-jitter", help="up to this many milliseconds are randomly added to the delay", type=float, default=0.0)
+    parser.add_argument("-stats", help="seconds between the statistics reports", type=float, default=10.0)
+    parser.add_argument("-seed", help="the seed for the random zone activity and checksum errors", type=int, default=0)
+    parser.add_argument("-print", help="log level: error, warning, info, debug", default="warning")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.print.upper())
+
+    if args.pty and tty is None:
+        print("A pseudo-terminal is not available on this platform, use -tcp")
+        return 1
+    if not args.pty and args.tcp <= 0:
+        print("Use -tcp <port> or -pty")
+        return 1
+    if args.paneltype not in pmPanelType:
+        print(f"Unknown panel type {args.paneltype}, use one of {list(pmPanelType)}")
+        return 1
+
+    try:
+        asyncio.run(simulate(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,517 @@
+""" Replay recorded panel byte streams through the Visonic protocol handler and report the performance """
+########################################################
+# Replay Benchmark for the Visonic Protocol Handler
+########################################################
+
+#  Replay the built in scenarios (generated from a fixed seed so they are the same every time):
+#      python replay_benchmark.py
+#  Write the built in scenarios as capture files, to look at them or to use as a starting point:
+#      python replay_benchmark.py -generate captures
+#  Replay capture files (or all the capture files in a directory) and save the results as the baseline:
+#      python replay_benchmark.py captures -save baseline.json
+#  Replay them again and compare against the baseline, the exit code is 1 when there is a regression:
+#      python replay_benchmark.py captures -baseline baseline.json
+#
+#  Capture files:
+#      .hex   One chunk of received data per line as hex bytes, each line is passed to data_received as it was received.
+#             Anything after a # is a comment. A line starting with #! sets how the protocol handler is prepared, e.g.
+#                  #! mode=plus powermaster=1 camera=5,12
+#                      mode         standard, plus, powerlink or download (download starts an EPROM download of the blocks for the panel)
+#                      powermaster  1 for a PowerMaster panel (B0 messages are processed), 0 for a PowerMax
+#                      camera       the zones that are camera PIRs, these are set up to receive F4 images
+#      .bin   The raw bytes as received from the panel, passed to data_received in -chunk sized pieces and prepared using -mode and -powermaster
+
+# set the parent directory on the import path
+import os,sys,inspect
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.insert(1000000,parentdir)
+
+import asyncio
+import logging
+import argparse
+import json
+import gc
+import time
+import random
+import platform
+import tracemalloc
+
+from pyconst import AlPanelMode, AlSensorType
+from pyenum import IndexName, Packet
+from pyhelper import MyChecksumCalc
+from pyeprom import EPROMManager, EPROMDownloadScheduler
+from pyvisonic import VisonicProtocol, SensorDevice
+
+SCENARIO_SEED = 1234           # The built in scenarios are generated from this seed so the byte streams are the same every run
+MIN_HANDLER_COUNT = 50         # Only compare the handler time of message types that have been received at least this many times
+
+panelModes = {
+    "standard"  : AlPanelMode.STANDARD,
+    "plus"      : AlPanelMode.STANDARD_PLUS,
+    "powerlink" : AlPanelMode.POWERLINK,
+    "download"  : AlPanelMode.DOWNLOAD,
+}
+
+class FakeTransport:
+    """ Stands in for the serial or TCP transport, nothing is sent to a panel """
+
+    def __init__(self):
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+
+    def close(self):
+        pass
+
+class HandlerStats:
+    __slots__ = ("count", "time", "alloc", "errors")
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.alloc = 0
+        self.errors = 0
+
+##############################################################################################################################################################################################################################################
+##########################  Capture Files  ###################################################################################################################################################################################################
+##############################################################################################################################################################################################################################################
+
+def parseDirectives(line : str, directives : dict):
+    for item in line.split():
+        k, _, v = item.partition("=")
+        directives[k.lower()] = v
+
+def loadCapture(path : str, defaults : dict, chunk : int) -> tuple:
+    """ Return the directives and the list of received data chunks from a capture file """
+    directives = dict(defaults)
+    if path.lower().endswith(".bin"):
+        with open(path, "rb") as f:
+            data = f.read()
+        return directives, [data[i:i+chunk] for i in range(0, len(data), chunk)]
+
+    chunks = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#!"):
+                parseDirectives(line[2:], directives)
+                continue
+            line = line.split("#", 1)[0].strip()
+            if len(line) > 0:
+                chunks.append(bytes.fromhex(line))
+    return directives, chunks
+
+def findCaptures(paths : list) -> list:
+    retval = []
+    for p in paths:
+        if os.path.isdir(p):
+            retval.extend(os.path.join(p, f) for f in sorted(os.listdir(p)) if f.lower().endswith((".hex", ".bin")))
+        else:
+            retval.append(p)
+    return retval
+
+def saveCapture(path : str, directives : dict, description : str, chunks : list):
+    with open(path, "w") as f:
+        f.write(f"# {description}\n")
+        f.write("#! " + " ".join(f"{k}={v}" for k, v in directives.items()) + "\n")
+        for c in chunks:
+            f.write(c.hex(" ") + "\n")
+
+##############################################################################################################################################################################################################################################
+##########################  Built in Scenarios  ##############################################################################################################################################################################################
+##############################################################################################################################################################################################################################################
+
+checksum = MyChecksumCalc()
+
+def pdu(body : bytes) -> bytes:
+    """ Wrap the message type and data in a header, checksum and footer """
+    return bytes([Packet.HEADER]) + bytes(body) + bytes(checksum._calculateCRC(bytearray(body))) + bytes([Packet.FOOTER])
+
+def chunkStream(rnd : random.Random, stream : bytes, maxchunk : int = 96) -> list:
+    """ Split the byte stream in to randomly sized pieces, like the reads from a serial port or socket """
+    retval = []
+    pos = 0
+    while pos < len(stream):
+        n = rnd.randint(1, maxchunk)
+        retval.append(stream[pos:pos+n])
+        pos += n
+    return retval
+
+def fakeJPEG(rnd : random.Random, width : int, height : int, size : int) -> bytes:
+    # Start of Image, Start of Frame (baseline) with the dimensions, filler data and End of Image
+    sof = bytes([0xFF, 0xC0, 0x00, 0x11, 0x08, height >> 8, height & 0xFF, width >> 8, width & 0xFF, 0x03, 0x01, 0x22, 0x00, 0x02, 0x11, 0x01, 0x03, 0x11, 0x01])
+    filler = bytes(rnd.randint(0, 0xFE) for _ in range(max(0, size - len(sof) - 4)))
+    return b"\xFF\xD8" + sof + filler + b"\xFF\xD9"
+
+def b0Message(subtype : int, chunks : bytes, counter : int) -> bytes:
+    return pdu(bytes([0xB0, 0x03, subtype, len(chunks) + 1]) + chunks + bytes([counter, Packet.POWERLINK_TERMINAL]))
+
+def b0Chunk(datasize : int, index : int, payload : bytes) -> bytes:
+    return bytes([0xFF, datasize, index, len(payload)]) + payload
+
+def a5Message(rnd : random.Random) -> bytes:
+    subtype = rnd.choice([0x01, 0x02, 0x02, 0x03, 0x04, 0x06])
+    if subtype == 0x04:
+        # system status, system flags, event zone, event type, 2 unknown bytes and the X10 status
+        data = bytes([rnd.choice([0x00, 0x01, 0x04]), rnd.choice([0x00, 0x01, 0x0C, 0x41]), 0, 0, 0, 0, 0, 0])
+    else:
+        # 2 zone bitmaps (zones 1 to 32), only a few zones change from one message to the next
+        data = bytes(rnd.choice([0x00, 0x00, 0x01, 0x10, 0x80, rnd.randint(0, 0xFF)]) for _ in range(8))
+    return pdu(bytes([0xA5, 0x00, subtype]) + data + bytes([Packet.POWERLINK_TERMINAL]))
+
+def scenarioEPROM(rnd : random.Random, powermaster : bool) -> list:
+    # Follow the same download sequence as the protocol handler, with every block received in full
+    manager = EPROMManager()
+    scheduler = EPROMDownloadScheduler()
+    scheduler.start(manager.populatEPROMDownload(powermaster))
+    stream = bytearray()
+    while not scheduler.isComplete():
+        if (b := scheduler.next()) is not None:
+            index, page, length = b[0], b[1], b[2]
+            data = bytes((page * 31 + index + i) & 0xFF for i in range(length))
+            stream += pdu(bytes([0x3F, index, page, length]) + data)
+            scheduler.received(index, page, length)
+            manager.saveEPROMSettings(page, index, data)
+        if scheduler.isComplete():
+            scheduler.start(manager.populatEPROMDownload(powermaster))
+    return chunkStream(rnd, bytes(stream))
+
+def scenarioB0Flood(rnd : random.Random, count : int = 2000) -> list:
+    stream = bytearray()
+    for i in range(count):
+        subtype = rnd.choice([0x35, 0x42])
+        chunks = b""
+        for c in range(rnd.randint(1, 3)):
+            if subtype == 0x35:
+                # B0 35 panel setting
+                chunks += b0Chunk(8, 3, bytes([rnd.randint(0, 0x60), 0, 1]) + bytes(rnd.randint(0, 0xFF) for _ in range(4)))
+            else:
+                # B0 42 panel setting, a list of zone values
+                n = rnd.randint(1, 48)
+                pid = rnd.choice([0x30, 0x33, 0x36])
+                chunks += b0Chunk(8, 3, bytes([pid, 0, 1, 0, 0, 0, 0, 1, 0, n, 0, 0, 0, 0]) + bytes(rnd.randint(0, 0xFF) for _ in range(n)))
+            if len(chunks) > 120:
+                break              # keep the PDU within the maximum size
+        stream += b0Message(subtype, chunks, i & 0xFF)
+    return chunkStream(rnd, bytes(stream))
+
+def scenarioA5Loop(rnd : random.Random, count : int = 5000) -> list:
+    # The panel repeats a small set of status messages, acknowledges in between
+    messages = [a5Message(rnd) for _ in range(16)]
+    stream = bytearray()
+    for i in range(count):
+        stream += rnd.choice(messages)
+        if rnd.random() < 0.3:
+            stream += pdu(bytes([0x02, Packet.POWERLINK_TERMINAL]))
+    return chunkStream(rnd, bytes(stream))
+
+def scenarioF4Images(rnd : random.Random, zone : int, images : int = 10) -> list:
+    stream = bytearray()
+    unique_id = rnd.randint(1, 0xFF)
+    bcdzone = ((zone // 10) << 4) + (zone % 10)
+    for image_id in range(1, images + 1):
+        jpg = fakeJPEG(rnd, 320, 240, rnd.randint(3000, 6000))
+        sequence = rnd.randint(0, 0xFF)
+        lastimage = 1 if image_id == images else 0
+        header = bytes([0x00, bcdzone, unique_id, image_id, 0, 0, 0, lastimage, len(jpg) & 0xFF, len(jpg) >> 8, images])
+        stream += pdu(bytes([0xF4, 0x03, 0x00, sequence, len(header)]) + header + b"\x00")
+        for pos in range(0, len(jpg), 0xB0):
+            sequence = (sequence + 0x10) & 0xFF
+            data = jpg[pos:pos+0xB0]
+            stream += pdu(bytes([0xF4, 0x05, 0x00, sequence, len(data)]) + data + b"\x00")
+    return chunkStream(rnd, bytes(stream))
+
+def scenarioCRCErrors(rnd : random.Random, count : int = 3000) -> list:
+    stream = bytearray()
+    for i in range(count):
+        p = bytearray(a5Message(rnd) if rnd.random() < 0.7 else b0Message(0x35, b0Chunk(8, 3, bytes([rnd.randint(0, 0x2F), 0, 1]) + bytes(4)), i & 0xFF))
+        r = rnd.random()
+        if r < 0.03:
+            p[-2] ^= 0x5A                                 # corrupt the checksum
+        elif r < 0.04:
+            p = p[:rnd.randint(1, len(p) - 1)]            # a truncated PDU
+        elif r < 0.05:
+            p += bytes(rnd.randint(0, 0xFF) for _ in range(rnd.randint(1, 8)))    # line noise
+        stream += p
+    return chunkStream(rnd, bytes(stream))
+
+def builtinScenarios() -> list:
+    """ Return a list of (name, directives, description, chunks) """
+    rnd = random.Random(SCENARIO_SEED)
+    return [
+        ("eprom_download_powermax",    {"mode" : "download", "powermaster" : "0"},                  "EPROM download from a PowerMax",                 scenarioEPROM(rnd, False)),
+        ("eprom_download_powermaster", {"mode" : "download", "powermaster" : "1"},                  "EPROM download from a PowerMaster",              scenarioEPROM(rnd, True)),
+        ("b0_35_42_flood",             {"mode" : "plus", "powermaster" : "1"},                      "Flood of B0 35 and B0 42 panel settings",        scenarioB0Flood(rnd)),
+        ("f4_image_transfer",          {"mode" : "plus", "powermaster" : "1", "camera" : "5"},      "F4 image transfer of 10 images from zone 5",     scenarioF4Images(rnd, 5)),
+        ("a5_status_loop",             {"mode" : "standard", "powermaster" : "0"},                  "A5 status messages and acknowledges",            scenarioA5Loop(rnd)),
+        ("crc_corrupted",              {"mode" : "standard", "powermaster" : "1"},                  "A5 and B0 messages with corrupt checksums, truncated PDUs and noise", scenarioCRCErrors(rnd)),
+    ]
+
+##############################################################################################################################################################################################################################################
+##########################  Replay  ##########################################################################################################################################################################################################
+##############################################################################################################################################################################################################################################
+
+def messageKey(msgtype : int, data) -> str:
+    # B0 and F4 messages are reported by subtype as they are handled so differently
+    if (msgtype == 0xB0 or msgtype == 0xF4) and len(data) > 1:
+        return f"{msgtype:02X} {data[1 if msgtype == 0xB0 else 0]:02X}"
+    return f"{msgtype:02X}"
+
+def instrument(vp : VisonicProtocol, stats : dict, alloc : bool):
+    """ Wrap the message handlers in the decode table of this instance to time them """
+
+    def timed(msgtype, func):
+        def handler(data):
+            s = stats.get(key := messageKey(msgtype, data))
+            if s is None:
+                s = stats[key] = HandlerStats()
+            if alloc:
+                tracemalloc.reset_peak()
+                start = tracemalloc.get_traced_memory()[0]
+            t = time.perf_counter()
+            try:
+                return func(data)
+            except Exception:
+                s.errors += 1
+                raise
+            finally:
+                s.time += time.perf_counter() - t
+                s.count += 1
+                if alloc:
+                    s.alloc += tracemalloc.get_traced_memory()[1] - start
+        return handler
+
+    for k, dm in list(vp._decodeMessageFunction.items()):
+        if dm.func is not None:
+            vp._decodeMessageFunction[k] = dm._replace(func = timed(k, dm.func))
+
+def createProtocol(directives : dict) -> VisonicProtocol:
+    """ Create the protocol handler and prepare it as if it had connected to a panel, this must be called from within the event loop """
+    vp = VisonicProtocol(panelConfig = {}, panel_id = 0)
+    vp.transport = FakeTransport()     # set directly, setTransportConnection would start the sequencer
+    vp.firstCmdSent = True
+    vp.problems = []
+    vp.onProblemHandler = vp.problems.append
+
+    if directives.get("powermaster", "0") not in ["0", "", "no", "false"]:
+        vp.PanelType = 7
+        vp.PowerMaster = True
+        vp.EnableB0ReceiveProcessing = True
+        vp.PanelCapabilities = {IndexName.ZONES : 64, IndexName.PARTITIONS : 3, IndexName.USERS : 48, IndexName.SIRENS : 4, IndexName.PGM : 1}
+    else:
+        vp.PanelType = 4
+        vp.PowerMaster = False
+        vp.PanelCapabilities = {IndexName.ZONES : 30, IndexName.PARTITIONS : 1, IndexName.USERS : 8, IndexName.SIRENS : 2, IndexName.PGM : 1}
+
+    mode = directives.get("mode", "standard")
+    if mode not in panelModes:
+        raise ValueError(f"Unknown mode {mode}, it must be one of {', '.join(panelModes)}")
+    vp.PanelMode = panelModes[mode]
+    if vp.PanelMode == AlPanelMode.DOWNLOAD:
+        vp.pmDownloadMode = True
+        vp.pmDownloadInProgress = True
+        vp.downloadScheduler.start(vp.epromManager.populatEPROMDownload(vp.isPowerMaster()))
+        vp._request_download_block()
+
+    for z in directives.get("camera", "").split(","):
+        if len(z.strip()) > 0:
+            zone = int(z)
+            vp.SensorList[zone - 1] = SensorDevice(id = zone, stype = AlSensorType.CAMERA, enrolled = True)
+            vp.ImageManager.create(zone, 11)
+    return vp
+
+async def replay(directives : dict, chunks : list, stats : dict = None, alloc : bool = False) -> dict:
+    """ Pass the chunks to data_received, when the protocol handler reports a problem and stops it is recreated (like the client reconnecting) """
+    vp = None
+    restarts = 0
+    queued = 0
+    packets = 0
+    crcfailed = 0
+    elapsed = 0.0
+
+    def finish(vp):
+        nonlocal crcfailed
+        crcfailed += vp.getChecksumCounters().get("failed", 0)
+
+    def counted(callback):
+        # Count the PDUs passed to the packet handler, the checksum counters do not include the F1 and F4 messages
+        def handler(packet):
+            nonlocal packets
+            packets += 1
+            return callback(packet)
+        return handler
+
+    for data in chunks:
+        if vp is None or vp.suspendAllOperations:
+            if vp is not None:
+                restarts += 1
+                finish(vp)
+            vp = createProtocol(directives)
+            vp.packet_callback = counted(vp.packet_callback)
+            if stats is not None:
+                instrument(vp, stats, alloc)
+        t = time.perf_counter()
+        vp.data_received(data)
+        elapsed += time.perf_counter() - t
+        # There isn't a despatcher, throw away the messages that would have been sent to the panel
+        q = vp.SendQueue
+        while not q.empty():
+            q.get_nowait()
+            queued += 1
+        # Let the event loop run the callbacks that the protocol handler has scheduled, as it would between reads from the transport
+        await asyncio.sleep(0)
+
+    if vp is not None:
+        finish(vp)
+        vp.shutdownOperation()
+    return { "seconds" : elapsed, "packets" : packets, "crc_failed" : crcfailed, "restarts" : restarts, "queued" : queued }
+
+async def benchmark(directives : dict, chunks : list, repeat : int) -> dict:
+    size = sum(len(c) for c in chunks)
+
+    # Throughput, best of repeat with nothing instrumented
+    best = None
+    for i in range(repeat):
+        gc.collect()
+        r = await replay(directives, chunks)
+        if best is None or r["seconds"] < best["seconds"]:
+            best = r
+    seconds = max(best["seconds"], 1e-9)
+
+    # Handler time, the lowest total for each message type over repeat runs
+    handlers = {}
+    for i in range(repeat):
+        gc.collect()
+        stats = {}
+        await replay(directives, chunks, stats = stats)
+        for k, s in stats.items():
+            if k not in handlers or s.time < handlers[k].time:
+                handlers[k] = s
+
+    # Allocations, a single run with tracemalloc as it slows everything down
+    gc.collect()
+    stats = {}
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    await replay(directives, chunks, stats = stats, alloc = True)
+    tracemalloc.reset_peak()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "bytes"           : size,
+        "chunks"          : len(chunks),
+        "packets"         : best["packets"],
+        "crc_failed"      : best["crc_failed"],
+        "restarts"        : best["restarts"],
+        "queued"          : best["queued"],
+        "seconds"         : round(seconds, 6),
+        "bytes_per_sec"   : round(size / seconds),
+        "packets_per_sec" : round(best["packets"] / seconds),
+        "retained_bytes"  : max(0, retained - before),
+        "handlers"        : { k : { "count"     : s.count,
+                                    "total_ms"  : round(s.time * 1000, 3),
+                                    "mean_us"   : round(s.time * 1000000 / s.count, 3) if s.count > 0 else 0.0,
+                                    "alloc_per_msg" : round(stats[k].alloc / stats[k].count) if k in stats and stats[k].count > 0 else 0,
+                                    "errors"    : s.errors }
+                              for k, s in sorted(handlers.items()) },
+    }
+
+##############################################################################################################################################################################################################################################
+##########################  Reporting  #######################################################################################################################################################################################################
+##############################################################################################################################################################################################################################################
+
+def change(new, old) -> str:
+    if not old:
+        return ""
+    return f"{100.0 * (new - old) / old:+.1f}%"
+
+def report(name : str, result : dict, base : dict | None, tolerance : float) -> list:
+    """ Print the result, return a list of the regressions against the baseline """
+    regressions = []
+    base = base or {}
+    print(f"{name}")
+    print(f"    {result['bytes']} bytes in {result['chunks']} chunks, {result['packets']} packets, {result['crc_failed']} crc failures, {result['restarts']} restarts, {result['queued']} messages queued to send")
+    print(f"    {result['bytes_per_sec']:>12} bytes/sec  {change(result['bytes_per_sec'], base.get('bytes_per_sec')):>8}      {result['packets_per_sec']:>10} packets/sec  {change(result['packets_per_sec'], base.get('packets_per_sec')):>8}      retained {result['retained_bytes']} bytes")
+    if base.get("bytes_per_sec") and result["bytes_per_sec"] < base["bytes_per_sec"] * (1.0 - tolerance):
+        regressions.append(f"{name} throughput {result['bytes_per_sec']} bytes/sec, baseline {base['bytes_per_sec']}")
+
+    basehandlers = base.get("handlers", {})
+    print(f"    {'type':<6} {'count':>7} {'total ms':>10} {'mean us':>9} {'':>8} {'alloc/msg':>10} {'':>8} {'errors':>6}")
+    for k, h in result["handlers"].items():
+        b = basehandlers.get(k, {})
+        print(f"    {k:<6} {h['count']:>7} {h['total_ms']:>10.3f} {h['mean_us']:>9.2f} {change(h['mean_us'], b.get('mean_us')):>8} {h['alloc_per_msg']:>10} {change(h['alloc_per_msg'], b.get('alloc_per_msg')):>8} {h['errors']:>6}")
+        if h["count"] >= MIN_HANDLER_COUNT and b.get("count", 0) >= MIN_HANDLER_COUNT:
+            if b.get("mean_us") and h["mean_us"] > b["mean_us"] * (1.0 + tolerance):
+                regressions.append(f"{name} handler {k} mean {h['mean_us']}us, baseline {b['mean_us']}us")
+            if b.get("alloc_per_msg") and h["alloc_per_msg"] > b["alloc_per_msg"] * (1.0 + tolerance):
+                regressions.append(f"{name} handler {k} allocates {h['alloc_per_msg']} bytes per message, baseline {b['alloc_per_msg']}")
+    print()
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded panel byte streams through the Visonic protocol handler and report the performance")
+    parser.add_argument("captures", nargs="*", help="capture files (.hex or .bin) or directories of them, the built in scenarios are used when there are none")
+    parser.add_argument("-generate", help="write the built in scenarios as .hex capture files to this directory and exit", default="")
+    parser.add_argument("-baseline", help="compare the results against this baseline file", default="")
+    parser.add_argument("-save", help="save the results to this file to use as a baseline", default="")
+    parser.add_argument("-tolerance", help="the fractional change allowed before it is a regression", type=float, default=0.15)
+    parser.add_argument("-repeat", help="the number of runs to take the best time from", type=int, default=5)
+    parser.add_argument("-chunk", help="the chunk size to pass .bin capture files to data_received", type=int, default=64)
+    parser.add_argument("-mode", help="panel mode for .bin capture files: standard, plus, powerlink, download", default="standard")
+    parser.add_argument("-powermaster", help="1 when the .bin capture files are from a PowerMaster panel", default="0")
+    parser.add_argument("-print", help="log level of the protocol handler: error, warning, info, debug", default="critical")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.print.upper())
+
+    if len(args.generate) > 0:
+        os.makedirs(args.generate, exist_ok=True)
+        for name, directives, description, chunks in builtinScenarios():
+            path = os.path.join(args.generate, name + ".hex")
+            saveCapture(path, directives, description, chunks)
+            print(f"Written {path}")
+        return 0
+
+    if len(args.captures) > 0:
+        defaults = { "mode" : args.mode, "powermaster" : args.powermaster }
+        scenarios = []
+        for path in findCaptures(args.captures):
+            directives, chunks = loadCapture(path, defaults, args.chunk)
+            scenarios.append((os.path.splitext(os.path.basename(path))[0], directives, chunks))
+    else:
+        scenarios = [(name, directives, chunks) for name, directives, description, chunks in builtinScenarios()]
+
+    baseline = {}
+    if len(args.baseline) > 0:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        print(f"Baseline {args.baseline} from Python {baseline.get('python')} on {baseline.get('machine')}\n")
+
+    async def run():
+        # The protocol handler is created within the running event loop
+        for name, directives, chunks in scenarios:
+            results[name] = await benchmark(directives, chunks, max(1, args.repeat))
+            regressions.extend(report(name, results[name], baseline.get("captures", {}).get(name), args.tolerance))
+
+    results = {}
+    regressions = []
+    asyncio.run(run())
+
+    if len(args.save) > 0:
+        with open(args.save, "w") as f:
+            json.dump({ "python" : platform.python_version(), "machine" : platform.machine(), "captures" : results }, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if len(regressions) > 0:
+        print(f"{len(regressions)} regressions against the baseline (tolerance {args.tolerance * 100:.0f}%)")
+        for r in regressions:
+            print(f"    {r}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,7 @@ from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.util import slugify
+from homeassistant.util import dt as dt_util
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .pyconst import AlSensorDevice, AlSensorCondition
@@ -61,6 +62,26 @@ class VisonicImage(ImageEntity):
         self._attr_unique_id = slugify(self._name + "_image")
         self._attr_name = "Image"
         self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._name)})
+        self._client = client
+        self._entry_id = client.getEntryID()
+        self._frame = 0      # 0 shows the newest image and follows new images, 1 to n show the kept images with 1 the oldest
+
+    async def async_added_to_hass(self):
+        """Register to be told which kept image to show."""
+        await super().async_added_to_hass()
+        self.async_on_remove(async_dispatcher_connect(self.hass, f"{DOMAIN}_{self._entry_id}_{IMAGE_DOMAIN}_frame", self.async_show_frame))
+
+    @callback
+    def async_show_frame(self, device : int, frame : int):
+        """Show a kept image, the service call is sent to all the image entities of the panel."""
+        if self._visonic_device is not None and device == self._visonic_device.getDeviceID():
+            _LOGGER.debug(f"[async_show_frame] showing image {frame} of {self._client.getImageFrameCount(device)}")
+            self._frame = frame
+            if frame == 0:
+                self._sensor_image = self._visonic_device.jpg_data
+            # Change the last updated time so HA gets the image again
+            self._attr_image_last_updated = dt_util.utcnow()
+            self.async_write_ha_state()
 
     # Called when an entity is about to be removed from Home Assistant. Example use: disconnect from the server or unsubscribe from updates.
     async def async_will_remove_from_hass(self):
@@ -76,7 +97,7 @@ class VisonicImage(ImageEntity):
         # Update the current value based on the device state
         #_LOGGER.debug(f"   In Image VisonicSensor onchange {self._visonic_device}")
         if self._visonic_device is not None:
-            if s == AlSensorCondition.CAMERA and self._visonic_device.hasJPG:              # Camera update
+            if s == AlSensorCondition.CAMERA and self._visonic_device.hasJPG and self._frame == 0:    # Camera update
                 interval = timedelta(seconds=2)
                 if self._attr_image_last_updated is not None:
                     interval = self._visonic_device.jpg_time - self._attr_image_last_updated
@@ -96,11 +117,16 @@ class VisonicImage(ImageEntity):
         attr = {}
         attr[PANEL_ATTRIBUTE_NAME] = self._panel
         attr[DEVICE_ATTRIBUTE_NAME] = self._visonic_device.getDeviceID()
+        attr["image_frames"] = self._client.getImageFrameCount(self._visonic_device.getDeviceID())
+        attr["image_frame"] = self._frame
         return attr
 
     async def async_image(self) -> bytes | None:
         """Update the image if it is not cached."""
-        return self._sensor_image
+        if self._frame == 0 or self._visonic_device is None:
+            return self._sensor_image
+        # The kept images are not copied, when one has been moved to disk it is read in an executor
+        return await self._client.async_get_image_frame(self._visonic_device.getDeviceID(), self._frame - 1)
 
     @property
     def has_entity_name(self) -> bool:
@@ -54,6 +54,9 @@ TEXT_DOWNLOAD_TIMEOUT = "Download Timeout"
 TEXT_DL_MESSAGE_RETRIES = "Download Message Retries"
 TEXT_PROTOCOL_VERSION = "Protocol Version"
 TEXT_POWER_MASTER = "Power Master"
+TEXT_CRC_FAILURES = "CRC Failures"
+TEXT_RESENDS = "Message Resends"
+TEXT_RESPONSE_TIMEOUTS = "Response Timeouts"
 
 class AlIntEnum(int):
     ThisShouldNotHappen = "ThisShouldNotHappen"
@@ -168,6 +171,8 @@ class AlConfiguration(AlEnum):
 #    SirenTriggerList = AlIntEnum(5)       # A list of strings
     ForceStandard = AlIntEnum(6)          # Boolean
     DisableAllCommands = AlIntEnum(11)    # Boolean
+    EPROMCacheDir = AlIntEnum(12)         # Directory to save the downloaded EPROM to, "" to not save it
+    ImageCacheDir = AlIntEnum(13)         # Directory to move older camera images to when they don't fit in memory, "" to forget them
 a = AlConfiguration()
 
 # The set of panel modes
@@ -383,6 +388,8 @@ class AlLogPanelEvent:
 
 class AlSensorDevice(ABC):
 
+    __slots__ = ()
+
     @abstractmethod
     def __str__(self) -> str:
         return ""
@@ -466,9 +473,15 @@ class AlSensorDevice(ABC):
     def getRawSensorIdentifier(self) -> int:
         return None
 
+    # Return a number that changes whenever anything about the sensor changes, None when this is not supported
+    def getChangeVersion(self) -> int:
+        return None
+
 
 class AlSwitchDevice(ABC):
 
+    __slots__ = ()
+
     @abstractmethod
     def __str__(self):
         return ""
@@ -508,6 +521,8 @@ class PanelConfig(TypedDict):
     AlConfiguration.ForceStandard:        bool
     AlConfiguration.DisableAllCommands:   bool
     AlConfiguration.DownloadCode:         str
+    AlConfiguration.EPROMCacheDir:        str
+    AlConfiguration.ImageCacheDir:        str
 #    AlConfiguration.PluginLanguage:       str
     AlConfiguration.SirenTriggerList:     list[str]
 
@@ -626,6 +641,20 @@ class AlPanelInterface(ABC):
     def getJPG(self, device : int, count : int) -> AlCommandStatus:
         return AlCommandStatus.FAIL_ABSTRACT_CLASS_NOT_IMPLEMENTED
 
+    @abstractmethod
+    def getImageFrameCount(self, device : int) -> int:
+        return 0
+
+    # index 0 is the oldest image and -1 is the newest, it returns an ImageFrame or None
+    @abstractmethod
+    def getImageFrame(self, device : int, index : int):
+        return None
+
+    # The protocol counters (messages, bytes, resends, timeouts, checksums, queue depth and handler times) as a dictionary
+    @abstractmethod
+    def getProtocolMetrics(self) -> dict:
+        return {}
+
     @abstractmethod
     def dumpSensorsToStringList(self) -> list:
         return []
@@ -247,6 +247,16 @@ class Packet(IntEnum):
     FOOTER = 0x0A
     POWERLINK_TERMINAL = 0x43
 
+# The checksum calculation that matched when validating a received PDU
+@unique
+class ChecksumVariant(IntEnum):
+    INVALID   = 0     # Does not have a Packet.HEADER and Packet.FOOTER
+    FAILED    = 1     # None of the checksum calculations match
+    EXACT     = 2     # The standard checksum
+    ALT       = 3     # The alternative checksum (as used by the Powerlink 3.1 module)
+    PLUS_ONE  = 4     # The standard checksum plus 1
+    MINUS_ONE = 5     # The standard checksum minus 1
+
 # The list of text strings that appear in the getPanelStatusDict extended status attributes
 @unique
 class PANEL_STATUS(StrEnum):
@@ -32,6 +32,7 @@ if MicroPython is not None:
 else:
 #   import inspect as ipt  
     import logging
+    import binascii
 #   import datetime as dt
 #   from datetime import datetime, timedelta, timezone
 #   from typing import Callable, List
@@ -53,11 +54,11 @@ from collections import namedtuple
 try:
     from .pyenum import (EPROM, PanelTypeEnum)
     from .pyconst import (PanelConfig, EPROM_DOWNLOAD_ALL, NOBYPASSSTR, DISABLE_TEXT)
-    from .pyhelper import (toString)
+    from .pyhelper import (toString, isTraceEnabled, writeFileAtomic)
 except:
     from pyenum import (EPROM, PanelTypeEnum)
     from pyconst import (PanelConfig, EPROM_DOWNLOAD_ALL, NOBYPASSSTR, DISABLE_TEXT)
-    from pyhelper import (toString)
+    from pyhelper import (toString, isTraceEnabled, writeFileAtomic)
 
 ##############################################################################################################################################################################################################################################
 ##########################  EPROM Decode  ###################################################################################################################################################################################################
@@ -242,6 +243,47 @@ pmDecodePanelSettings = {                   #  show count  type     poff psize p
 }
 # 'show count type poff psize pstep pbitoff name values'
 
+# pmDecodePanelSettings compiled in to a decode plan, this is done once so the addresses, sizes, masks and value lookups are not worked out on every lookup
+#    starts    is a tuple of the absolute EPROM offsets, one for each of count
+#    size      is the number of bytes to read from each offset
+#    decode    is a function that converts the bytes at an offset to the value
+#    values    is the SettingsCommand values dictionary and ivalues has the same values keyed by int, for the decode functions that return an int
+DecodePlan = collections.namedtuple('DecodePlan', 'setting starts size decode values ivalues')
+
+def _decodeCode(v) -> str:
+    return v.hex().upper().replace("FF", ".")
+
+def _decodeString(v) -> str:
+    return bytes(v).replace(b"\xFF", b"").decode("latin-1").strip()
+
+pmDecodeType = {
+    "PHONE"   : lambda v : bytes(v).replace(b"\xFF", b"").hex(),
+    "TIME"    : lambda v : "".join("%02d:" % b for b in v)[:-1],        # miss the last character off, which will be a colon :
+    "CODE"    : _decodeCode,
+    "ACCOUNT" : _decodeCode,
+    "STRING"  : _decodeString,
+    "DATE"    : _decodeString,
+}
+
+def _compileDecodePlan(val : SettingsCommand) -> DecodePlan:
+    if val.type == "BYTE":
+        if val.psize > 8:
+            decode = bytearray                                               # copy it out of the EPROM image
+        elif val.psize == 8:
+            decode = lambda v : v[0]
+        else:
+            mask = (1 << val.psize) - 1
+            offset = val.pbitoff | 0
+            decode = lambda v : str((v[0] >> offset) & mask)
+    else:
+        decode = pmDecodeType.get(val.type, lambda v : "Not Set")
+    ivalues = { int(k) : v for k, v in val.values.items() if k.isdigit() and str(int(k)) == k }
+    return DecodePlan(val, tuple(val.poff + (ctr * val.pstep) for ctr in range(0, val.count)), 1 + ((val.psize - 1) // 8), decode, val.values, ivalues)
+
+pmDecodePlan = { key : _compileDecodePlan(val) for key, val in pmDecodePanelSettings.items() }
+pmDecodePlanShow = [ (key, p) for key, p in pmDecodePlan.items() if p.setting.show ]   # The settings that processEPROMData decodes
+pmDecodePlanBySetting = { id(p.setting) : p for p in pmDecodePlan.values() }
+
 
 ##############################################################################################################################################################################################################################################
 ##########################  EPROM Blocks to download #########################################################################################################################################################################################
@@ -282,47 +324,131 @@ for blk in pmBlockDownload_Short:
             l.append(bytearray([s & 0xFF, (s >> 8) & 0xFF, MAX_DOWNLOAD_BLOCK_SIZE if e - s >= MAX_DOWNLOAD_BLOCK_SIZE else e - s, 0]))
             s = s + MAX_DOWNLOAD_BLOCK_SIZE
     pmBlockDownload[blk] = l
+
+# The sentinel blocks are downloaded first when there is an EPROM cache and compared with it.
+#    They are the blocks with the panel serial number and panel type, and the first and last block of each range.
+EPROM_SERIAL_ADDR = pmDecodePanelSettings[EPROM.PANEL_SERIAL].poff
+EPROM_SERIAL_SIZE = 1 + ((pmDecodePanelSettings[EPROM.PANEL_SERIAL].psize - 1) // 8)
+pmSentinelBlocks = {}
+for blk in pmBlockDownload:
+    addr = [ pmDecodePanelSettings[EPROM.PANEL_SERIAL].poff, pmDecodePanelSettings[EPROM.PANEL_TYPE_CODE].poff ]
+    addr += [ d[0] for d in pmBlockDownload_Short[blk] ] + [ d[1] - 1 for d in pmBlockDownload_Short[blk] ]
+    pmSentinelBlocks[blk] = [ b for b in pmBlockDownload[blk] if any(b[0] + (b[1] << 8) <= a < b[0] + (b[1] << 8) + b[2] for a in addr) ]
 #for t in pmBlockDownload:
 #    print(t)
 #    for d in pmBlockDownload[t]:
 #        print(toString(d))
 
+# The number of times an individual block is requested before giving up on the download
+DOWNLOAD_BLOCK_RETRY_COUNT = 6
+# A block that keeps failing is split in half, down to this size
+MIN_DOWNLOAD_BLOCK_SIZE = 0x10
+
+class EPROMDownloadScheduler:
+    """ Schedule the requests for the EPROM blocks to download from the panel, one block is requested at a time.
+        A block that fails is requested again at the end, each block has its own retry count and is split in half after every second failure. """
+
+    def __init__(self, retries : int = DOWNLOAD_BLOCK_RETRY_COUNT):
+        self.retries = retries
+        self.start([])
+
+    def start(self, blocks : list):
+        """ Start again with this list of blocks (from EPROMManager.populatEPROMDownload) """
+        self._pending = collections.deque(blocks)
+        self._outstanding = {}       # (index, page) : block,  the block that has been requested and not yet received
+        self._attempts = {}          # (index, page) : the number of times that the block has failed
+
+    def update(self, blocks : list):
+        """ Replace the blocks still to request, the outstanding block is kept """
+        self._pending = collections.deque(b for b in blocks if (b[0], b[1]) not in self._outstanding)
+
+    def isComplete(self) -> bool:
+        return len(self._pending) == 0 and len(self._outstanding) == 0
+
+    def isOutstanding(self, index : int, page : int) -> bool:
+        """ Return True when the block has been requested and not yet received """
+        return (index, page) in self._outstanding
+
+    def next(self) -> bytearray | None:
+        """ Return the block to request now, None when there is nothing to request or a block is already outstanding """
+        if len(self._pending) == 0 or len(self._outstanding) > 0:
+            return None
+        b = self._pending.popleft()
+        self._outstanding[(b[0], b[1])] = b
+        return b
+
+    def received(self, index : int, page : int, length : int) -> bool:
+        """ Return True when the block has been requested and it is the requested length """
+        b = self._outstanding.get((index, page))
+        if b is None or b[2] != length:
+            return False
+        del self._outstanding[(index, page)]
+        return True
+
+    def failed(self, index : int, page : int) -> bool:
+        """ The outstanding block was not received correctly so request it again, return False when it has failed too many times """
+        b = self._outstanding.pop((index, page))
+        attempts = self._attempts.get((index, page), 0) + 1
+        if attempts > self.retries:
+            return False
+        self._attempts[(index, page)] = attempts
+        if attempts % 2 == 0 and b[2] >= 2 * MIN_DOWNLOAD_BLOCK_SIZE:
+            # The panel keeps getting this one wrong, ask for it in 2 smaller blocks
+            half = b[2] // 2
+            addr = (page << 8) + index + half
+            self._pending.append(bytearray([index, page, half, 0]))
+            self._pending.append(bytearray([addr & 0xFF, (addr >> 8) & 0xFF, b[2] - half, 0]))
+            self._attempts[(addr & 0xFF, (addr >> 8) & 0xFF)] = attempts
+        else:
+            self._pending.append(b)
+        return True
+
+
+EPROM_PAGE_SIZE = 0x100
+EPROM_SIZE = 0x100 * EPROM_PAGE_SIZE     # 256 pages of 256 bytes, 64 KiB
+
+# The EPROM cache files are saved as EPROM_CACHE_PREFIX + <panel serial in hex> + ".bin"
+#    header: magic (4) version (1) panel type (1) model type (1) reserved (1) panel serial (6) crc32 of the store (4)
+#    followed by the store: the EPROM image and the downloaded map
+EPROM_CACHE_PREFIX = "visonic_eprom_"
+EPROM_CACHE_MAGIC = b"VEPR"
+EPROM_CACHE_VERSION = 1
+EPROM_CACHE_HEADER_SIZE = 18
+
+# The user, master, installer, download and duress codes are not saved in the cache file. They are set to 0xFF and marked as not downloaded,
+#    so the blocks that hold them are always downloaded from the panel
+EPROM_CACHE_MASKED = tuple( (start, start + plan.size)
+                            for plan in (pmDecodePlan[k] for k in (EPROM.USERCODE_MAX, EPROM.USERCODE_MAS, EPROM.MASTERCODE, EPROM.INSTALLERCODE, EPROM.MASTERDLCODE, EPROM.INSTALDLCODE, "duress"))
+                            for start in plan.starts )
 
 class EPROMManager:
 
     def __init__(self):
         # Save the EPROM data when downloaded
+        #    The store is a flat EPROM image of EPROM_SIZE bytes followed by a downloaded map of EPROM_SIZE bytes (non zero when that byte of the image has been downloaded)
+        self._store = bytearray(2 * EPROM_SIZE)
+        self._cachedir = None
+        self._cached = {}              # The EPROM cache files, keyed by panel serial number
+        self._cacheChecked = False
         self.reset()
+        self._image = memoryview(self._store)[:EPROM_SIZE]   # reads are returned as slices of this, they do not copy the data
 
     def reset(self):  
-        self.pmRawSettings = {}
+        self._store[:EPROM_SIZE] = b"\xFF" * EPROM_SIZE         # Not downloaded bytes read as 0xFF
+        self._store[EPROM_SIZE:] = bytes(EPROM_SIZE)
         self.pmDownloadComplete = False
-        self.lastSavedPages = set();
-
-    def findLength(self, page, index) -> int | None:
-        for b in pmBlockDownload[PanelTypeEnum.POWER_MAX]:
-            if b[0] == index and b[1] == page:
-                return b[2]
-        for b in pmBlockDownload[PanelTypeEnum.POWER_MASTER]:
-            if b[0] == index and b[1] == page:
-                return b[2]
-        return None
+        self.lastSaved = None                                  # (start, end) of the last saved setting
+        self._cacheChecked = False
+
+    def _isDownloaded(self, start : int, length : int) -> bool:
+        end = start + length
+        return end <= EPROM_SIZE and self._store.find(b"\x00", EPROM_SIZE + start, EPROM_SIZE + end) < 0
 
     def _validatEPROMSettingsBlock(self, block) -> bool:
-        page = block[1]
-        index = block[0]
-        settings_len = block[2]
-
-        retlen = settings_len
-        retval = bytearray()
-        while page in self.pmRawSettings and retlen > 0:
-            rawset = self.pmRawSettings[page][index : index + retlen]
-            retval = retval + rawset
-            page += 1
-            retlen = retlen - len(rawset)
-            index = 0
-        log.debug(f"[_validatEPROMSettingsBlock]    page {block[1]:>3}   index {block[0]:>3}   length {block[2]:>3}     {'Already Got It' if settings_len == len(retval) else 'Not Got It'}")
-        return settings_len == len(retval)
+        retval = self._isDownloaded((block[1] * EPROM_PAGE_SIZE) + block[0], block[2])
+        if isTraceEnabled(log):
+            log.debug(f"[_validatEPROMSettingsBlock]    page {block[1]:>3}   index {block[0]:>3}   length {block[2]:>3}     {'Already Got It' if retval else 'Not Got It'}")
+        return retval
 
     def populatEPROMDownload(self, isPowerMaster):
         """ Populate the EPROM Download List """
@@ -344,13 +470,19 @@ class EPROMManager:
             # lenMaster = len(pmBlockDownload[PanelTypeEnum.POWER_MASTER])
             # log.debug(f"lenMax = {lenMax}   lenMaster = {lenMaster}")
 
+            # When there's an EPROM cache to check, download the sentinel blocks first
+            sentinels = self._sentinelBlocks(isPowerMaster)
+            for block in sentinels:
+                if not self._validatEPROMSettingsBlock(block):
+                    myDownloadList.append(block)
+
             if isPowerMaster:
                 for block in pmBlockDownload[PanelTypeEnum.POWER_MASTER]:
-                    if not self._validatEPROMSettingsBlock(block):
+                    if block not in sentinels and not self._validatEPROMSettingsBlock(block):
                         myDownloadList.append(block)
             else:
                 for block in pmBlockDownload[PanelTypeEnum.POWER_MAX]:
-                    if not self._validatEPROMSettingsBlock(block):
+                    if block not in sentinels and not self._validatEPROMSettingsBlock(block):
                         myDownloadList.append(block)
 
         self.pmDownloadComplete = len(myDownloadList) == 0
@@ -361,83 +493,45 @@ class EPROMManager:
     # This function stores the downloaded status and EPROM data
     def saveEPROMSettings(self, page, index, setting):
         settings_len = len(setting)
-        wrappoint = index + settings_len - 0x100
-        sett = [bytearray(b""), bytearray(b"")]
-        saved = set()  # empty set
 
         #log.debug(f"[Write Settings]   Entering Function  page {page}   index {index}    length {settings_len}")
         if settings_len > 0xB1:
             log.debug("[Write Settings] ********************* Write Settings too long ********************")
             return
 
-        if wrappoint > 0:
-            # log.debug("[Write Settings] The write settings data is Split across 2 pages")
-            sett[0] = setting[: settings_len - wrappoint]  # bug fix in 0.0.6, removed the -1
-            sett[1] = setting[settings_len - wrappoint :]
-            # log.debug(f"[Write Settings]         Wrapping  original len {len(setting)}   left len {len(sett[0])}   right len {len(sett[1])}")
-            wrappoint = 1
-        else:
-            sett[0] = setting
-            wrappoint = 0
-
-        for i in range(0, wrappoint + 1):
-            if (page + i) not in self.pmRawSettings:
-                self.pmRawSettings[page + i] = bytearray()
-                for dummy in range(0, 256):
-                    self.pmRawSettings[page + i].append(255)
-                if len(self.pmRawSettings[page + i]) != 256:
-                    log.debug(f"[Write Settings] the EPROM settings is incorrect for page {page + i}")
-                # else:
-                #    log.debug("[Write Settings] WHOOOPEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEE")
-
-            settings_len = len(sett[i])
-            if i == 1:
-                index = 0
-            #log.debug(f"[Write Settings]         Writing settings page {page+i}  index {index}    length {settings_len}")
-            self.pmRawSettings[page + i] = self.pmRawSettings[page + i][0:index] + sett[i] + self.pmRawSettings[page + i][index + settings_len :]
-            saved.add(page + i)
-            #if len(self.pmRawSettings[page + i]) != 256:
-            #    log.debug(f"[Write Settings] OOOOOOOOOOOOOOOOOOOO len = {len(self.pmRawSettings[page + i])}")
-            # else:
-            #    log.debug(f"[Write Settings] Page {page+i} is now {toString(self.pmRawSettings[page + i])}")
-
-        self.lastSavedPages = saved   # The last set of saved pages
-        #log.debug(f"[Write Settings]    The last set of saved pages {self.lastSavedPages}")
+        # The image is flat so a setting that is split across 2 pages is written in one go
+        start = (page * EPROM_PAGE_SIZE) + index
+        end = min(start + settings_len, EPROM_SIZE)
+        #log.debug(f"[Write Settings]         Writing settings page {page}  index {index}    length {settings_len}")
+        self._image[start:end] = memoryview(setting)[:end - start]
+        self._store[EPROM_SIZE + start : EPROM_SIZE + end] = b"\x01" * (end - start)
+
+        self.lastSaved = (start, end)   # The last saved setting
+        #log.debug(f"[Write Settings]    The last saved setting {self.lastSaved}")
 
     def removeLastSaved(self):
-        if len(self.lastSavedPages) > 0:
+        if self.lastSaved is not None:
             self.pmDownloadComplete = False
-            for s in self.lastSavedPages:
-                if s in self.pmRawSettings:   # just to make sure
-                    del self.pmRawSettings[s]
-            self.lastSavedPages = set()       # just in case this function is called again
+            start, end = self.lastSaved
+            self._image[start:end] = b"\xFF" * (end - start)
+            self._store[EPROM_SIZE + start : EPROM_SIZE + end] = bytes(end - start)
+            self.lastSaved = None             # just in case this function is called again
 
     # _readEPROMSettingsPageIndex
     # This function retrieves the downloaded status and EPROM data
-    def _readEPROMSettingsPageIndex(self, page, index, settings_len):
-        retlen = settings_len
-        retval = bytearray()
-        while index > 255:
-            page += 1
-            index = index - 256
+    #    The data is returned as a memoryview of the EPROM image, copy it if it is kept
+    def _readEPROMSettingsPageIndex(self, page, index, settings_len) -> memoryview | bytes:
+        start = (page * EPROM_PAGE_SIZE) + index      # index can be more than 255 and run on to the following pages
 
         if self.pmDownloadComplete:
             #log.debug(f"[_readEPROMSettingsPageIndex]    Entering Function  page {page}   index {index}    length {settings_len}")
-            while page in self.pmRawSettings and retlen > 0:
-                rawset = self.pmRawSettings[page][index : index + retlen]
-                retval = retval + rawset
-                page += 1
-                retlen = retlen - len(rawset)
-                index = 0
-            if settings_len == len(retval):
-                return retval
-        log.debug(f"[_readEPROMSettingsPageIndex]     Sorry but you havent downloaded that part of the EPROM data     page={hex(page)} index={hex(index)} length={settings_len}")
-
-        # return a bytearray filled with 0xFF values
-        retval = bytearray()
-        for dummy in range(0, settings_len):
-            retval.append(255)
-        return retval
+            if self._isDownloaded(start, settings_len):
+                return self._image[start : start + settings_len]
+        if isTraceEnabled(log):
+            log.debug(f"[_readEPROMSettingsPageIndex]     Sorry but you havent downloaded that part of the EPROM data     page={hex(start // EPROM_PAGE_SIZE)} index={hex(start % EPROM_PAGE_SIZE)} length={settings_len}")
+
+        # return data filled with 0xFF values
+        return b"\xFF" * settings_len
 
     # this can be called from an entry in pmDownloadItem_t such as
     #      page index lenhigh lenlow
@@ -448,14 +542,115 @@ class EPROMManager:
     def _dumpEPROMSettings(self):
         log.debug("Dumping EPROM Settings")
         for p in range(0, 0x100):  ## assume page can go from 0 to 255
-            if p in self.pmRawSettings:
-                for j in range(0, 0x100, 0x10):  ## assume that each page can be 256 bytes long, step by 16 bytes
+            if self._store.find(b"\x01", EPROM_SIZE + (p * EPROM_PAGE_SIZE), EPROM_SIZE + ((p + 1) * EPROM_PAGE_SIZE)) >= 0:
+                for j in range(0, 0x100, 0x10):  ## each page is 256 bytes long, step by 16 bytes
                     # do not display the rows with pin numbers
                     # if not (( p == 1 and j == 240 ) or (p == 2 and j == 0) or (p == 10 and j >= 140)):
                     if EPROM_DOWNLOAD_ALL or ((p != 1 or j != 240) and (p != 2 or j != 0) and (p != 10 or j <= 140)):
-                        if j <= len(self.pmRawSettings[p]):
-                            s = toString(self.pmRawSettings[p][j : j + 0x10])
-                            log.debug(f"{p:3}:{j:3}  {s}")
+                        s = toString(self._image[(p * EPROM_PAGE_SIZE) + j : (p * EPROM_PAGE_SIZE) + j + 0x10])
+                        log.debug(f"{p:3}:{j:3}  {s}")
+
+    ##########################################################################################################################################
+    # The EPROM cache. After a successful download the EPROM image is saved to a file named with the panel serial number.
+    #    When the download is next started the sentinel blocks are downloaded first, these hold the panel serial and the panel type.
+    #    If they are the same as those in a cache file (and the panel type and model are the same) then the rest of the blocks are
+    #    loaded from the cache file instead of being downloaded from the panel.
+    #    The functions that access the file system (loadCacheFiles and saveCacheFile) block so call them from an executor.
+#    The codes are not saved in the cache file, see EPROM_CACHE_MASKED.
+    def setCacheDir(self, cachedir : str | None):
+        self._cachedir = cachedir if cachedir else None
+
+    def _cacheSerial(self, image) -> bytes | None:
+        serial = bytes(image[EPROM_SERIAL_ADDR : EPROM_SERIAL_ADDR + EPROM_SERIAL_SIZE])
+        if serial == b"\xFF" * EPROM_SERIAL_SIZE or serial == bytes(EPROM_SERIAL_SIZE):
+            return None
+        return serial
+
+    def _sentinelBlocks(self, isPowerMaster) -> list:
+        blocks = pmSentinelBlocks[PanelTypeEnum.POWER_MASTER if isPowerMaster else PanelTypeEnum.POWER_MAX]
+        return blocks if len(self._cached) > 0 and not self._cacheChecked else []
+
+    def loadCacheFiles(self):
+        """ Read the EPROM cache files from the cache directory, this blocks """
+        self._cached = {}
+        if self._cachedir is None or not os.path.isdir(self._cachedir):
+            return
+        for name in os.listdir(self._cachedir):
+            if name.startswith(EPROM_CACHE_PREFIX) and name.endswith(".bin"):
+                try:
+                    with open(os.path.join(self._cachedir, name), "rb") as f:
+                        data = f.read()
+                    if len(data) != EPROM_CACHE_HEADER_SIZE + (2 * EPROM_SIZE) or data[0:4] != EPROM_CACHE_MAGIC or data[4] != EPROM_CACHE_VERSION:
+                        log.debug(f"[loadCacheFiles] Ignoring EPROM cache file {name}, the format is not recognised")
+                        continue
+                    if binascii.crc32(memoryview(data)[EPROM_CACHE_HEADER_SIZE:]) != int.from_bytes(data[14:18], "little"):
+                        log.debug(f"[loadCacheFiles] Ignoring EPROM cache file {name}, the checksum is incorrect")
+                        continue
+                    serial = bytes(data[8:14])
+                    self._cached[serial] = data
+                    log.debug(f"[loadCacheFiles] Loaded EPROM cache file {name}   panel type {data[5]}   model type {data[6]}")
+                except Exception as ex:
+                    log.debug(f"[loadCacheFiles] Unable to read EPROM cache file {name} : {ex}")
+
+    def cacheSnapshot(self, panelType : int | None, modelType : int | None) -> tuple[str, bytes] | None:
+        """ Return the cache filename and file contents for the downloaded EPROM, call it from the event loop so the EPROM is not changed while it is copied """
+        if self._cachedir is None or not self.pmDownloadComplete:
+            return None
+        if (serial := self._cacheSerial(self._image)) is None:
+            log.debug("[cacheSnapshot] Not saving the EPROM cache as the panel serial number has not been downloaded")
+            return None
+        store = bytearray(self._store)
+        for start, end in EPROM_CACHE_MASKED:
+            store[start:end] = b"\xFF" * (end - start)
+            store[EPROM_SIZE + start : EPROM_SIZE + end] = bytes(end - start)
+        header = bytearray(EPROM_CACHE_MAGIC)
+        header += bytes([EPROM_CACHE_VERSION, 0xFF if panelType is None else panelType & 0xFF, 0xFF if modelType is None else modelType & 0xFF, 0])
+        header += serial
+        header += binascii.crc32(store).to_bytes(4, "little")
+        return os.path.join(self._cachedir, EPROM_CACHE_PREFIX + serial.hex() + ".bin"), bytes(header + store)
+
+    @staticmethod
+    def saveCacheFile(filename : str, data : bytes):
+        """ Save a cacheSnapshot to the cache file, this blocks and raises OSError when it fails """
+        os.makedirs(os.path.dirname(filename), exist_ok = True)
+        writeFileAtomic(filename, data)
+
+    def checkCache(self, panelType : int | None, modelType : int | None, isPowerMaster : bool) -> bool:
+        """ When the sentinel blocks have been downloaded, compare them with the cache.
+            Return True when the remaining blocks have been loaded from the cache """
+        sentinels = self._sentinelBlocks(isPowerMaster)
+        if len(sentinels) == 0 or not all(self._validatEPROMSettingsBlock(block) for block in sentinels):
+            return False
+        self._cacheChecked = True
+
+        serial = self._cacheSerial(self._image)
+        cached = self._cached.get(serial) if serial is not None else None
+        if cached is None:
+            log.debug("[checkCache] There is no EPROM cache for this panel, downloading all of the EPROM")
+            return False
+        cachedType = cached[5]
+        cachedModel = cached[6]
+        image = memoryview(cached)[EPROM_CACHE_HEADER_SIZE : EPROM_CACHE_HEADER_SIZE + EPROM_SIZE]
+        if (panelType is not None and (panelType & 0xFF) != cachedType) or (modelType is not None and (modelType & 0xFF) != cachedModel):
+            log.debug(f"[checkCache] The EPROM cache is for a different panel type {cachedType} {cachedModel}, downloading all of the EPROM")
+            return False
+        for block in sentinels:
+            start = (block[1] * EPROM_PAGE_SIZE) + block[0]
+            if image[start : start + block[2]] != self._image[start : start + block[2]]:
+                log.debug(f"[checkCache] The EPROM has changed since it was cached (page {block[1]} index {block[0]}), downloading all of the EPROM")
+                return False
+
+        # The panel matches the cache, so copy in the blocks that have not been downloaded
+        loaded = 0
+        for block in pmBlockDownload[PanelTypeEnum.POWER_MASTER if isPowerMaster else PanelTypeEnum.POWER_MAX]:
+            start = (block[1] * EPROM_PAGE_SIZE) + block[0]
+            end = start + block[2]
+            if not self._isDownloaded(start, block[2]) and cached.find(b"\x00", EPROM_CACHE_HEADER_SIZE + EPROM_SIZE + start, EPROM_CACHE_HEADER_SIZE + EPROM_SIZE + end) < 0:
+                self._image[start:end] = image[start:end]
+                self._store[EPROM_SIZE + start : EPROM_SIZE + end] = b"\x01" * block[2]
+                loaded += 1
+        log.debug(f"[checkCache] The EPROM is the same as the cache, loaded {loaded} blocks from the cache")
+        return loaded > 0
 
     def _calcBoolFromIntMask(self, val, mask) -> bool:
         return True if val & mask != 0 else False
@@ -463,84 +658,41 @@ class EPROMManager:
     # SettingsCommand = collections.namedtuple('SettingsCommand', 'show count type poff psize pstep pbitoff name values')
     def lookupEprom(self, ref : EPROM | SettingsCommand | str , expected_size : int = -1 ):
         
-        val : SettingsCommand = None 
+        plan : DecodePlan = None 
         
         if isinstance(ref, SettingsCommand):
-            val = ref
-        elif isinstance(ref, EPROM) and ref in pmDecodePanelSettings:
-            val = pmDecodePanelSettings[ref]
-        elif isinstance(ref, str) and ref in pmDecodePanelSettings:
-            val = pmDecodePanelSettings[ref]
+            plan = pmDecodePlanBySetting.get(id(ref)) or _compileDecodePlan(ref)
+        elif isinstance(ref, (EPROM, str)):
+            plan = pmDecodePlan.get(ref)
 
-        retval = []
-
-        if val is None:
+        if plan is None:
             log.warning("EPROM Lookup Error: cannot find EPROM setting in the download")
-            retval.append("Not Found")
-            retval.append("Not Found As Well")
-            return retval
+            return ["Not Found", "Not Found As Well"]
         
-        if expected_size >= 0 and val.count != expected_size:
-            log.warning(f"EPROM Lookup Error: expected size is not found, should be {expected_size}  but it is {val.count}")
-            retval.append("Not Found")
-            retval.append("Not Found As Well")
-            return retval
-
-        for ctr in range(0, val.count):
-            addr = val.poff + (ctr * val.pstep)
-            page = math.floor(addr / 0x100)
-            pos = addr % 0x100
-
-            myvalue = ""
-
-            size = 1 + ((val.psize - 1) // 8)
-
-            if val.type == "BYTE":
-                #log.debug(f"[lookupEprom] A {val}")
-                v = self._readEPROMSettingsPageIndex(page, pos, size)
-                #log.debug(f"[lookupEprom] B {v}")
-                if val.psize > 8:
-                    myvalue = v
-                elif val.psize == 8:
-                    myvalue = v[0]
-                else:
-                    mask = (1 << val.psize) - 1
-                    offset = val.pbitoff | 0
-                    myvalue = str((v[0] >> offset) & mask)
-
-            elif val.type == "PHONE":
-                for j in range(0, size):
-                    nr = self._readEPROMSettingsPageIndex(page, pos + j, 1)
-                    if nr[0] != 0xFF:
-                        myvalue = myvalue + "".join("%02x" % b for b in nr)
-            elif val.type == "TIME":
-                t = self._readEPROMSettingsPageIndex(page, pos, size)
-                myvalue = "".join("%02d:" % b for b in t)[:-1]  # miss the last character off, which will be a colon :
-            elif val.type == "CODE" or val.type == "ACCOUNT":
-                nr = self._readEPROMSettingsPageIndex(page, pos, size)
-                myvalue = "".join("%02x" % b for b in nr).upper()
-                myvalue = myvalue.replace("FF", ".")
-            elif val.type == "STRING" or val.type == "DATE":
-                for j in range(0, size):
-                    nr = self._readEPROMSettingsPageIndex(page, pos + j, 1)
-                    #log.debug(f"[lookupEprom] {page} {pos+j}  character {nr}   {chr(nr[0])}")
-                    if nr[0] != 0xFF:
-                        myvalue = myvalue + chr(nr[0])
-                #log.debug(f"[lookupEprom] myvalue  <{myvalue}>")
-                myvalue = myvalue.strip()
-                #log.debug(f"[lookupEprom] myvalue stripped <{myvalue}>")
+        if expected_size >= 0 and len(plan.starts) != expected_size:
+            log.warning(f"EPROM Lookup Error: expected size is not found, should be {expected_size}  but it is {len(plan.starts)}")
+            return ["Not Found", "Not Found As Well"]
+
+        return self._decodePlan(plan)
+
+    def _decodePlan(self, plan : DecodePlan) -> list:
+        # The bytes that have not been downloaded are 0xFF in the image, when the download is not complete then all bytes read as 0xFF
+        image = self._image if self.pmDownloadComplete else None
+        size = plan.size
+        decode = plan.decode
+        retval = []
+        for start in plan.starts:
+            if image is not None and start + size <= EPROM_SIZE:
+                myvalue = decode(image[start : start + size])
             else:
-                myvalue = "Not Set"
-
-            if len(val.values) > 0:
-                if isinstance(myvalue, int) and str(myvalue) in val.values:
-                    retval.append(val.values[str(myvalue)])
-                elif isinstance(myvalue, str) and myvalue in val.values:
-                    retval.append(val.values[myvalue])
-                elif isinstance(myvalue, list):
-                    for v in myvalue:
-                        if v in val.values:
-                            retval.append(val.values[v])
+                myvalue = decode(b"\xFF" * size)
+
+            if len(plan.values) > 0:
+                if isinstance(myvalue, int):
+                    if myvalue in plan.ivalues:
+                        retval.append(plan.ivalues[myvalue])
+                elif isinstance(myvalue, str) and myvalue in plan.values:
+                    retval.append(plan.values[myvalue])
             else:
                 retval.append(myvalue)
 
@@ -559,47 +711,46 @@ class EPROMManager:
         #      Add all (either PowerMax / PowerMaster) values to the self.Panelstatus and the log file
         PanelStatus : dict = {}
         addToLog = False
-        for key in pmDecodePanelSettings:
-            val = pmDecodePanelSettings[key]
-            if val.show:
-                result = self.lookupEprom(val)
-                if result is not None:
-                    if type(val.name) is str and len(result) == 1:
+        for key, plan in pmDecodePlanShow:
+            val = plan.setting
+            result = self._decodePlan(plan)
+            if result is not None:
+                if type(val.name) is str and len(result) == 1:
+                    if isinstance(result[0], (bytes, bytearray)):
+                        tmpdata = toString(result[0])
+                        if addToLog:
+                            log.debug(f"[processEPROMData]      {key:<18}  {val.name:<40}  {tmpdata}")
+                        PanelStatus[val.name] = tmpdata
+                    else:
+                        if addToLog:
+                            log.debug(f"[processEPROMData]      {key:<18}  {val.name:<40}  {result[0]}")
+                        PanelStatus[val.name] = result[0]
+
+                elif type(val.name) is list and len(result) == len(val.name):
+                    for i in range(0, len(result)):
                         if isinstance(result[0], (bytes, bytearray)):
-                            tmpdata = toString(result[0])
+                            tmpdata = toString(result[i])
                             if addToLog:
-                                log.debug(f"[processEPROMData]      {key:<18}  {val.name:<40}  {tmpdata}")
-                            PanelStatus[val.name] = tmpdata
+                                log.debug(f"[processEPROMData]      {key:<18}  {val.name[i]:<40}  {tmpdata}")
+                            PanelStatus[val.name[i]] = tmpdata
                         else:
                             if addToLog:
-                                log.debug(f"[processEPROMData]      {key:<18}  {val.name:<40}  {result[0]}")
-                            PanelStatus[val.name] = result[0]
-
-                    elif type(val.name) is list and len(result) == len(val.name):
-                        for i in range(0, len(result)):
-                            if isinstance(result[0], (bytes, bytearray)):
-                                tmpdata = toString(result[i])
-                                if addToLog:
-                                    log.debug(f"[processEPROMData]      {key:<18}  {val.name[i]:<40}  {tmpdata}")
-                                PanelStatus[val.name[i]] = tmpdata
-                            else:
-                                if addToLog:
-                                    log.debug(f"[processEPROMData]      {key:<18}  {val.name[i]:<40}  {result[i]}")
-                                PanelStatus[val.name[i]] = result[i]
-
-                    elif len(result) > 1 and type(val.name) is str:
-                        tmpdata = ""
-                        for i in range(0, len(result)):
-                            if isinstance(result[0], (bytes, bytearray)):
-                                tmpdata = tmpdata + toString(result[i]) + ", "
-                            else:
-                                tmpdata = tmpdata + str(result[i]) + ", "
-                        # there's at least 2 so this will not exception
-                        tmpdata = tmpdata[:-2]
-                        if addToLog:
-                            log.debug(f"[processEPROMData]      {key:<18}  {val.name:<40}  {tmpdata}")
-                        PanelStatus[val.name] = tmpdata
+                                log.debug(f"[processEPROMData]      {key:<18}  {val.name[i]:<40}  {result[i]}")
+                            PanelStatus[val.name[i]] = result[i]
 
-                    else:
-                        log.debug(f"[processEPROMData]   ************************** NOTHING DONE ************************     {key:<18}  {val.name}  {result}")
+                elif len(result) > 1 and type(val.name) is str:
+                    tmpdata = ""
+                    for i in range(0, len(result)):
+                        if isinstance(result[0], (bytes, bytearray)):
+                            tmpdata = tmpdata + toString(result[i]) + ", "
+                        else:
+                            tmpdata = tmpdata + str(result[i]) + ", "
+                    # there's at least 2 so this will not exception
+                    tmpdata = tmpdata[:-2]
+                    if addToLog:
+                        log.debug(f"[processEPROMData]      {key:<18}  {val.name:<40}  {tmpdata}")
+                    PanelStatus[val.name] = tmpdata
+
+                else:
+                    log.debug(f"[processEPROMData]   ************************** NOTHING DONE ************************     {key:<18}  {val.name}  {result}")
         return PanelStatus
@@ -36,6 +36,9 @@ else:
     from abc import abstractmethod
     from datetime import datetime, timedelta, timezone
     from typing import Callable, List, TypedDict
+    from functools import partial
+    from asyncio.staggered import staggered_race
+    import tempfile
 
     # get the current date and time
     def _getUTCTime() -> datetime:
@@ -47,11 +50,15 @@ else:
 import sys
 import time
 import math
+import io
 import json
+import hashlib
 import asyncio
 import re
+import socket
 import inspect
 from inspect import currentframe, getframeinfo, stack
+import bisect
 import collections
 from collections import namedtuple
 
@@ -59,12 +66,12 @@ try:
     from .pyconst import (AlIntEnum, NO_DELAY_SET, PanelConfig, AlPanelMode, AlPanelCommand, AlPanelStatus, AlTroubleType, AlPanelEventData,
                           AlAlarmType, AlSensorCondition, AlCommandStatus, AlX10Command, AlCondition, AlPanelInterface, AlSensorDevice, 
                           AlLogPanelEvent, AlSensorType, AlSwitchDevice, TEXT_PANEL_MODEL, TEXT_POWER_MASTER)
-    from .pyenum import EVENT_TYPE, EventDataEnum
+    from .pyenum import EVENT_TYPE, EventDataEnum, Packet, ChecksumVariant
 except:
     from pyconst import (AlIntEnum, NO_DELAY_SET, PanelConfig, AlPanelMode, AlPanelCommand, AlPanelStatus, AlTroubleType, AlPanelEventData,
                          AlAlarmType, AlSensorCondition, AlCommandStatus, AlX10Command, AlCondition, AlPanelInterface, AlSensorDevice, 
                          AlLogPanelEvent, AlSensorType, AlSwitchDevice, TEXT_PANEL_MODEL, TEXT_POWER_MASTER)
-    from pyenum import EVENT_TYPE, EventDataEnum
+    from pyenum import EVENT_TYPE, EventDataEnum, Packet, ChecksumVariant
 
 
 # The reasons to cancel the siren
@@ -230,6 +237,23 @@ def capitalize(s):
 def titlecase(s):
     return re.sub(r"[A-Za-z]+('[A-Za-z]+)?", lambda word: capitalize(word.group(0)), s)
 
+# Write the data to a uniquely named temporary file in the same directory and then rename it, so a partly written file is never left
+#    and writers of the same file at the same time do not share a temporary file. This blocks so run it in an executor.
+def writeFileAtomic(filename : str, data : bytes):
+    with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(os.path.abspath(filename)), prefix=os.path.basename(filename) + ".", suffix=".tmp", delete=False) as f:
+        tmpname = f.name
+        try:
+            f.write(data)
+        except Exception:
+            f.close()
+            os.remove(tmpname)
+            raise
+    try:
+        os.replace(tmpname, filename)
+    except Exception:
+        os.remove(tmpname)
+        raise
+
 # get the current date and time
 def getTimeFunction() -> datetime:
     return datetime.now(timezone.utc).astimezone()
@@ -286,10 +310,71 @@ class vloggerclass:
 log = mylog
 #log = vloggerclass(mylog, 0, False)
 
+# Protocol tracing is the debug logging of every PDU as it is sent and received, and of the data within it. It follows the log level of the logger.
+def isTraceEnabled(logger) -> bool:
+    """ Return True when a protocol trace debug message would be output by the logger.
+        Use it to guard debug messages in the hot paths so the f-strings (and the toString calls) are not created just to be thrown away """
+    if MicroPython is not None:
+        return logger.getEffectiveLevel() <= logging.DEBUG
+    return logger.isEnabledFor(logging.DEBUG)
+
+# Changes to the sensors, switches and panel are collected and sent to the host once, when the packet from the panel has been processed.
+#    A change made outside of a packet is sent when this window (in seconds) has expired.
+NOTIFY_WINDOW = 0.05
+
+# The sensor conditions that are not collected but are sent straight away (after those that have been collected so the order is kept).
+#    STATE also carries the momentary triggered value of a motion sensor so it cannot wait.
+NOTIFY_IMMEDIATE_SENSOR = { AlSensorCondition.STATE, AlSensorCondition.TAMPER, AlSensorCondition.FIRE, AlSensorCondition.EMERGENCY, AlSensorCondition.PANIC, AlSensorCondition.CAMERA }
+
+# The status flags of a sensor, these are the bits of AlSensorDeviceHelper.flags
+SENSOR_FLAG_ENROLLED  = 0x0001
+SENSOR_FLAG_BYPASS    = 0x0002
+SENSOR_FLAG_LOWBATT   = 0x0004
+SENSOR_FLAG_STATUS    = 0x0008
+SENSOR_FLAG_TAMPER    = 0x0010
+SENSOR_FLAG_ZTAMPER   = 0x0020
+SENSOR_FLAG_ZTRIP     = 0x0040
+SENSOR_FLAG_TRIGGERED = 0x0080
+SENSOR_FLAG_MISSING   = 0x0100
+SENSOR_FLAG_ONE_WAY   = 0x0200
+SENSOR_FLAG_INACTIVE  = 0x0400
+SENSOR_FLAG_HASJPG    = 0x0800
+
+# The flags that are part of the sensor equality test
+SENSOR_FLAGS_EQ = ( SENSOR_FLAG_ENROLLED | SENSOR_FLAG_BYPASS | SENSOR_FLAG_LOWBATT | SENSOR_FLAG_STATUS | SENSOR_FLAG_TAMPER |
+                    SENSOR_FLAG_ZTAMPER | SENSOR_FLAG_ZTRIP | SENSOR_FLAG_TRIGGERED | SENSOR_FLAG_HASJPG )
+
+def _sensorFlagProperty(flag : int) -> property:
+    # A bool attribute of the sensor that is held as a bit in the flags
+    def getter(self) -> bool:
+        return self.flags & flag != 0
+    def setter(self, val : bool):
+        self._setFlag(flag, val)
+    return property(getter, setter)
+
 class AlSensorDeviceHelper(AlSensorDevice):
 
+    __slots__ = ( "_callback", "_notifier", "id", "stype", "ztypeName", "sid", "ztype", "zname", "zpanelname", "zchime", "zchimeref", "partition", "flags", "version",
+                  "triggertime", "model", "motiondelaytime", "temperature", "luminance", "jpg_data", "jpg_time", "problem", "statuslog" )
+
+    enrolled  = _sensorFlagProperty(SENSOR_FLAG_ENROLLED)   # bool  enrolled, as returned by the A5 message
+    bypass    = _sensorFlagProperty(SENSOR_FLAG_BYPASS)     # bool  if bypass is set on this sensor
+    lowbatt   = _sensorFlagProperty(SENSOR_FLAG_LOWBATT)    # bool  if this sensor has a low battery
+    status    = _sensorFlagProperty(SENSOR_FLAG_STATUS)     # bool  status, as returned by the A5 message
+    tamper    = _sensorFlagProperty(SENSOR_FLAG_TAMPER)     # bool  tamper, as returned by the A5 message
+    ztamper   = _sensorFlagProperty(SENSOR_FLAG_ZTAMPER)    # bool  zone tamper, as returned by the A5 message
+    ztrip     = _sensorFlagProperty(SENSOR_FLAG_ZTRIP)      # bool  zone trip, as returned by the A5 message
+    triggered = _sensorFlagProperty(SENSOR_FLAG_TRIGGERED)  # bool  triggered, as returned by the A5 message
+    missing   = _sensorFlagProperty(SENSOR_FLAG_MISSING)
+    one_way   = _sensorFlagProperty(SENSOR_FLAG_ONE_WAY)
+    inactive  = _sensorFlagProperty(SENSOR_FLAG_INACTIVE)
+    hasJPG    = _sensorFlagProperty(SENSOR_FLAG_HASJPG)     # bool  an image has been received from this sensor
+
     def __init__(self, **kwargs):
         self._callback = []
+        self._notifier = None   # When set, changes are passed to it to be collected and it calls deliverChange
+        self.flags = 0    # int   the status flags, SENSOR_FLAG_*
+        self.version = 0  # int   incremented on every change to the sensor, so a change is found by comparing it to a previous value
         self.id = kwargs.get("id", -1)  # int   device id
         self.stype = kwargs.get("stype", AlSensorType.UNKNOWN)  # AlSensorType  sensor type
         self.ztypeName = kwargs.get("ztypeName", None)  # str   Zone Type Name
@@ -300,29 +385,33 @@ class AlSensorDeviceHelper(AlSensorDevice):
         self.zchime = kwargs.get("zchime", "Unknown")  # str   zone chime
         self.zchimeref = kwargs.get("zchimeref", {})  # set   partition set (could be in more than one partition)
         self.partition = kwargs.get("partition", {})  # set   partition set (could be in more than one partition)
-        self.bypass = kwargs.get("bypass", False)  # bool  if bypass is set on this sensor
-        self.lowbatt = kwargs.get("lowbatt", False)  # bool  if this sensor has a low battery
-        self.status = kwargs.get("status", False)  # bool  status, as returned by the A5 message
-        self.tamper = kwargs.get("tamper", False)  # bool  tamper, as returned by the A5 message
-        self.ztamper = kwargs.get("ztamper", False)  # bool  zone tamper, as returned by the A5 message
-        self.ztrip = kwargs.get("ztrip", False)  # bool  zone trip, as returned by the A5 message
-        self.enrolled = kwargs.get("enrolled", False)  # bool  enrolled, as returned by the A5 message
-        self.triggered = kwargs.get("triggered", False)  # bool  triggered, as returned by the A5 message
+        self.bypass = kwargs.get("bypass", False)
+        self.lowbatt = kwargs.get("lowbatt", False)
+        self.status = kwargs.get("status", False)
+        self.tamper = kwargs.get("tamper", False)
+        self.ztamper = kwargs.get("ztamper", False)
+        self.ztrip = kwargs.get("ztrip", False)
+        self.enrolled = kwargs.get("enrolled", False)
+        self.triggered = kwargs.get("triggered", False)
         self.triggertime = None     # datetime  This is used to time stamp in local time the occurance of the trigger
         self.model = kwargs.get("model", "Unknown")  # str   device model
         self.motiondelaytime = kwargs.get("motiondelaytime", None)  # int   device model
         self.temperature = None
         self.luminance = None
-        self.hasJPG = False
         self.jpg_data = None
         self.jpg_time = None
         self.problem = "none"
-        self.missing = False
-        self.one_way = False
-        self.inactive = False
         #self.timelog = []
         self.statuslog = None
 
+    def _setFlag(self, flag : int, val : bool) -> bool:
+        f = (self.flags | flag) if val else (self.flags & ~flag)
+        if f != self.flags:
+            self.flags = f
+            self.version += 1
+            return True # The value has changed
+        return False # The value has not changed
+
     def __str__(self):
         pt = ""
         for i in self.partition:
@@ -376,22 +465,16 @@ class AlSensorDeviceHelper(AlSensorDevice):
             and self.zpanelname == other.zpanelname
             and self.zchime == other.zchime
             and self.partition == other.partition
-            and self.bypass == other.bypass
-            and self.lowbatt == other.lowbatt
-            and self.status == other.status
-            and self.tamper == other.tamper
+            and self.flags & SENSOR_FLAGS_EQ == other.flags & SENSOR_FLAGS_EQ
             and self.ztypeName == other.ztypeName
-            and self.ztamper == other.ztamper
-            and self.ztrip == other.ztrip
-            and self.enrolled == other.enrolled
-            and self.triggered == other.triggered
-            and self.hasJPG == other.hasJPG
             #and self.triggertime == other.triggertime
             and self.motiondelaytime == other.motiondelaytime
         )
 
     def setProblem(self, s):
-        self.problem = s
+        if self.problem != s:
+            self.problem = s
+            self.version += 1
 
     def getProblem(self) -> str:
         return self.problem
@@ -408,13 +491,26 @@ class AlSensorDeviceHelper(AlSensorDevice):
     def getPartition(self):
         return self.partition
 
+    def setNotifier(self, fn : Callable = None):
+        self._notifier = fn
+
     def pushChange(self, s : AlSensorCondition):
+        self.version += 1
+        if self._notifier is not None:
+            self._notifier(self, s)
+        else:
+            self.deliverChange(s)
+
+    def deliverChange(self, s : AlSensorCondition):
         for cb in self._callback:
             cb(self, s)
 
     def getDeviceID(self):
         return self.id
 
+    def getChangeVersion(self) -> int:
+        return self.version
+
     def getSensorModel(self) -> str:
         if self.model is not None:
             return self.model
@@ -435,43 +531,40 @@ class AlSensorDeviceHelper(AlSensorDevice):
     def getChimeType(self) -> str:
         return self.zchime
 
-    def hasJPG(self) -> bool:
-        return self.hasJPG
-
     def isTriggered(self) -> bool:
-        return self.triggered
+        return self.flags & SENSOR_FLAG_TRIGGERED != 0
 
     def isOpen(self) -> bool:
-        return self.status
+        return self.flags & SENSOR_FLAG_STATUS != 0
 
     def isEnrolled(self) -> bool:
-        return self.enrolled
+        return self.flags & SENSOR_FLAG_ENROLLED != 0
 
     def isBypass(self) -> bool:
-        return self.bypass
+        return self.flags & SENSOR_FLAG_BYPASS != 0
 
     def isLowBattery(self) -> bool:
-        return self.lowbatt
+        return self.flags & SENSOR_FLAG_LOWBATT != 0
 
     # Not abstract but implement if possible
     def isTamper(self) -> bool:
-        return self.tamper
+        return self.flags & SENSOR_FLAG_TAMPER != 0
 
     # Not abstract but implement if possible
     def isMissing(self) -> bool:
-        return self.missing
+        return self.flags & SENSOR_FLAG_MISSING != 0
 
     # Not abstract but implement if possible
     def isInactive(self) -> bool:
-        return self.inactive
+        return self.flags & SENSOR_FLAG_INACTIVE != 0
 
     # Not abstract but implement if possible
     def isOneWay(self) -> bool:
-        return self.one_way
+        return self.flags & SENSOR_FLAG_ONE_WAY != 0
 
     # Not abstract but implement if possible
     def isZoneTamper(self) -> bool:
-        return self.ztamper
+        return self.flags & SENSOR_FLAG_ZTAMPER != 0
 
     # Not abstract but implement if possible
     def getRawSensorIdentifier(self) -> int:
@@ -490,25 +583,25 @@ class AlSensorDeviceHelper(AlSensorDevice):
         if trigger is not None and trigger:
             # If trigger is set then the caller is confident that it is a motion or camera sensor
             log.debug(f"[UpdateContactSensor]   Sensor {self.id}   triggered to True")
-            self.triggered = True
+            self._setFlag(SENSOR_FLAG_TRIGGERED, True)
             self.triggertime = getTimeFunction()
             self.pushChange(AlSensorCondition.STATE)
         elif status is not None and self.status != status:
             # The current setting is different
             if status:
                 log.debug(f"[UpdateContactSensor]   Sensor {self.id}   triggered to True")
-                self.triggered = True
+                self._setFlag(SENSOR_FLAG_TRIGGERED, True)
                 self.triggertime = getTimeFunction()
             if self.getSensorType() != AlSensorType.MOTION and self.getSensorType() != AlSensorType.CAMERA:
                 # Not a motion or camera to set status
                 log.debug(f"[UpdateContactSensor]   Sensor {self.id}   status from {self.status} to {status}")
-                self.status = status
+                self._setFlag(SENSOR_FLAG_STATUS, status)
                 #if status is not None and not status:
                 #    self.SensorList[sensor].pushChange(AlSensorCondition.RESET)
             # Push change as status has toggled
             self.pushChange(AlSensorCondition.STATE)
         # The pushchange function calls the sensors onchange function so it should have already seen triggered and status values, so we can reset triggered
-        self.triggered = False
+        self._setFlag(SENSOR_FLAG_TRIGGERED, False)
 
     def updateLux(self, val) -> bool:
         if val is not None and self.luminance != val:
@@ -539,9 +632,10 @@ class AlSensorDeviceHelper(AlSensorDevice):
         self._updateContactSensor(trigger = trig)
 
     def do_enrolled(self, val : bool) -> bool:
-        if val is not None and self.enrolled != val:
-            self.enrolled = val
-            if self.enrolled:
+        if val is not None and (self.flags & SENSOR_FLAG_ENROLLED != 0) != val:
+            self.flags ^= SENSOR_FLAG_ENROLLED
+            self.version += 1
+            if val:
                 self.pushChange(AlSensorCondition.ENROLLED)
             else:
                 self.pushChange(AlSensorCondition.RESET)
@@ -549,9 +643,10 @@ class AlSensorDeviceHelper(AlSensorDevice):
         return False # The value has not changed
 
     def do_bypass(self, val : bool) -> bool:
-        if val is not None and self.bypass != val:
-            self.bypass = val
-            if self.bypass:
+        if val is not None and (self.flags & SENSOR_FLAG_BYPASS != 0) != val:
+            self.flags ^= SENSOR_FLAG_BYPASS
+            self.version += 1
+            if val:
                 self.pushChange(AlSensorCondition.BYPASS)
             else:
                 self.pushChange(AlSensorCondition.ARMED)
@@ -559,33 +654,37 @@ class AlSensorDeviceHelper(AlSensorDevice):
         return False # The value has not changed
 
     def do_missing(self, val : bool) -> bool:
-        if val is not None and self.missing != val:
-            self.missing = val
-            if self.missing:
+        if val is not None and (self.flags & SENSOR_FLAG_MISSING != 0) != val:
+            self.flags ^= SENSOR_FLAG_MISSING
+            self.version += 1
+            if val:
                 self.pushChange(AlSensorCondition.STATE)
             return True # The value has changed
         return False # The value has not changed
 
     def do_inactive(self, val : bool) -> bool:
-        if val is not None and self.inactive != val:
-            self.inactive = val
-            if self.inactive:
+        if val is not None and (self.flags & SENSOR_FLAG_INACTIVE != 0) != val:
+            self.flags ^= SENSOR_FLAG_INACTIVE
+            self.version += 1
+            if val:
                 self.pushChange(AlSensorCondition.STATE)
             return True # The value has changed
         return False # The value has not changed
 
     def do_oneway(self, val : bool) -> bool:
-        if val is not None and self.one_way != val:
-            self.one_way = val
-            if self.one_way:
+        if val is not None and (self.flags & SENSOR_FLAG_ONE_WAY != 0) != val:
+            self.flags ^= SENSOR_FLAG_ONE_WAY
+            self.version += 1
+            if val:
                 self.pushChange(AlSensorCondition.STATE)
             return True # The value has changed
         return False # The value has not changed
 
     def do_ztrip(self, val : bool) -> bool:
-        if val is not None and self.ztrip != val:
-            self.ztrip = val
-            if self.ztrip: # I can't remember seeing this from the panel
+        if val is not None and (self.flags & SENSOR_FLAG_ZTRIP != 0) != val:
+            self.flags ^= SENSOR_FLAG_ZTRIP
+            self.version += 1
+            if val: # I can't remember seeing this from the panel
                 self.pushChange(AlSensorCondition.STATE)
             #else:
             #    self.pushChange(AlSensorCondition.RESET)
@@ -593,9 +692,10 @@ class AlSensorDeviceHelper(AlSensorDevice):
         return False # The value has not changed
 
     def do_ztamper(self, val : bool) -> bool:
-        if val is not None and self.ztamper != val:
-            self.ztamper = val
-            if self.ztamper:
+        if val is not None and (self.flags & SENSOR_FLAG_ZTAMPER != 0) != val:
+            self.flags ^= SENSOR_FLAG_ZTAMPER
+            self.version += 1
+            if val:
                 self.pushChange(AlSensorCondition.TAMPER)
             else:
                 self.pushChange(AlSensorCondition.RESTORE)
@@ -603,9 +703,10 @@ class AlSensorDeviceHelper(AlSensorDevice):
         return False # The value has not changed
 
     def do_battery(self, val : bool) -> bool:
-        if val is not None and self.lowbatt != val:
-            self.lowbatt = val
-            if self.lowbatt:
+        if val is not None and (self.flags & SENSOR_FLAG_LOWBATT != 0) != val:
+            self.flags ^= SENSOR_FLAG_LOWBATT
+            self.version += 1
+            if val:
                 self.pushChange(AlSensorCondition.BATTERY)
             #else:
             #    self.pushChange(AlSensorCondition.RESET)
@@ -613,9 +714,10 @@ class AlSensorDeviceHelper(AlSensorDevice):
         return False # The value has not changed
 
     def do_tamper(self, val : bool) -> bool:
-        if val is not None and self.tamper != val:
-            self.tamper = val
-            if self.tamper:
+        if val is not None and (self.flags & SENSOR_FLAG_TAMPER != 0) != val:
+            self.flags ^= SENSOR_FLAG_TAMPER
+            self.version += 1
+            if val:
                 self.pushChange(AlSensorCondition.TAMPER)
             else:
                 self.pushChange(AlSensorCondition.RESTORE)
@@ -624,8 +726,12 @@ class AlSensorDeviceHelper(AlSensorDevice):
 
 class AlSwitchDeviceHelper(AlSwitchDevice):
 
+    __slots__ = ( "_callback", "_notifier", "enabled", "id", "type", "location", "state", "version" )
+
     def __init__(self, **kwargs):
         self._callback = []
+        self._notifier = None   # When set, changes are passed to it to be collected and it calls deliverChange
+        self.version = 0  # int   incremented on every change to the switch
         self.enabled = True #kwargs.get("enabled", False)  # bool  enabled
         self.id = kwargs.get("id", None)  # int   device id
         #self.name = kwargs.get("name", None)  # str   name
@@ -666,13 +772,26 @@ class AlSwitchDeviceHelper(AlSwitchDevice):
         else:
             self._callback.append(callback)
 
+    def setNotifier(self, fn : Callable = None):
+        self._notifier = fn
+
     def pushChange(self):
+        self.version += 1
+        if self._notifier is not None:
+            self._notifier(self, None)
+        else:
+            self.deliverChange()
+
+    def deliverChange(self):
         for cb in self._callback:
             cb(self)
 
     def getDeviceID(self):
         return self.id
 
+    def getChangeVersion(self) -> int:
+        return self.version
+
     def isEnabled(self):
         return self.enabled
 
@@ -685,6 +804,48 @@ class AlSwitchDeviceHelper(AlSwitchDevice):
     def isOn(self) -> bool:
         return self.state #
 
+# The JPEG Start Of Frame markers, C4 (huffman table), C8 (reserved) and CC (arithmetic coding) are not frame markers
+JPEG_SOF_MARKERS = frozenset([0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF])
+
+def jpegImageSize(buffer) -> tuple[int, int] | None:
+    """ Walk the JPEG marker segments to the Start Of Frame and return the (width, height), None when it can't be found """
+    end = len(buffer)
+    if end < 4 or buffer[0] != 0xFF or buffer[1] != 0xD8:     # Start of Image "FF D8"
+        return None
+    pos = 2
+    while pos + 4 <= end:
+        if buffer[pos] != 0xFF:
+            return None
+        marker = buffer[pos + 1]
+        if marker == 0xFF:                                      # Fill byte
+            pos = pos + 1
+        elif marker == 0x01 or 0xD0 <= marker <= 0xD7:          # Markers without a length
+            pos = pos + 2
+        elif marker in (0xD9, 0xDA):                            # End of image or start of scan, and no frame before it
+            return None
+        elif marker in JPEG_SOF_MARKERS:
+            # FF Cx <length 2 bytes> <precision> <height 2 bytes> <width 2 bytes>
+            if pos + 9 > end:
+                return None
+            return (buffer[pos + 7] << 8) | buffer[pos + 8], (buffer[pos + 5] << 8) | buffer[pos + 6]
+        else:
+            pos = pos + 2 + ((buffer[pos + 2] << 8) | buffer[pos + 3])
+    return None
+
+def checkImage(buffer) -> tuple[int, int, int]:
+    """ Get the width, height and byte total of a completed image. This doesn't touch any shared state so it can be run in an executor. """
+    size = jpegImageSize(buffer)
+    if size is None:
+        # Let PIL have a go, I assume that if PIL can't load the image either then it is corrupt
+        size = (100000, 100000)
+        try:
+            from PIL import Image
+            with Image.open(io.BytesIO(buffer)) as img:
+                size = img.size
+        except Exception as ex:
+            log.debug(f"[checkImage] Image Exception {ex}")
+    return size[0], size[1], sum(memoryview(buffer))
+
 class ImageRecord:
     # The details of an individual image
     
@@ -849,11 +1010,201 @@ class AlImageManager:
         self.last_image = None
 
 
+# The image history keeps the images from each camera PIR. When the memory budget is exceeded the older images of the least recently used zones
+#    are moved to the spill directory, or forgotten when there isn't one. The newest image of a zone is always kept in memory as the sensor has it anyway.
+IMAGE_HISTORY_FRAMES = 10                     # The number of images kept for each zone, the panel sends 10 good images from a camera PIR
+IMAGE_HISTORY_BYTES = 2 * 1024 * 1024         # The memory budget for the images of all zones
+
+class ImageFrame:
+    # An image in the image history
+    __slots__ = ("zone", "time", "size", "data", "filename", "inHistory")
+
+    def __init__(self, zone, t, data):
+        self.zone = zone
+        self.time = t                         # Date/Time that the image was received
+        self.size = len(data)
+        self.data = data                      # The image, None when it has been moved to the spill directory
+        self.filename = None                  # The file in the spill directory, the file name is the sha1 of the image
+        self.inHistory = True
+
+    def read(self):
+        """ Get the image, this reads the file when it has been moved to the spill directory so it may need to be run in an executor """
+        data = self.data
+        if data is None and self.filename is not None:
+            try:
+                with open(self.filename, "rb") as f:
+                    data = f.read()
+            except OSError as ex:
+                log.debug(f"[ImageFrame] Unable to read image file {self.filename}    {ex}")
+        return data
+
+class AlImageHistory:
+    # A ring buffer of images for each zone, it is only changed from the event loop. writeFiles does the file I/O so run it in an executor.
+    def __init__(self, frames = IMAGE_HISTORY_FRAMES, budget = IMAGE_HISTORY_BYTES):
+        self.frames = frames
+        self.budget = budget
+        self.spilldir = None
+        self.zones = collections.OrderedDict()  # zone -> deque of ImageFrame, oldest first.  The zones are in least recently used order.
+        self.memory = 0                         # The bytes of image data that are in memory
+        self.spilling = set()                   # The frames that are being written to the spill directory
+        self.files = {}                         # filename -> the number of frames that use it
+
+    def setSpillDir(self, spilldir : str | None) -> bool:
+        """ Set the directory to move images to when they do not fit in memory, None to forget them. Returns True when it has been changed to a directory, call clearFiles. """
+        spilldir = spilldir or None
+        if spilldir != self.spilldir:
+            self.spilldir = spilldir
+            return self.spilldir is not None
+        return False
+
+    def clearFiles(self):
+        """ Remove the images from last time from the spill directory, this does file I/O so run it in an executor before writing any files """
+        try:
+            if self.spilldir is not None and os.path.isdir(self.spilldir):
+                for name in os.listdir(self.spilldir):
+                    if name.endswith(".jpg") or (".jpg." in name and name.endswith(".tmp")):   # and the temporary files of writes that did not finish
+                        os.remove(os.path.join(self.spilldir, name))
+        except OSError as ex:
+            log.debug(f"[AlImageHistory] Unable to clear the spill directory {self.spilldir}    {ex}")
+
+    def _drop(self, frame : ImageFrame, remove : list):
+        frame.inHistory = False
+        if frame.data is not None and frame not in self.spilling:   # When it's being written, spilled releases the memory
+            self.memory = self.memory - frame.size
+            frame.data = None
+        if frame.filename is not None:
+            self.files[frame.filename] = self.files[frame.filename] - 1
+            if self.files[frame.filename] == 0:
+                del self.files[frame.filename]
+                remove.append(frame.filename)
+
+    def add(self, zone, data, t) -> tuple[list, list]:
+        """ Add an image to the history for the zone and keep within the memory budget.
+            Returns the frames to write to the spill directory and the files to remove from it, pass both to writeFiles. """
+        spill = []
+        remove = []
+        if zone not in self.zones:
+            self.zones[zone] = collections.deque()
+        self.zones.move_to_end(zone)
+        history = self.zones[zone]
+        while len(history) >= self.frames:
+            self._drop(history.popleft(), remove)
+        history.append(ImageFrame(zone, t, data))
+        self.memory = self.memory + len(data)
+
+        excess = self.memory - sum(frame.size for frame in self.spilling) - self.budget
+        for h in self.zones.values():
+            for frame in list(h)[:-1]:
+                if excess <= 0:
+                    break
+                if frame.data is not None and frame not in self.spilling:
+                    excess = excess - frame.size
+                    if self.spilldir is not None:
+                        self.spilling.add(frame)
+                        spill.append(frame)
+                    else:
+                        h.remove(frame)
+                        self._drop(frame, remove)
+        if len(spill) > 0 or len(remove) > 0:
+            log.debug(f"[AlImageHistory] zone {zone}   {len(history)} images    memory {self.memory} bytes    spill {len(spill)}    remove {len(remove)}")
+        return spill, remove
+
+    def writeFiles(self, spill : list, remove : list) -> list:
+        """ Write the frames to the spill directory and remove the files that are no longer used.
+            This does file I/O so run it in an executor, and only one at a time. Pass the return value to spilled. """
+        written = []
+        if len(spill) > 0:
+            try:
+                os.makedirs(self.spilldir, exist_ok = True)
+            except OSError as ex:
+                log.debug(f"[AlImageHistory] Unable to use the spill directory {self.spilldir}    {ex}")
+        for frame in spill:
+            filename = os.path.join(self.spilldir, hashlib.sha1(frame.data).hexdigest() + ".jpg")
+            try:
+                if not os.path.exists(filename):
+                    writeFileAtomic(filename, frame.data)
+            except OSError as ex:
+                log.debug(f"[AlImageHistory] Unable to write image file {filename}    {ex}")
+                filename = None
+            written.append((frame, filename))
+        for filename in remove:
+            try:
+                os.remove(filename)
+            except OSError as ex:
+                log.debug(f"[AlImageHistory] Unable to remove image file {filename}    {ex}")
+        return written
+
+    def spilled(self, written : list) -> list:
+        """ Release the memory of the frames that writeFiles has written to the spill directory.
+            Returns the files of frames that were dropped while they were being written, pass them to writeFiles to remove them. """
+        orphans = []
+        for frame, filename in written:
+            self.spilling.discard(frame)
+            if frame.inHistory:
+                if filename is not None:   # When the write failed the frame stays in memory and is tried again next time
+                    frame.filename = filename
+                    self.files[filename] = self.files.get(filename, 0) + 1
+                    frame.data = None
+                    self.memory = self.memory - frame.size
+            else:
+                # The frame was dropped while it was being written
+                frame.data = None
+                self.memory = self.memory - frame.size
+                if filename is not None:
+                    orphans.append(filename)
+        # Another frame with the same image may use the file
+        return [filename for filename in set(orphans) if filename not in self.files]
+
+    def getFrameCount(self, zone) -> int:
+        return len(self.zones[zone]) if zone in self.zones else 0
+
+    def getFrame(self, zone, index : int) -> ImageFrame | None:
+        """ Get a frame from the history of the zone, index 0 is the oldest and -1 is the newest """
+        if zone in self.zones and -len(self.zones[zone]) <= index < len(self.zones[zone]):
+            self.zones.move_to_end(zone)
+            return self.zones[zone][index]
+        return None
+
+
+# Connecting to an ethernet device in the panel. When the host has both IPv6 and IPv4 addresses they are tried in turn, alternating the address family,
+#    and a new attempt is started every TCP_HAPPY_EYEBALLS_DELAY seconds while the earlier ones are still trying (RFC 8305). The first to connect is used.
+TCP_CONNECT_TIMEOUT = 5.0
+TCP_HAPPY_EYEBALLS_DELAY = 0.25
+
+async def _connectTcpSocket(loop, addrinfo) -> socket.socket:
+    family, socktype, proto, _, address = addrinfo
+    sock = socket.socket(family, socktype, proto)
+    try:
+        sock.setblocking(False)
+        await loop.sock_connect(sock, address)
+        return sock
+    except BaseException:
+        sock.close()
+        raise
+
+async def openTcpSocket(host : str, port : int, timeout : float = TCP_CONNECT_TIMEOUT, delay : float = TCP_HAPPY_EYEBALLS_DELAY) -> socket.socket:
+    """ Connect a non blocking TCP socket to the host without blocking the event loop. Raises OSError, or TimeoutError when it takes longer than timeout seconds.
+        This is what loop.create_connection does with happy_eyeballs_delay and interleave, but it returns the socket so the old data can be flushed before there is a transport. """
+    loop = asyncio.get_running_loop()
+    async with asyncio.timeout(timeout):
+        addrinfos = await loop.getaddrinfo(host, port, type = socket.SOCK_STREAM, proto = socket.IPPROTO_TCP)
+        # Alternate the address families, starting with the first one the resolver returned
+        first = [a for a in addrinfos if a[0] == addrinfos[0][0]]
+        other = [a for a in addrinfos if a[0] != addrinfos[0][0]]
+        ordered = [a for pair in zip(first, other) for a in pair] + first[len(other):] + other[len(first):]
+        # staggered_race cancels the attempts that are still trying when one connects, _connectTcpSocket closes their sockets
+        sock, _, errors = await staggered_race([partial(_connectTcpSocket, loop, a) for a in ordered], delay)
+    if sock is not None:
+        return sock
+    if len(errors) == 1:
+        raise errors[0]
+    raise OSError(f"Unable to connect to {host} port {port}: {', '.join(str(e) for e in errors)}")
+
 class MyChecksumCalc:
 
     def __init__(self, logger = None) -> None:
         """Initialize class."""
-        pass
+        self.resetChecksumCounters()
         #if logger is not None:
         #    log = logger
 
@@ -861,70 +1212,154 @@ class MyChecksumCalc:
     def setLogger(self, loggy):
         log = loggy
 
-    # check the checksum of received messages
-    def _validatePDU(self, packet: bytearray) -> bool:
+    def resetChecksumCounters(self):
+        # The number of received PDUs validated by each checksum variant, FAILED is counted by the receiver when it dumps a PDU
+        self.checksumCounter = { v : 0 for v in ChecksumVariant }
+
+    def getChecksumCounters(self) -> dict:
+        return { v.name.lower() : c for v, c in self.checksumCounter.items() if v != ChecksumVariant.INVALID }
+
+    def _countChecksum(self, variant : ChecksumVariant):
+        self.checksumCounter[variant] += 1
+
+    # check the checksum of received messages and return the checksum variant that matched
+    def _checkPDU(self, packet: bytearray) -> ChecksumVariant:
         """Verify if packet is valid.
         >>> Packets start with a preamble (\x0D) and end with postamble (\x0A)
         """
         # Validate a received message
-        # Does it start with a header
-        if packet[:1] != b"\x0D":
-            return False
-        # Does it end with a footer
-        if packet[-1:] != b"\x0A":
-            return False
+        length = len(packet)
+        # Does it start with a header and end with a footer
+        if length < 2 or packet[0] != Packet.HEADER or packet[length - 1] != Packet.FOOTER:
+            return ChecksumVariant.INVALID
+
+        # Sum the bytes once (the message type and data, not the header, checksum or footer) and derive all the checksum variants from it
+        total = sum(memoryview(packet)[1:length - 2])
+        crc = packet[length - 2]
+        calc = self._crcFromSum(total)
 
         # Check the CRC
-        if packet[-2:-1] == self._calculateCRC(packet[1:-2]):
+        if crc == calc:
             # log.debug("[_validatePDU] VALID CRC PACKET!")
-            return True
+            return ChecksumVariant.EXACT
 
         # Check the CRC
-        if packet[-2:-1] == self._calculateCRCAlt(packet[1:-2]):
+        if crc == self._crcAltFromSum(total):
             # log.debug("[_validatePDU] VALID ALT CRC PACKET!")
-            return True
+            return ChecksumVariant.ALT
 
-        if packet[-2:-1][0] == self._calculateCRC(packet[1:-2])[0] + 1:
-            log.debug(f"[_validatePDU] Validated a Packet with a checksum that is 1 more than the actual checksum!!!! {toString(packet)} and {hex(self._calculateCRC(packet[1:-2])[0]).upper()} alt calc is {hex(self._calculateCRCAlt(packet[1:-2])[0]).upper()}")
-            return True
+        if crc == calc + 1:
+            if isTraceEnabled(log):
+                log.debug(f"[_validatePDU] Validated a Packet with a checksum that is 1 more than the actual checksum!!!! {toString(packet)} and {hex(calc).upper()} alt calc is {hex(self._crcAltFromSum(total)).upper()}")
+            return ChecksumVariant.PLUS_ONE
 
-        if packet[-2:-1][0] == self._calculateCRC(packet[1:-2])[0] - 1:
-            log.debug(f"[_validatePDU] Validated a Packet with a checksum that is 1 less than the actual checksum!!!! {toString(packet)} and {hex(self._calculateCRC(packet[1:-2])[0]).upper()} alt calc is {hex(self._calculateCRCAlt(packet[1:-2])[0]).upper()}")
-            return True
+        if crc == calc - 1:
+            if isTraceEnabled(log):
+                log.debug(f"[_validatePDU] Validated a Packet with a checksum that is 1 less than the actual checksum!!!! {toString(packet)} and {hex(calc).upper()} alt calc is {hex(self._crcAltFromSum(total)).upper()}")
+            return ChecksumVariant.MINUS_ONE
 
         log.debug("[_validatePDU] Not valid packet, CRC failed, may be ongoing and not final 0A")
+        return ChecksumVariant.FAILED
+
+    # check the checksum of received messages
+    def _validatePDU(self, packet: bytearray) -> bool:
+        variant = self._checkPDU(packet)
+        if variant >= ChecksumVariant.EXACT:
+            self._countChecksum(variant)
+            return True
         return False
 
-    # alternative to calculate the checksum for sending and receiving messages
-    def _calculateCRCAlt(self, msg: bytearray):
-        """ Calculate CRC Checksum """
-        # log.debug("[_calculateCRC] Calculating for: %s", toString(msg))
-        # Calculate the checksum
-        checksum = 0
-        for char in msg[0 : len(msg)]:
-            checksum += char
+    # calculate the checksum of the received PDU in packet, it is just used to output to the log file
+    def _calculatePDUChecksum(self, packet: bytearray) -> int:
+        return self._crcFromSum(sum(memoryview(packet)[1:len(packet) - 2]))
+
+    def _crcAltFromSum(self, checksum : int) -> int:
         # 29/8/2022
         #      This works for both my panels and always validates exactly (never using the +1 or -1 code in _validatePDU)
         #      It also matches the checksums that the Powerlink 3.1 module generates.
         checksum = 256 - (checksum % 255)
         if checksum == 256:
             checksum = 1
-        # log.debug("[_calculateCRC] Calculating for: {toString(msg)}     calculated CRC is: {toString(bytearray([checksum]))}")
-        return bytearray([checksum])
+        return checksum
+
+    def _crcFromSum(self, checksum : int) -> int:
+        checksum = 0xFF - (checksum % 0xFF)
+        if checksum == 0xFF:
+            checksum = 0x00
+        return checksum
+
+    # alternative to calculate the checksum for sending and receiving messages
+    def _calculateCRCAlt(self, msg: bytearray):
+        """ Calculate CRC Checksum """
+        # log.debug("[_calculateCRC] Calculating for: %s", toString(msg))
+        return bytearray([self._crcAltFromSum(sum(memoryview(msg)))])
 
     # calculate the checksum for sending and receiving messages
     def _calculateCRC(self, msg: bytearray):
         """ Calculate CRC Checksum """
         # log.debug("[_calculateCRC] Calculating for: %s", toString(msg))
-        # Calculate the checksum
-        checksum = 0
-        for char in msg[0 : len(msg)]:
-            checksum += char
-        checksum = 0xFF - (checksum % 0xFF)
-        if checksum == 0xFF:
-            checksum = 0x00
-        # log.debug("[_calculateCRC] Calculating for: {toString(msg)}     calculated CRC is: {toString(bytearray([checksum]))}")
-        return bytearray([checksum])
+        return bytearray([self._crcFromSum(sum(memoryview(msg)))])
+
+# The upper limits (in milliseconds) of the buckets in the message handler execution time histograms, the last bucket is everything above the last limit
+METRICS_HANDLER_BUCKETS_MS = (0.1, 0.5, 1.0, 5.0, 20.0, 100.0)
+
+class AlProtocolMetrics:
+    # Counters for the protocol, they are only changed from the event loop and each update is a dict or int increment.
+    #    The counters are kept for the life of the protocol (not reset on a new connection)
+    _bounds = tuple(b / 1000.0 for b in METRICS_HANDLER_BUCKETS_MS)
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.monotonic()
+        self.received = collections.Counter()       # message type -> the number of valid PDUs received
+        self.receivedB0 = collections.Counter()     # B0 subtype -> the number of valid B0 PDUs received
+        self.sent = collections.Counter()           # message type -> the number of PDUs sent (including resends)
+        self.bytesIn = 0
+        self.bytesOut = 0
+        self.resends = 0                            # The last message was sent again after RESEND_MESSAGE_TIMEOUT
+        self.resendFailures = 0                     # The resend did not get a response either and the message was dumped
+        self.responseTimeouts = 0                   # RESPONSE_TIMEOUT expired waiting for a response
+        self.queueHighWater = collections.Counter() # priority -> the most messages that have been waiting in the send queue
+        self.handlerTime = {}                       # message type -> [count, total seconds, max seconds, histogram bucket counts]
+
+    def queued(self, priority : int, depth : int):
+        if depth > self.queueHighWater[priority]:
+            self.queueHighWater[priority] = depth
+
+    def handled(self, msgtype : int, seconds : float):
+        if (h := self.handlerTime.get(msgtype)) is None:
+            h = self.handlerTime[msgtype] = [0, 0.0, 0.0] + [0] * (len(self._bounds) + 1)
+        h[0] += 1
+        h[1] += seconds
+        if seconds > h[2]:
+            h[2] = seconds
+        h[3 + bisect.bisect_left(self._bounds, seconds)] += 1
+
+    def asDict(self, name : Callable = hex, nameB0 : Callable = hex, namePriority : Callable = str) -> dict:
+        """ Return the metrics as a dictionary for diagnostics, the name functions convert a received message type, B0 subtype and send priority to text. """
+        period = max(time.monotonic() - self.started, 1.0)
+        buckets = [f"<={b}ms" for b in METRICS_HANDLER_BUCKETS_MS] + [f">{METRICS_HANDLER_BUCKETS_MS[-1]}ms"]
+        return {
+            "period seconds"    : round(period),
+            "bytes in"          : self.bytesIn,
+            "bytes out"         : self.bytesOut,
+            "bytes in per sec"  : round(self.bytesIn / period, 2),
+            "bytes out per sec" : round(self.bytesOut / period, 2),
+            "resends"           : self.resends,
+            "resend failures"   : self.resendFailures,
+            "response timeouts" : self.responseTimeouts,
+            "received"          : { name(k) : v for k, v in sorted(self.received.items()) },
+            "received b0"       : { nameB0(k) : v for k, v in sorted(self.receivedB0.items()) },
+            "sent"              : { hex(k) : v for k, v in sorted(self.sent.items()) },
+            "queue high water"  : { namePriority(k) : v for k, v in sorted(self.queueHighWater.items()) },
+            "handler time"      : { name(k) : { "count"    : h[0],
+                                                "mean ms"  : round(1000.0 * h[1] / h[0], 3),
+                                                "max ms"   : round(1000.0 * h[2], 3),
+                                                **{ b : c for b, c in zip(buckets, h[3:]) if c > 0 } }
+                                    for k, h in sorted(self.handlerTime.items()) },
+        }
 
 class PartitionStateClass:
 
@@ -1206,6 +1641,11 @@ class AlPanelInterfaceHelper(AlPanelInterface):
         self.onNewSwitchHandler = None
         self.onProblemHandler = None
         self.onPanelLogHandler = None
+
+        # The changes waiting to be sent to the host, see NOTIFY_WINDOW
+        self.notifyWindow = NOTIFY_WINDOW
+        self.notifyPending = {}     # (id of device or None, condition) to the device or None for the panel. A dict so it is in order and without duplicates
+        self.notifyTimer = None
         
         ########################################################################
         # Global Variables that define the overall panel status
@@ -1357,6 +1797,15 @@ class AlPanelInterfaceHelper(AlPanelInterface):
     def getJPG(self, device : int, count : int) -> AlCommandStatus:
         return AlCommandStatus.FAIL_ABSTRACT_CLASS_NOT_IMPLEMENTED
 
+    def getImageFrameCount(self, device : int) -> int:
+        return 0
+
+    def getImageFrame(self, device : int, index : int) -> ImageFrame | None:
+        return None
+
+    def getProtocolMetrics(self) -> dict:
+        return {}
+
     # Set the Sensor Bypass to Arm/Bypass individual sensors
     # sensor in range 1 to 31 for PowerMax and 1 to 64 for PowerMaster (inclusive) depending on alarm
     # bypassValue is False to Arm the Sensor and True to Bypass the sensor
@@ -1427,8 +1876,44 @@ class AlPanelInterfaceHelper(AlPanelInterface):
         self.onPanelChangeHandler = fn
 
     def sendPanelUpdate(self, ev : AlCondition, d : dict = {} ):
-        if self.onPanelChangeHandler is not None:
-            self.onPanelChangeHandler(ev, d)
+        if ev == AlCondition.PUSH_CHANGE and not d:
+            # A push change only asks the host to update from the current state, so one covers them all
+            self._collectNotification(None, ev, None)
+        else:
+            # Alarm, siren, panel state and all other events are sent straight away
+            self.flushNotifications()
+            if self.onPanelChangeHandler is not None:
+                self.onPanelChangeHandler(ev, d)
+
+    # This is the notifier for the sensors and switches, it is called from their pushChange
+    def notifyDeviceChange(self, device, s : AlSensorCondition = None):
+        if s is not None and s in NOTIFY_IMMEDIATE_SENSOR:
+            self.flushNotifications()
+            device.deliverChange(s)
+        else:
+            self._collectNotification(id(device), s, device)
+
+    def _collectNotification(self, key, s, device):
+        self.notifyPending[(key, s)] = device
+        if self.notifyTimer is None:
+            self.notifyTimer = self.loop.call_later(self.notifyWindow, self.flushNotifications)
+
+    # Send all the collected changes, this is called when a packet has been processed and when the notify window expires
+    def flushNotifications(self):
+        if self.notifyTimer is not None:
+            self.notifyTimer.cancel()
+            self.notifyTimer = None
+        while len(self.notifyPending) > 0:
+            pending = self.notifyPending
+            self.notifyPending = {}
+            for (_, s), device in pending.items():
+                if device is not None:
+                    if s is None:
+                        device.deliverChange()       # a switch
+                    else:
+                        device.deliverChange(s)      # a sensor
+                elif self.onPanelChangeHandler is not None:
+                    self.onPanelChangeHandler(s, {})
 
     def _searchDict(self, dict, v_search):
         for k, v in dict.items():
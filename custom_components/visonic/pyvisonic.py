@@ -90,27 +90,30 @@ import random
 import traceback
 
 from collections import namedtuple
+from functools import partial
 from time import sleep
 from enum import StrEnum, IntEnum, Enum, auto, unique
 from string import punctuation
 from textwrap import wrap
 
 try:
-    from .pyenum import (CFG, RAW, SEQUENCE, PanelSetting, MessagePriority, DataType, IndexName, Packet, B0SubType, EPROM, Send, Receive, PanelTypeEnum, EVENT_TYPE, PANEL_STATUS)
+    from .pyenum import (CFG, RAW, SEQUENCE, PanelSetting, MessagePriority, DataType, IndexName, Packet, B0SubType, EPROM, Send, Receive, PanelTypeEnum, EVENT_TYPE, PANEL_STATUS, ChecksumVariant)
     from .pyconst import (AlPanelDataStream, NO_DELAY_SET, PanelConfig, AlConfiguration, AlPanelMode, AlPanelCommand, AlTroubleType, AlPanelEventData, EPROM_DOWNLOAD_ALL,
                           AlAlarmType, AlPanelStatus, AlSensorCondition, AlCommandStatus, AlX10Command, AlCondition, AlLogPanelEvent, AlSensorType, AlDeviceType, AlTerminationType, PE_PARTITION, NOBYPASSSTR, DISABLE_TEXT,
-                          TEXT_PANEL_MODEL, TEXT_WATCHDOG_TIMEOUT_TOTAL, TEXT_WATCHDOG_TIMEOUT_DAY, TEXT_DOWNLOAD_TIMEOUT, TEXT_DL_MESSAGE_RETRIES, TEXT_PROTOCOL_VERSION, TEXT_POWER_MASTER )
-    from .pyhelper import (toString, MyChecksumCalc, AlImageManager, ImageRecord, titlecase, AlPanelInterfaceHelper, 
+                          TEXT_PANEL_MODEL, TEXT_WATCHDOG_TIMEOUT_TOTAL, TEXT_WATCHDOG_TIMEOUT_DAY, TEXT_DOWNLOAD_TIMEOUT, TEXT_DL_MESSAGE_RETRIES, TEXT_PROTOCOL_VERSION, TEXT_POWER_MASTER,
+                          TEXT_CRC_FAILURES, TEXT_RESENDS, TEXT_RESPONSE_TIMEOUTS )
+    from .pyhelper import (toString, isTraceEnabled, MyChecksumCalc, AlImageManager, ImageRecord, AlImageHistory, ImageFrame, checkImage, AlProtocolMetrics, titlecase, AlPanelInterfaceHelper, 
                            AlSensorDeviceHelper, AlSwitchDeviceHelper)
-    from .pyeprom import EPROMManager
+    from .pyeprom import EPROMManager, EPROMDownloadScheduler
 except:
-    from pyenum import (CFG, RAW, SEQUENCE, PanelSetting, MessagePriority, DataType, IndexName, Packet, B0SubType, EPROM, Send, Receive, PanelTypeEnum, EVENT_TYPE, PANEL_STATUS)
+    from pyenum import (CFG, RAW, SEQUENCE, PanelSetting, MessagePriority, DataType, IndexName, Packet, B0SubType, EPROM, Send, Receive, PanelTypeEnum, EVENT_TYPE, PANEL_STATUS, ChecksumVariant)
     from pyconst import (AlPanelDataStream, NO_DELAY_SET, PanelConfig, AlConfiguration, AlPanelMode, AlPanelCommand, AlTroubleType, AlPanelEventData, EPROM_DOWNLOAD_ALL,
                           AlAlarmType, AlPanelStatus, AlSensorCondition, AlCommandStatus, AlX10Command, AlCondition, AlLogPanelEvent, AlSensorType, AlDeviceType, AlTerminationType, PE_PARTITION, NOBYPASSSTR, DISABLE_TEXT,
-                          TEXT_PANEL_MODEL, TEXT_WATCHDOG_TIMEOUT_TOTAL, TEXT_WATCHDOG_TIMEOUT_DAY, TEXT_DOWNLOAD_TIMEOUT, TEXT_DL_MESSAGE_RETRIES, TEXT_PROTOCOL_VERSION, TEXT_POWER_MASTER )
-    from pyhelper import (toString, MyChecksumCalc, AlImageManager, ImageRecord, titlecase, AlPanelInterfaceHelper, 
+                          TEXT_PANEL_MODEL, TEXT_WATCHDOG_TIMEOUT_TOTAL, TEXT_WATCHDOG_TIMEOUT_DAY, TEXT_DOWNLOAD_TIMEOUT, TEXT_DL_MESSAGE_RETRIES, TEXT_PROTOCOL_VERSION, TEXT_POWER_MASTER,
+                          TEXT_CRC_FAILURES, TEXT_RESENDS, TEXT_RESPONSE_TIMEOUTS )
+    from pyhelper import (toString, isTraceEnabled, MyChecksumCalc, AlImageManager, ImageRecord, AlImageHistory, ImageFrame, checkImage, AlProtocolMetrics, titlecase, AlPanelInterfaceHelper, 
                           AlSensorDeviceHelper, AlSwitchDeviceHelper)
-    from pyeprom import EPROMManager
+    from pyeprom import EPROMManager, EPROMDownloadScheduler
 
 PLUGIN_VERSION = "1.9.6.9"
 
@@ -191,8 +194,8 @@ DOWNLOAD_RETRY_COUNT = 10
 # Whether to download the EPROM or to use default to get the panel data, this is or'd with CFG.EPROM_DOWNLOAD in pmPanelConfig and used for debug
 FORCE_DOWNLOAD_TO_USE_EPROM = True
 
-# Number of times to retry the retrieval of a block to download, this is a total across all blocks to download and not each block
-DOWNLOAD_PDU_RETRY_COUNT = 30
+# Number of times to retry the retrieval of a block to download, this is for each block to download
+DOWNLOAD_PDU_RETRY_COUNT = 6
 
 # Number of seconds delay between trying to achieve powerlink (must have achieved download first)
 POWERLINK_RETRY_DELAY = 180
@@ -389,6 +392,9 @@ pmSendMsg = {  #                        data
 #   Send.MSGE             : VisonicCommand(convertByteArray('0E 43')                                       , None   , False, False,      SendDebugM, 0.0, "Message 0E 43. Not sure what this does to the panel. Panel replies with powerlink ack 0x43." ),
 }
 
+# These messages only ask the panel for its current state, if the same request (with the same options) is already waiting in the send queue at the same or a higher priority then it is not added again
+pmSendMsgCoalesce = { Send.STATUS, Send.STATUS_SEN, Send.BYPASSTAT }
+
 # B0 Messages subset that we can send to a Powermaster, embed within MSG_POWERMASTER to use
 B0_SendMessageTupleTmp = collections.namedtuple('B0_SendMessageTupleTmp', 'data chunky paged')
 
@@ -641,7 +647,7 @@ pmZoneName = [
    "custom_4", "custom_5", "not_installed"
 ]
 
-# The sequencer uses these 2 classes
+# The sequencer uses these classes
 class SequencerType(IntEnum):
     Invalid                 = -1
     Reset                   = 1
@@ -680,6 +686,26 @@ class PanelErrorStates(IntEnum):
     DespatcherException   = 8
     BeeZeroInvalidCommand = 9
 
+class SequencerEvent(IntEnum):
+    PacketReceived        = 1
+    DownloadComplete      = 2
+    ResponseTimeout       = 3
+
+# The sequencer does its timed work once per second (a tick) and it also runs between ticks when an event happens that the current state is waiting for.
+#    events   : The set of SequencerEvent that wake the sequencer in this state, so it moves on as soon as the panel replies and not on the next tick
+#    deadline : The number of ticks to stay in this state before giving up on it, None when the state does not time out in ticks
+SequencerStateConfig = collections.namedtuple('SequencerStateConfig', 'events deadline')
+pmSequencerStateConfig = {
+   SequencerType.WaitingForPanelDetails  : SequencerStateConfig( events = { SequencerEvent.PacketReceived, SequencerEvent.ResponseTimeout },  deadline = 7  ),    # Up to 7 seconds to get panel data message (worst case to also allow for Bridge traffic)
+   SequencerType.GettingB0SensorMessages : SequencerStateConfig( events = { SequencerEvent.PacketReceived },                                  deadline = 20 ),    # My PM panels both take about 7 to 8 seconds so if we get to 20 seconds then EPROMInitialiseDownload
+   SequencerType.EPROMStartedDownload    : SequencerStateConfig( events = { SequencerEvent.PacketReceived },                                  deadline = None ),
+   SequencerType.EPROMDoingDownload      : SequencerStateConfig( events = { SequencerEvent.DownloadComplete, SequencerEvent.ResponseTimeout }, deadline = None ),
+   SequencerType.EPROMExitDownload       : SequencerStateConfig( events = { SequencerEvent.PacketReceived },                                  deadline = None ),
+   SequencerType.EnrollingPowerlink      : SequencerStateConfig( events = set(),                                                              deadline = 10 ),    # After 10 attempts to enrol, stay in StandardPlus Emulation Mode
+   SequencerType.WaitingForEnrolSuccess  : SequencerStateConfig( events = { SequencerEvent.PacketReceived, SequencerEvent.ResponseTimeout },  deadline = None ),
+}
+pmSequencerStateDefault = SequencerStateConfig( events = set(), deadline = None )
+
 
 # These are conversion to string functions
 def psc_lba(p):   # p = a list of bytearrays
@@ -691,6 +717,73 @@ def psc_lba(p):   # p = a list of bytearrays
 def psc_dummy(p):
     return p
 
+# A fixed length set of bits held in an integer, bit i is entry i. This is used for the RAW.BITS panel settings in place of a list of bools.
+#    It can be indexed and iterated like the list, two of them are compared as integers and diff gives the bits that are different.
+class PanelBits:
+    __slots__ = ("value", "length")
+
+    def __init__(self, value : int = 0, length : int = 0):
+        self.length = length
+        self.value = value & ((1 << length) - 1)
+
+    @classmethod
+    def fromlist(cls, bits) -> 'PanelBits':
+        value = 0
+        for i, b in enumerate(bits):
+            if b:
+                value |= 1 << i
+        return cls(value, len(bits))
+
+    def overwrite(self, data : bytearray, length : int) -> 'PanelBits':
+        # Return a new PanelBits with the first length bytes of data (lsb first) over the bits, the bits beyond the data are kept
+        n = length * 8
+        new = int.from_bytes(bytes(data[:length]), "little")
+        return PanelBits((self.value & ~((1 << n) - 1)) | new, max(self.length, n))
+
+    def copy(self) -> 'PanelBits':
+        return PanelBits(self.value, self.length)
+
+    def count(self) -> int:
+        return self.value.bit_count()
+
+    def diff(self, other : 'PanelBits') -> int:
+        # The bits that are different as an integer
+        return self.value ^ other.value
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i : int) -> bool:
+        if i < 0:
+            i = i + self.length
+        if not 0 <= i < self.length:
+            raise IndexError("PanelBits index out of range")
+        return (self.value >> i) & 1 == 1
+
+    def __setitem__(self, i : int, b : bool):
+        if not 0 <= i < self.length:
+            raise IndexError("PanelBits index out of range")
+        if b:
+            self.value |= 1 << i
+        else:
+            self.value &= ~(1 << i)
+
+    def __iter__(self):
+        return (((self.value >> i) & 1 == 1) for i in range(self.length))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PanelBits) and self.value == other.value and self.length == other.length
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        # Entry 0 first, grouped in to bytes
+        b = f"{self.value:0{self.length}b}"[::-1] if self.length > 0 else ""
+        return " ".join(b[i:i+8] for i in range(0, len(b), 8))
+
+def psc_bits(p):
+    return repr(p)
+
 PanelSettingCodesType = collections.namedtuple('PanelSettingCodesType', 'item mandatory PMaxEPROM PMasterEPROM PMasterB035Panel PMasterB042Panel PMasterB0Mess PMasterB0Index tostring default')
 # For PMasterB0Mess there is an assumption that the message type is 0x03, and this is the subtype
 #       PMasterB0Index index 3 is Sensor data, I should have an enum for this
@@ -709,7 +802,7 @@ pmPanelSettingCodes = { #                                  item mandatory PMaxEP
     PanelSetting.HasPGM           : PanelSettingCodesType( None,  True, None,                 None,                 None  ,         None  ,         B0SubType.SYSTEM_CAP,   IndexName.PGM,    psc_dummy,     []),
     PanelSetting.ZoneDelay        : PanelSettingCodesType( None,  True, None,                 EPROM.ZONE_DEL_MAS,   None  ,         None  ,         None,                   None,             toString ,     bytearray(64)),     # Initialise to 0s so it passes the I've got it from the panel test until I know how to get this using B0 data
     PanelSetting.ZoneData         : PanelSettingCodesType( None,  True, EPROM.ZONEDATA_MAX,   EPROM.ZONEDATA_MAS,   None  ,         None  ,         None,                   None,             toString ,     bytearray()),
-    PanelSetting.ZoneEnrolled     : PanelSettingCodesType( None,  True, None,                 None,                 None  ,         None  ,         B0SubType.SENSOR_ENROL, IndexName.ZONES,  psc_dummy,     [] ),               # Powermax relies on EPROM data or A5 message to provide sensor enrol         
+    PanelSetting.ZoneEnrolled     : PanelSettingCodesType( None,  True, None,                 None,                 None  ,         None  ,         B0SubType.SENSOR_ENROL, IndexName.ZONES,  psc_bits ,     PanelBits() ),      # Powermax relies on EPROM data or A5 message to provide sensor enrol         
     PanelSetting.PanelBypass      : PanelSettingCodesType( 0,     True, EPROM.PANEL_BYPASS,   EPROM.PANEL_BYPASS,   None  ,         None  ,         None,                   None,             psc_dummy,     [NOBYPASSSTR]),
     PanelSetting.PanelDownload    : PanelSettingCodesType( None, False, EPROM.INSTALDLCODE,   EPROM.INSTALDLCODE,   None  ,         0x000f,         None,                   None,             psc_dummy,     bytearray()),
     PanelSetting.PanelSerial      : PanelSettingCodesType( None, False, EPROM.PANEL_SERIAL,   EPROM.PANEL_SERIAL,   None  ,         0x0002,         None,                   None,             toString,      bytearray() ),
@@ -728,6 +821,30 @@ pmPanelSettingCodes = { #                                  item mandatory PMaxEP
 #   PanelSetting.PanicAlarm       : PanelSettingCodesType( 0,    "panicAlarm",       "panicAlarm",               None  ,         None  ,         None,           None,            psc_dummy,     [False]),
 #   PanelSetting.PanelModel       : PanelSettingCodesType( 0,    EPROM.PANEL_MODEL_CODE, EPROM.PANEL_MODEL_CODE, None  ,         None  ,         None,           None,            psc_lba  ,     [bytearray([0,0,0,0])]),
 
+# Reverse indexes of pmPanelSettingCodes, so that B0 data received from the panel is routed straight to its PanelSetting without searching the whole table
+#    pmPanelSettingB0Chunk : (B0 message subtype, chunk index) to PanelSetting
+#    pmPanelSettingB035    : 35 panel setting parameter id to PanelSetting
+#    pmPanelSettingB042    : 42 panel setting parameter id to PanelSetting
+def _buildPanelSettingRoutes() -> tuple:
+    chunk = {}
+    b035 = {}
+    b042 = {}
+    for key, value in pmPanelSettingCodes.items():
+        if value.PMasterB0Mess is not None and value.PMasterB0Mess in pmSendMsgB0:
+            chunk.setdefault((pmSendMsgB0[value.PMasterB0Mess].data, value.PMasterB0Index), key)   # The first one in the table wins
+        if value.PMasterB035Panel is not None:
+            b035.setdefault(value.PMasterB035Panel, key)
+        if value.PMasterB042Panel is not None:
+            b042.setdefault(value.PMasterB042Panel, key)
+    return (chunk, b035, b042)
+
+pmPanelSettingB0Chunk, pmPanelSettingB035, pmPanelSettingB042 = _buildPanelSettingRoutes()
+
+# These are all the panel settings that _check_panel_data_present could want, the length of each is part of the fingerprint of its result
+pmPanelDataPresentSettings = ( PanelSetting.ZoneNames, PanelSetting.ZoneNameString, PanelSetting.ZoneCustNameStr, PanelSetting.ZoneTypes, PanelSetting.DeviceTypesZones,
+                               PanelSetting.ZoneEnrolled, PanelSetting.PanelBypass, PanelSetting.ZoneChime, PanelSetting.ZoneDelay, PanelSetting.HasPGM,
+                               PanelSetting.PartitionData, PanelSetting.PartitionEnabled, PanelSetting.UserCodes )
+
 
 ##############################################################################################################################################################################################################################################
 ##########################  Known Sensor Types ###############################################################################################################################################################################################
@@ -909,6 +1026,46 @@ pmZoneEventAction = {
      20 : ZoneEventActionCollection(ZoneFunctions.PUSH_CHANGE, TEXT_AC_FAIL,     AlSensorCondition.PROBLEM ),   # "Siren AC Fail",         
 }
 
+# The conditions that are checked when a message is received to decide whether to process it or not.  They are only evaluated for the message type that has been received.
+class DecodeCondition(IntEnum):
+    NEVER         = 0   # Do not process the message
+    ALWAYS        = 1   # Always process the message
+    DOWNLOAD      = 2   # Only process the message when downloading the EPROM
+    NORMAL_DATA   = 3   # Only process the message when not downloading and in a known panel mode
+    POWERLINK     = 4   # Only process the message when not downloading and not forced in to standard mode (and not bridged)
+    POWERMASTER   = 5   # Only process the message when B0 receive processing is enabled or when processing normal data
+
+# The func values are the names of the functions in the PacketHandling Class, they are bound to the instance once per connection
+# The message is a format string using mode, download and data that is only created when the message is not processed
+DecodeMessage = collections.namedtuple('DecodeMessage', 'condition func pushchange message')
+pmDecodeMessage = {
+   Receive.ACKNOWLEDGE       : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtype02", False, None ),  # ACK
+   Receive.TIMEOUT           : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtype06", False, None ),  # Timeout
+   Receive.UNKNOWN_07        : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtype07", False, None ),  # No idea what this means
+   Receive.ACCESS_DENIED     : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtype08", False, None ),  # Access Denied
+   Receive.LOOPBACK_TEST     : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtype0B", False, None ),  # LOOPBACK TEST, STOP (0x0B) IS THE FIRST COMMAND SENT TO THE PANEL WHEN THIS INTEGRATION STARTS
+   Receive.EXIT_DOWNLOAD     : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtype0F", False, None ),  # Exit
+   Receive.UNKNOWN_1F        : DecodeMessage( DecodeCondition.NEVER       , None               , False, "WARNING: Message 0x1F is not decoded" ),
+   Receive.NOT_USED          : DecodeMessage( DecodeCondition.NEVER       , None               , False, "WARNING: Message 0x22 is not decoded, are you using an old Powermax Panel as this is not supported?" ),
+   Receive.DOWNLOAD_RETRY    : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtype25", False, None ),  # Download retry
+   Receive.DOWNLOAD_SETTINGS : DecodeMessage( DecodeCondition.DOWNLOAD    , "_handle_msgtype33", False, "Received 33 Message, we are in {mode} mode (so I'm ignoring the message), data: {data}"),  # Settings send after a MSGV_START
+   Receive.PANEL_INFO        : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtype3C", False, None ),  # Message when start the download
+   Receive.DOWNLOAD_BLOCK    : DecodeMessage( DecodeCondition.DOWNLOAD    , "_handle_msgtype3F", False, "Received 3F Message, we are in {mode} mode (so I'm ignoring the message), data: {data}"),  # Download information
+   Receive.EVENT_LOG         : DecodeMessage( DecodeCondition.NORMAL_DATA , "_handle_msgtypeA0", False, None ),  # Event log
+   Receive.ZONE_NAMES        : DecodeMessage( DecodeCondition.NORMAL_DATA , "_handle_msgtypeA3",  True, None ),  # Zone Names
+   Receive.STATUS_UPDATE     : DecodeMessage( DecodeCondition.NORMAL_DATA , "_handle_msgtypeA5",  True, None ),  # Zone Information/Update
+   Receive.ZONE_TYPES        : DecodeMessage( DecodeCondition.NORMAL_DATA , "_handle_msgtypeA6",  True, None ),  # Zone Types
+   Receive.PANEL_STATUS      : DecodeMessage( DecodeCondition.NORMAL_DATA , "_handle_msgtypeA7",  True, None ),  # Panel Information/Update
+   Receive.POWERLINK         : DecodeMessage( DecodeCondition.POWERLINK   , "_handle_msgtypeAB",  True, "Received AB Message, we are in {mode} mode and Download is set to {download} (so I'm ignoring the message), data: {data}"),  # 
+   Receive.X10_NAMES         : DecodeMessage( DecodeCondition.NORMAL_DATA , "_handle_msgtypeAC",  True, None ),  # X10 Names
+   Receive.IMAGE_MGMT        : DecodeMessage( DecodeCondition.NORMAL_DATA , "_handle_msgtypeAD",  True, None ),  # No idea what this means, it might ...  send it just before transferring F4 video data ?????
+   Receive.POWERMASTER       : DecodeMessage( DecodeCondition.POWERMASTER , "_handle_msgtypeB0",  True, None ),  # 
+   Receive.IMAGE_DATA        : DecodeMessage( DecodeCondition.NORMAL_DATA , "_handle_msgtypeF4",  None, None ),  # F4 Message from a Powermaster, can't decode it yet but this will accept it and ignore it
+   Receive.REDIRECT          : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtypeC0", False, None ),
+   Receive.PROXY_COMMAND     : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtypeE1", False, None ),
+   Receive.PROXY             : DecodeMessage( DecodeCondition.ALWAYS      , "_handle_msgtypeE0", False, None )
+}
+
 ##############################################################################################################################################################################################################################################
 ##########################  Code Start  ######################################################################################################################################################################################################
 ##############################################################################################################################################################################################################################################
@@ -981,6 +1138,13 @@ class VisonicListEntry:
         self.triedResendingMessage = False
         self.created = getTimeFunction()
 
+    @property
+    def key(self):
+        # The key used to find duplicate commands in the send queue, "raw" entries are not compared
+        if self.command is None:
+            return None
+        return (id(self.command), None if self.options is None else tuple((o[0], o[1] if isinstance(o[1], int) else bytes(o[1])) for o in self.options))
+
     def __str__(self):
         if self.command is not None:
             return f"Command:{self.command.msg}    Options:{self.options}"
@@ -1010,38 +1174,95 @@ class VisonicListEntry:
                         data[s + i] = a[i]
         return data
 
-# Use PriorityQueue but add a peek function to see the head of the list
-class PriorityQueueWithPeek(asyncio.PriorityQueue):
+# The send queue, it is like having a queue for each priority level, each one in the order they were added (oldest first)
+#    When get is called it looks at the highest priority queue (lowest number) first and works down the priority levels
+#    There is also an index of the pending command entries to find duplicates without looking through all the queues
+class SendQueue:
+
+    def __init__(self):
+        self._queues = { p : collections.deque() for p in sorted(MessagePriority) if p >= 0 }   # dict is ordered so this is in priority order
+        self._index = {}          # VisonicListEntry.key : list of the pending (priority, VisonicListEntry) tuples with that key
+        self._size = 0
+        self._not_empty = asyncio.Event()
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def qsize(self) -> int:
+        return self._size
+
+    def put_nowait(self, item):
+        # item is a tuple (priority, VisonicListEntry)
+        self._queues[item[0]].append(item)
+        if (k := item[1].key) is not None:
+            self._index.setdefault(k, []).append(item)
+        self._size += 1
+        self._not_empty.set()
 
     def peek_nowait(self):
-        t = self._queue[0]     # PriorityQueue is an ordered list so look at the head of the list
-        return t
-
-    def find(self, v : VisonicListEntry):
-        # Only compare "command", ignore "raw" entries in VisonicListEntry
-        if v.command is not None:
-            for item in self._queue:
-                # items are tuples (priority, VisonicListEntry)
-                f = item[1]
-                if isinstance(f, VisonicListEntry) and v.command == f.command and v.raw == f.raw and v.options == f.options:
-                    return item # Return the tuple, including priority
+        # Return the head of the list without removing it, the tuple (priority, VisonicListEntry)
+        for q in self._queues.values():
+            if len(q) > 0:
+                return q[0]
+        raise asyncio.QueueEmpty
+
+    def get_nowait(self):
+        for q in self._queues.values():
+            if len(q) > 0:
+                item = q.popleft()
+                self._size -= 1
+                self._unindex(item)
+                return item
+        raise asyncio.QueueEmpty
+
+    async def get(self):
+        while self._size == 0:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def find(self, v : VisonicListEntry, priority : MessagePriority = None):
+        # Only compare "command", ignore "raw" entries in VisonicListEntry. Return the tuple, including priority
+        #    When priority is set then only return an entry at that or a higher priority (a lower number)
+        if (k := v.key) is not None and (f := self._index.get(k)) is not None:
+            if priority is None:
+                return f[0]
+            for item in f:
+                if item[0] <= priority:
+                    return item
         return None
 
     def exists(self, v : VisonicListEntry) -> bool:
-        # Only compare "command", ignore "raw" entries in VisonicListEntry
-        if v.command is not None:
-            for item in self._queue:
-                # items are tuples (priority, VisonicListEntry)
-                f = item[1]
-                if isinstance(f, VisonicListEntry) and v.command == f.command and v.raw == f.raw and v.options == f.options:
-                    return True
-        return False
+        return self.find(v) is not None
+
+    def depth(self, priority : int) -> int:
+        return len(self._queues[priority])
+
+    def depths(self) -> dict:
+        return { p : len(q) for p, q in self._queues.items() }
+
+    def remove_below(self, priority : MessagePriority):
+        # Remove all entries with a lower priority (a higher number) than priority
+        for p, q in self._queues.items():
+            if p > priority and len(q) > 0:
+                for item in q:
+                    self._unindex(item)
+                self._size -= len(q)
+                q.clear()
+
+    def _unindex(self, item):
+        if (k := item[1].key) is not None and (f := self._index.get(k)) is not None:
+            f.remove(item)
+            if len(f) == 0:
+                del self._index[k]
 
 class SensorDevice(AlSensorDeviceHelper):
+    __slots__ = ()
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
 class X10Device(AlSwitchDeviceHelper):
+    __slots__ = ()
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -1078,6 +1299,9 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
         self.WatchdogTimeoutCounter = 0
         self.WatchdogTimeoutPastDay = 0
 
+        # Protocol counters for diagnostics, kept for all connections
+        self.Metrics = AlProtocolMetrics()
+
         # Loopback capability added. Connect Rx and Tx together without connecting to the panel
         self.loopbackTest = False
         self.loopbackCounter = 0
@@ -1087,12 +1311,16 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
         self.ForceStandardMode = False        # INTERFACE : Get user variable from HA to force standard mode or try for PowerLink
         self.DisableAllCommands = False       # INTERFACE : Get user variable from HA to allow or disable all commands to the panel 
         self.DownloadCodeUserSet = False
+        self.EPROMCacheDir = None             # INTERFACE : The directory to save the downloaded EPROM in so it does not all have to be downloaded next time
         
         self.pmForceDownloadByEPROM = False   # For PowerMaster panels, try the B0 messages first and if they dont work in 20 seconds then force EPROM download
 
         self.sequencerTask = None
         self.despatcherTask = None
         self.despatcherException = False
+        self.despatcherWakeup = asyncio.Event()   # Set to wake the despatcher: a response has been received, a message has been queued or a deadline has expired
+        self.sequencerWakeup = asyncio.Event()    # Set to wake the sequencer between its 1 second ticks: an event in self.sequencerEvents has happened
+        self.sequencerEvents = set()              # The SequencerEvent that have happened since the sequencer last looked
 
         # Mark's Powerlink Bridge
         self.PowerLinkBridgeConnected = False   # This is set true on first receipt of an E0.  It means that there is a server running to communicate with
@@ -1102,6 +1330,10 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
 
         self.unknownLog = {}
 
+        # The camera image history, it is kept when the panel variables are reset so the spilled files are not lost
+        self.ImageHistory = AlImageHistory()
+        self.imageFileLock = asyncio.Lock()
+
         self._reset_global_variables()
 
         # Now that the defaults have been set, update them from the panel config dictionary (that may not have all settings in)
@@ -1124,6 +1356,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
     def resetVariablesForNewConnection(self):
         self.lastRecvTimeOfPanelData = self._getUTCTimeFunction()    # Do not set to None
         self.pmCrcErrorCount = 0              # The CRC Error Count for Received Messages
+        self.resetChecksumCounters()          # The number of received messages validated by each checksum variant
         self.PanelMode = AlPanelMode.STARTING
         # keep alive counter for the timer
         self.keep_alive_counter = 0  # only used in _sequencer
@@ -1163,7 +1396,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
         self.lastPacket = None
 
         # A queue of messages to send (i.e. VisonicListEntry)
-        self.SendQueue = PriorityQueueWithPeek()
+        self.SendQueue = SendQueue()
 
         # partition related data
         self.partitionsEnabled = False
@@ -1198,13 +1431,13 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
         self.pmDownloadInProgress = False
         self.pmDownloadMode = False
         self.triggeredDownload = False
-        self.myDownloadList = []
+        self.downloadScheduler = EPROMDownloadScheduler(retries = DOWNLOAD_PDU_RETRY_COUNT)
         self.DownloadCounter = 0
         if not self.DownloadCodeUserSet:
             self.DownloadCode = DEFAULT_DL_CODE   # INTERFACE : Set the Download Code
         # Set when we receive a STOP from the panel, indicating that the EPROM data has finished downloading
         self.pmDownloadComplete = False
-        # Download block retry count (this is for individual 3F download failures)
+        # Download block retry count (this is the total of the individual 3F download failures, for the panel status)
         self.pmDownloadRetryCount = 0
 
         self.PanelResetEvent = False
@@ -1223,6 +1456,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
         self.receivedPowerlinkAcknowledge = False
 
         self.epromManager = EPROMManager()
+        self.epromManager.setCacheDir(self.EPROMCacheDir)
 
         # Current F4 jpg image 
         self.ImageManager = AlImageManager()
@@ -1277,6 +1511,12 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                     if not OBFUS:
                         log.debug(f"[Settings] Download Code set by user to {self.DownloadCode}")
                     self.DownloadCodeUserSet = True
+            if AlConfiguration.EPROMCacheDir in newdata and MicroPython is None:
+                self.EPROMCacheDir = newdata[AlConfiguration.EPROMCacheDir] or None
+                self.epromManager.setCacheDir(self.EPROMCacheDir)
+            if AlConfiguration.ImageCacheDir in newdata and MicroPython is None:
+                if self.ImageHistory.setSpillDir(newdata[AlConfiguration.ImageCacheDir] or None):
+                    self.loop.create_task(self._image_clear_files())
         if self.DisableAllCommands:
             self.ForceStandardMode = True
         # By the time we get here there are 3 combinations of self.DisableAllCommands and self.ForceStandardMode
@@ -1386,22 +1626,51 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
     def _empty_send_queue(self, priority : MessagePriority):
         """ Clear the List by priority level, preventing any retry causing issue. """
         #log.debug(f"[_empty_send_queue]    enter {self.SendQueue.qsize()}")
-        other = PriorityQueueWithPeek()
-        # move it to other
-        while not self.SendQueue.empty():
-            other.put_nowait(self.SendQueue.get_nowait())
-
-        # move back the higher priority items
-        while not other.empty():
-            v = other.get_nowait() # return a tuple (priority, VisonicListEntry)
-            if v[0] <= int(priority):
-                self.SendQueue.put_nowait(v)
-
+        # keep the higher priority items
+        self.SendQueue.remove_below(int(priority))
         #log.debug(f"[_empty_send_queue]    exit {self.SendQueue.qsize()}")
 
     def _clear_receive_response_list(self):
         self.pmLastSentMessage = None
+        self._clear_expected_response()
+
+    def _clear_expected_response(self):
         self.pmExpectedResponse = set()
+        self._wake_despatcher()
+
+    def _wake_despatcher(self):
+        # The despatcher only wakes up when it has something to do, tell it to check again
+        self.despatcherWakeup.set()
+
+    async def _wait_for_despatcher_wakeup(self, timeout : float):
+        # Wait for the despatcher to be woken up or for the timeout (in seconds) to expire, whichever is first
+        handle = self.loop.call_at(self.loop.time() + max(0.0, timeout), self.despatcherWakeup.set)
+        try:
+            await self.despatcherWakeup.wait()
+        finally:
+            handle.cancel()
+
+    def _wake_sequencer(self, event : SequencerEvent):
+        # Tell the sequencer that something has happened, it only wakes up before its next tick if the current state is waiting for it
+        self.sequencerEvents.add(event)
+        self.sequencerWakeup.set()
+
+    async def _wait_for_sequencer_event(self, when : float, events : set) -> bool:
+        # Wait until the loop time "when" (the next tick) or until one of the events has happened, whichever is first
+        #    Return True when woken by an event and False for the tick
+        while not self.suspendAllOperations and self.loop.time() < when:
+            if len(self.sequencerEvents & events) > 0:
+                self.sequencerEvents.clear()
+                return True
+            self.sequencerEvents.clear()
+            self.sequencerWakeup.clear()
+            handle = self.loop.call_at(when, self.sequencerWakeup.set)
+            try:
+                await self.sequencerWakeup.wait()
+            finally:
+                handle.cancel()
+        self.sequencerEvents.clear()
+        return False
 
     # This function asks the panel for its status
     #     resets watchdog timers and asks the panel for a status
@@ -1570,7 +1839,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
 
     # There are 2 Tasks that manage the panel (despatcher and sequencer):
     #    This is the despatcher, it manages the sending of messages to the panel from a PriorityQueue
-    #        The SendQueue is set up as a PriorityQueue and needs a < function implementing in VisonicListEntry based on time, oldest < newest
+    #        The SendQueue has a queue for each priority level, each one in the order they were added (oldest first)
     #        By doing this it's like having two queues in one, a high priority queue, date ordered oldest first, and a low priority queue date ordered oldest first
     async def _despatcher(self):
 
@@ -1636,6 +1905,8 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
             # Log some useful information in debug mode
             if self.transport is not None:
                 self.transport.write(sData)
+                self.Metrics.bytesOut += len(sData)
+                self.Metrics.sent[sData[1]] += 1
                 self.firstCmdSent = True
                 self.pmLastTransactionTime = self._getUTCTimeFunction()
                 if sData[1] != Receive.ACKNOWLEDGE:  # the message is not an acknowledge back to the panel, then save it
@@ -1646,13 +1917,14 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                     self.triggeredDownload = False
                     log.debug("[sendPdu] Setting Download Mode to true")
 
-                if command is not None and command.debugprint == DebugLevel.FULL:
-                    log.debug(f"[sendPdu] Sent Command ({command.msg})    raw data {toString(sData)}   waiting for message response {[hex(no).upper() for no in self.pmExpectedResponse]}")
-                elif command is not None and command.debugprint == DebugLevel.CMD:
-                    log.debug(f"[sendPdu] Sent Command ({command.msg})    waiting for message response {[hex(no).upper() for no in self.pmExpectedResponse]}")
-                elif instruction.raw is not None:
-                    # Assume raw data to send is not obfuscated for now
-                    log.debug(f"[sendPdu] Sent Raw Command      raw data {toString(sData[:4] if OBFUS else sData)}   waiting for message response {[hex(no).upper() for no in self.pmExpectedResponse]}")            
+                if isTraceEnabled(log):
+                    if command is not None and command.debugprint == DebugLevel.FULL:
+                        log.debug(f"[sendPdu] Sent Command ({command.msg})    raw data {toString(sData)}   waiting for message response {[hex(no).upper() for no in self.pmExpectedResponse]}")
+                    elif command is not None and command.debugprint == DebugLevel.CMD:
+                        log.debug(f"[sendPdu] Sent Command ({command.msg})    waiting for message response {[hex(no).upper() for no in self.pmExpectedResponse]}")
+                    elif instruction.raw is not None:
+                        # Assume raw data to send is not obfuscated for now
+                        log.debug(f"[sendPdu] Sent Raw Command      raw data {toString(sData[:4] if OBFUS else sData)}   waiting for message response {[hex(no).upper() for no in self.pmExpectedResponse]}")            
 
             else:
                 log.debug("[sendPdu]      Comms transport has been set to none, must be in process of terminating comms")
@@ -1667,7 +1939,9 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
         await self.waitForTransport(20) # Wait up to 20 seconds for the transport to be setup, if it isn't then other functions set self.suspendAllOperations to True
         while not self.suspendAllOperations:
             try:
-                post_delay = 0.01
+                post_delay = -1.0
+                # Clear the wakeup before looking at the state so nothing that happens from here on is missed
+                self.despatcherWakeup.clear()
                 # calc the time interval between sending the last message and now
                 interval = self._getUTCTimeFunction() - self.pmLastTransactionTime
 
@@ -1692,11 +1966,10 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
 
                         # since we might have been waiting for something to send, check it again :)
                         if not self.suspendAllOperations:
-                            instruction = d[1]   # PriorityQueue is put as a tuple (priority, viscommand), so get the viscommand
+                            instruction = d[1]   # SendQueue is put as a tuple (priority, viscommand), so get the viscommand
                             if len(instruction.response) > 0:
                                 # update the expected response list straight away (without having to wait for it to be actually sent) to make sure protocol is followed
                                 self.pmExpectedResponse.update(instruction.response)
-                            self.SendQueue.task_done()
                             #log.debug(f"[_despatcher] _despatcher sending it to sendPdu, instruction={instruction}          queue size {self.SendQueue.qsize()}")
                             post_delay = sendPdu(instruction)
                             #log.debug(f"[_despatcher] Nothing to do      queue size {self.SendQueue.qsize()}")
@@ -1713,9 +1986,11 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                             st = '[{}]'.format(', '.join(hex(x) for x in self.pmExpectedResponse))
                             log.debug(f"[_despatcher] ****************************** Response Timer Expired ********************************")
                             log.debug(f"[_despatcher]                While Waiting for: {st}")
+                            self.Metrics.responseTimeouts += 1
                             # Reset Send state (clear queue and reset flags)
                             self._clear_receive_response_list()
                             self._trigger_restore_status()                                                # Clear message buffers and send a Restore (if in Powerlink or standard plus) or Status (not in Powerlink) to the Panel
+                            self._wake_sequencer(SequencerEvent.ResponseTimeout)
                     elif self.pmLastSentMessage is not None and interval > RESEND_MESSAGE_TIMEOUT:
                         #   If there's a timeout then resend the previous message. If that doesn't work then dump the message and continue, but log the error
                         if not self.pmLastSentMessage.triedResendingMessage:
@@ -1723,17 +1998,26 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                             log.debug(f"[_despatcher] ****************************** Resend Timer Expired ********************************")
                             log.debug(f"[_despatcher]                Re-Sending last message  {self.pmLastSentMessage.command.msg}")
                             self.pmLastSentMessage.triedResendingMessage = True
+                            self.Metrics.resends += 1
                             post_delay = sendPdu(self.pmLastSentMessage)
                         else:
                             # tried resending once, no point in trying again so reset settings, start from scratch
                             log.debug(f"[_despatcher] ****************************** Resend Timer Expired ********************************")
                             log.debug(f"[_despatcher]                Tried Re-Sending last message but didn't work. Message is dumped")
+                            self.Metrics.resendFailures += 1
                             # Reset Send state (clear queue and reset flags)
                             self._clear_receive_response_list()
                             self._empty_send_queue(priority = MessagePriority.ACK)
                         # restart the watchdog and keep-alive counters
                         self._reset_watchdog_timeout()
                         self._reset_keep_alive_messages()
+                    else:
+                        # Nothing to do until the response is received, an immediate or ack pdu is queued or the response/resend timer expires
+                        deadline = RESPONSE_TIMEOUT - interval
+                        if self.pmLastSentMessage is not None:
+                            deadline = min(deadline, RESEND_MESSAGE_TIMEOUT - interval)
+                        # Add a millisecond so the interval has definitely exceeded the timeout when woken by the deadline
+                        await self._wait_for_despatcher_wakeup(deadline.total_seconds() + 0.001)
 
                 # implement any post delay for the message
                 if post_delay >= 0:  # Check send queue
@@ -1769,6 +2053,8 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
             self.powerlink_counter = 0
 
             counter = 0                     # create a generic counter that gets reset every state change, so it can be used in a single state
+            tick = True                     # True when this loop is the 1 second tick (or a change of state), False when woken by a SequencerEvent
+            nextTick = None                 # The loop time of the next 1 second tick
             no_data_received_counter = 0
             no_packet_received_counter = 0
             _my_panel_state_trigger_count = 5
@@ -2055,21 +2341,28 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
         while not self.suspendAllOperations:
             try:
                 changedState = _sequencerState != _sequencerStatePrev
+                tick = True
                 if changedState:       
                     # create a generic counter that gets reset every state change, so it can be used in a single state
                     log.debug(f"[_sequencer] Changed state from {_sequencerStatePrev} to {_sequencerState}, I was in state {_sequencerStatePrev} for approx {counter} seconds")
                     counter = 0
+                    nextTick = None
                     if _sequencerState in [SequencerType.DoingStandard, SequencerType.DoingStandardPlus, SequencerType.DoingPowerlink, SequencerType.DoingPowerlinkBridge]:
                         # if we're at the point of "doing" then give the client a chance to set everything up with all the async calls
                         await asyncio.sleep(1.0)
                     # If the state has changed then do it straight away, don't do the 1 second loop
                 else:
-                    # If the state has stayed the same then delay 1 second, if the state has changed then get on with it
-                    await asyncio.sleep(1.0)
-                    # increment the counter every loop
-                    counter = counter + 1 if counter < a_day - 1 else 0  # reset the counter 24 hours (approx), has to be < so 4 hour delays are OK
+                    # If the state has stayed the same then wait for the 1 second tick, unless an event happens that this state is waiting for
+                    if nextTick is None:
+                        nextTick = self.loop.time() + 1.0
+                    tick = not await self._wait_for_sequencer_event(nextTick, pmSequencerStateConfig.get(_sequencerState, pmSequencerStateDefault).events)
+                    if tick:
+                        nextTick = None
+                        # increment the counter every tick
+                        counter = counter + 1 if counter < a_day - 1 else 0  # reset the counter 24 hours (approx), has to be < so 4 hour delays are OK
 
                 _sequencerStatePrev = _sequencerState
+                deadline = pmSequencerStateConfig.get(_sequencerState, pmSequencerStateDefault).deadline
                 
                 # If the panel mode has changed then push an update through
                 if oldPanelMode != self.PanelMode:
@@ -2082,8 +2375,9 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                     #############################################################################################################################################################
                     ####### Check the global connection state of the panel, have we received data ###############################################################################
                     #######       These 3 tests take drastic action, they stop the integration    ###############################################################################
+                    #######       The counters are in ticks so they are only checked on the tick  ###############################################################################
                     #############################################################################################################################################################
-                    if self.lastRecvTimeOfPanelData is None:  # has any data been received from the panel yet, even just a single byte?
+                    if tick and self.lastRecvTimeOfPanelData is None:  # has any data been received from the panel yet, even just a single byte?
                         no_data_received_counter += 1
                         # log.debug(f"[_sequencer] no_data_received_counter {no_data_received_counter}")
                         if no_data_received_counter >= NO_RECEIVE_DATA_TIMEOUT:  ## lets assume approx 30 seconds
@@ -2091,7 +2385,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                             self._report_problem(AlTerminationType.NO_DATA_FROM_PANEL_NEVER_CONNECTED)
                             no_data_received_counter = 0
                             continue   # just do the while loop, which will exit as self.suspendAllOperations will be True
-                    elif self.lastPacket is None: # have we been able to construct at least one full and crc checked message 
+                    elif tick and self.lastPacket is None: # have we been able to construct at least one full and crc checked message 
                         no_packet_received_counter += 1
                         #log.debug(f"[_sequencer] no_packet_received_counter {no_packet_received_counter}")
                         if no_packet_received_counter >= NO_RECEIVE_DATA_TIMEOUT:  ## lets assume approx 30 seconds
@@ -2099,7 +2393,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                             self._report_problem(AlTerminationType.NO_DATA_FROM_PANEL_NEVER_CONNECTED)
                             no_packet_received_counter = 0
                             continue   # just do the while loop, which will exit as self.suspendAllOperations will be True
-                    else:  # Data has been received from the panel but check when it was last received
+                    elif tick:  # Data has been received from the panel but check when it was last received
                         # calc time difference between now and when data was last received
                         no_packet_received_counter = 0
                         no_data_received_counter = 0
@@ -2114,7 +2408,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                     ####### Sequencer activities ################################################################################################################################
                     #############################################################################################################################################################
 
-                    if (
+                    if tick and (
                         _sequencerState not in [SequencerType.DoingStandard, SequencerType.DoingStandardPlus, SequencerType.DoingPowerlink, SequencerType.DoingPowerlinkBridge]
                         or changedState
                         or counter % 180 == 0
@@ -2163,7 +2457,8 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                     elif delay_loops > 0:                                           ################################################################ Delay Loop              ###################################################
                         no_data_received_counter = 0
                         no_packet_received_counter = 0
-                        delay_loops = delay_loops - 1
+                        if tick:
+                            delay_loops = delay_loops - 1
                         _clearPanelErrorMessages() # Clear all panel reported errors for the duration of the delay
                         continue   # do all the basic connection checks above and then just do the while loop
 
@@ -2248,7 +2543,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                                 _sequencerState = SequencerType.InitialisePanel
                                 log.debug(f"[_sequencer]    Abnormal: DownloadRetryReceived loop = {delay_loops}")
                             # Ignore other errors 
-                        elif counter >= 7:     # up to 7 seconds to get panel data message (worst case to also allow for Bridge traffic)
+                        elif counter >= deadline:     # up to 7 seconds to get panel data message (worst case to also allow for Bridge traffic)
                             log.debug("[_sequencer]    Abnormal: Taken too long, going to init")
                             _sequencerState = SequencerType.InitialisePanel
 
@@ -2262,10 +2557,11 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
 
                         self.EnableB0ReceiveProcessing = True
 
-                        (mandatory, optional) = self._check_panel_data_present(forceall = checkAllPanelData, output_to_log = True)
+                        (mandatory, optional) = self._check_panel_data_present(forceall = checkAllPanelData, output_to_log = tick)
                         missing = mandatory | optional
                         
-                        log.debug(f"[_sequencer]   _check_panel_data_present {checkAllPanelData=}    missing items {mandatory=}  {optional=}")
+                        if tick:
+                            log.debug(f"[_sequencer]   _check_panel_data_present {checkAllPanelData=}    missing items {mandatory=}  {optional=}")
                         checkAllPanelData = False
 
                         #zoneCnt = pmPanelConfig[CFG.WIRELESS][self.PanelType] + pmPanelConfig[CFG.WIRED][self.PanelType]
@@ -2275,12 +2571,12 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                             # We can create the sensors with just the mandatory data and progress the sequencer
                             _clearPanelErrorMessages()
                             _sequencerState = SequencerType.CreateSensors
-                        elif counter >= 20: # timeout. My PM panels both take about 7 to 8 seconds so if we get to 20 seconds then EPROMInitialiseDownload
+                        elif counter >= deadline: # timeout. My PM panels both take about 7 to 8 seconds so if we get to 20 seconds then EPROMInitialiseDownload
                             self.pmForceDownloadByEPROM = True
                             self.pmDownloadByEPROM = True
                             _sequencerState = SequencerType.InitialisePanel
                             delay_loops = 2
-                        elif counter != 3 and counter % 3 == 0: # every 3 seconds (or so). This is a compromise delay, not too often so the panel starts sending back "wait" messages.
+                        elif tick and counter != 3 and counter % 3 == 0: # every 3 seconds (or so). This is a compromise delay, not too often so the panel starts sending back "wait" messages.
                             _clearPanelErrorMessages()
                             _requestMissingPanelConfig(missing)
                         elif counter > 2 and (s := processPanelErrorMessages()) != PanelErrorStates.AllGood:
@@ -2296,10 +2592,10 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                             self.pmDownloadInProgress = False
                             self.pmDownloadMode = False
                             self.pmDownloadComplete = True
-                            if counter == 0:                             # First time just get the panel status
+                            if tick and counter == 0:                      # First time just get the panel status
                                 log.debug(f"[_sequencer]   Panel status is DOWNLOADING so updating panel status")
                                 self._fetch_panel_status(priority = MessagePriority.IMMEDIATE)               # This should update .PanelState
-                            elif counter % 5 == 0:
+                            elif tick and counter % 5 == 0:
                                 log.debug(f"[_sequencer]   Panel status is DOWNLOADING so trying to kick it out")
                                 self._clear_receive_response_list()
                                 self._empty_send_queue(priority = MessagePriority.ACK)
@@ -2314,8 +2610,11 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                         self.EnableB0ReceiveProcessing = False
                         # Clear all downloaded EPROM and empty all saved data
                         self.epromManager.reset()
+                        if self.EPROMCacheDir is not None:
+                            # Read the EPROM cache files, if there's one for this panel then only the blocks that are not in the cache get downloaded
+                            await self.loop.run_in_executor(None, self.epromManager.loadCacheFiles)
                         # Populate the full list of EPROM blocks
-                        self.myDownloadList = self.epromManager.populatEPROMDownload(self.isPowerMaster())
+                        self.downloadScheduler.start(self.epromManager.populatEPROMDownload(self.isPowerMaster()))
                         if self.PowerLinkBridgeConnected:
                             if self.PowerLinkBridgeStealth:
                                 _sequencerState = SequencerType.EPROMTriggerDownload
@@ -2364,14 +2663,14 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                             # We got a first response, now we can Download the panel EPROM settings
                             self.lastSendOfDownloadEprom = self._getUTCTimeFunction()
                             # Kick off the download sequence and set associated variables
-                            self.pmExpectedResponse = set()
+                            self._clear_expected_response()
                             self.PanelMode = AlPanelMode.DOWNLOAD
                             self.PartitionState[0].PanelState = AlPanelStatus.DOWNLOADING  # Downloading
                             self.sendPanelUpdate(AlCondition.PUSH_CHANGE)  # push through a panel update to the HA Frontend
                             log.debug("[_readPanelSettings] Download Ongoing")
                             self.triggeredDownload = True
                             self.pmDownloadInProgress = True
-                            self._add_message_to_send_queue(Send.DL, options=[ [1, self.myDownloadList.pop(0)] ])  # Read the next block of EPROM data
+                            self._request_download_block()  # Read the first block of EPROM data
                             lastrecv = self.lastRecvTimeOfPanelData
                             _sequencerState = SequencerType.EPROMStartedDownload
 
@@ -2382,7 +2681,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                         # We got a first response, now we can Download the panel EPROM settings
                         if (s := processPanelErrorMessages()) != PanelErrorStates.AllGood:
                             if s in [PanelErrorStates.AccessDeniedDownload, PanelErrorStates.DownloadRetryReceived, PanelErrorStates.TimeoutReceived]:
-                                self.pmExpectedResponse = set()
+                                self._clear_expected_response()
                                 _sequencerState = SequencerType.EPROMInitialiseDownload
                             elif s == PanelErrorStates.DespatcherException:
                                 # start again, restart the despatcher task
@@ -2391,7 +2690,8 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                                 _sequencerState = SequencerType.InitialisePanel
                         else:
                             interval = self._getUTCTimeFunction() - self.lastSendOfDownloadEprom
-                            log.debug(f"[_sequencer] interval={interval}  td={DOWNLOAD_RETRY_DELAY}   self.lastSendOfDownloadEprom(UTC)={self.lastSendOfDownloadEprom}    timenow(UTC)={self._getUTCTimeFunction()}")
+                            if tick:
+                                log.debug(f"[_sequencer] interval={interval}  td={DOWNLOAD_RETRY_DELAY}   self.lastSendOfDownloadEprom(UTC)={self.lastSendOfDownloadEprom}    timenow(UTC)={self._getUTCTimeFunction()}")
 
                             if interval > timedelta(seconds=DOWNLOAD_RETRY_DELAY):            # Give it this number of seconds to start the downloading
                                 _sequencerState = SequencerType.EPROMInitialiseDownload
@@ -2405,7 +2705,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                         if (s := processPanelErrorMessages()) != PanelErrorStates.AllGood:
                             # Handle error messages from the panel
                             if s in [PanelErrorStates.AccessDeniedDownload, PanelErrorStates.DownloadRetryReceived, PanelErrorStates.TimeoutReceived]:
-                                self.pmExpectedResponse = set()
+                                self._clear_expected_response()
                                 _sequencerState = SequencerType.EPROMInitialiseDownload
                             elif s == PanelErrorStates.DespatcherException:
                                 # start again, restart the despatcher task
@@ -2435,7 +2735,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                                 # Make sure that the last saved block is removed in case it has been corrupted
                                 self.epromManager.removeLastSaved()
                                 # Recreate the list of blocks to download
-                                self.myDownloadList = self.epromManager.populatEPROMDownload(self.isPowerMaster())
+                                self.downloadScheduler.start(self.epromManager.populatEPROMDownload(self.isPowerMaster()))
                                 # Resent the Download command to the panel and try to get the blocks
                                 _sequencerState = SequencerType.EPROMTriggerDownload
 
@@ -2460,6 +2760,10 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                                 self._update_all_sirens()
                                 self._process_X10_settings()
                                 log.debug("[_sequencer] EPROM Processing Complete")
+                                if self.EPROMCacheDir is not None and (snapshot := self.epromManager.cacheSnapshot(self.PanelType, self.ModelType)) is not None:
+                                    # Copy the EPROM here in the event loop and only write the copy in the executor
+                                    f = self.loop.run_in_executor(None, self.epromManager.saveCacheFile, *snapshot)
+                                    f.add_done_callback(partial(self._eprom_cache_saved, snapshot[0]))
                             except Exception as ex:
                                 log.warning("[_sequencer] EPROM Processing failed by exception:")
                                 log.warning(f"[_sequencer]             {ex}")
@@ -2525,7 +2829,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                                 _sequencerState = SequencerType.InitialisePanel
                                 log.debug(f"[_sequencer]    Error Message: {s}")
 
-                        elif counter % 3 == 0: # and self.PartitionState[0].PanelState == AlPanelStatus.DOWNLOADING:
+                        elif tick and counter % 3 == 0: # and self.PartitionState[0].PanelState == AlPanelStatus.DOWNLOADING:
                             self._clear_receive_response_list()
                             self._empty_send_queue(priority = MessagePriority.ACK)                      # Empty the URGENT amd NORMAL priority queue (retain the IMMEDIATE and ACK queues)
                             self._add_message_to_send_queue(Send.EXIT, priority = MessagePriority.URGENT)  # Kick the panel out of download
@@ -2542,7 +2846,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
 
                         if self.PanelMode in [AlPanelMode.POWERLINK]:
                             _sequencerState = SequencerType.DoingPowerlink         # Very unlikely but possible
-                        elif counter == 10:
+                        elif counter == deadline:
                             self.PanelMode = AlPanelMode.STANDARD_PLUS                    # After 10 attempts to enrol, stay in StandardPlus Emulation Mode
                             _sequencerState = SequencerType.DoingStandardPlus
                         else:
@@ -2556,8 +2860,9 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
 
                     elif _sequencerState == SequencerType.WaitingForEnrolSuccess:   ################################################################ WaitingForEnrolSuccess  ###################################################
 
-                        self.keep_alive_counter += 1
-                        log.debug(f"[_sequencer]     WaitingForEnrolSuccess {self.is_send_queue_empty()=} {self.pmDownloadMode=} {self.keep_alive_counter=}  threshold is 15")
+                        if tick:
+                            self.keep_alive_counter += 1
+                            log.debug(f"[_sequencer]     WaitingForEnrolSuccess {self.is_send_queue_empty()=} {self.pmDownloadMode=} {self.keep_alive_counter=}  threshold is 15")
                         
                         if self.PanelType is not None and not self.AutoEnrol:
                             self.PanelMode = AlPanelMode.STANDARD_PLUS                    # Cannot AutoEnrol this panel so go straight to Std+ operation
@@ -2568,7 +2873,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                             _sequencerState = SequencerType.Reset
                         elif s != PanelErrorStates.AllGood:
                             _clearPanelErrorMessages()
-                            self.pmExpectedResponse = set()
+                            self._clear_expected_response()
                             self.PanelMode = AlPanelMode.STANDARD_PLUS
                             _sequencerState = SequencerType.EPROMExitDownload
                         elif self.PanelMode in [AlPanelMode.POWERLINK]:
@@ -2873,6 +3178,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                                 log.debug(f"[_sequencer] Received a Exit state, we assume that DOWNLOAD was called and rejected by the panel")
                                 if Receive.PANEL_INFO in self.pmExpectedResponse:    # We sent DOWNLOAD to the panel (probably to set the time) and it has responded with EXIT
                                     self.pmExpectedResponse.remove(Receive.PANEL_INFO)  #
+                                    self._wake_despatcher()                              # It may be waiting for this response
                             case PanelErrorStates.TimeoutReceived:
                                 log.debug(f"[_sequencer] Received a Panel state Timeout")
                                 # Reset Send state (clear queue and reset flags)
@@ -2987,15 +3293,16 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
         """Add incoming data to ReceiveData."""
         if self.suspendAllOperations:
             return
+        self.Metrics.bytesIn += len(data)
         if not self.firstCmdSent:
-            log.debug(f"[data receiver] Ignoring garbage data: {toString(data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[data receiver] Ignoring garbage data: {toString(data)}")
             return
         #log.debug(f"[data receiver] received data: {toString(data)}")
         self.lastRecvTimeOfPanelData = self._getUTCTimeFunction()
         try:
-            for databyte in data:
-                # process a single byte at a time
-                self._handle_received_byte(databyte)
+            # process the whole chunk, PDUs are sliced out of it rather than handling a single byte at a time
+            self._handle_received_data(data)
         except Exception as ex:
             #log.warning(f"[Data Received] Exception {ex}")
             log.exception(ex)
@@ -3008,128 +3315,184 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
         self.pmIncomingPduLen = 0
         self.pmFlexibleLength = 0
 
-    # Process one received byte at a time to build up the received PDU (Protocol Description Unit)
-    #       self.pmIncomingPduLen is only used in this function
-    #       self.pmCrcErrorCount is only used in this function
-    #       self.pmCurrentPDU is only used in this function
-    def _handle_received_byte(self, data):
-        """Process a single byte as incoming data."""
-
-        def processCRCFailure():
-            msgType = self.ReceiveData[1]
-            if msgType != Receive.UNKNOWN_F1:  # ignore CRC errors on F1 message
-                self.pmCrcErrorCount += 1
-                if self.pmCrcErrorCount >= MAX_CRC_ERROR:
-                    self.pmCrcErrorCount = 0
-                    interval = self._getUTCTimeFunction() - self.pmFirstCRCErrorTime
-                    if interval <= timedelta(seconds=CRC_ERROR_PERIOD):
-                        self._report_problem(AlTerminationType.CRC_ERROR)
-                    self.pmFirstCRCErrorTime = self._getUTCTimeFunction()
-
-        def processReceivedMessage(ackneeded, debugp, data, msg):
-            # Unknown Message has been received
-            msgType = data[1]
-            # log.debug(f"[data receiver] *** Received validated message {hexify(msgType)}   data {toString(data)}")
-            # Send an ACK if needed
-            if ackneeded:
-                # log.debug(f"[data receiver] Sending an ack as needed by last panel status message {hexify(msgType)}")
-                sendAck(data=data)
-
-            # Check response
-            #tmplength = len(self.pmExpectedResponse)
-            if len(self.pmExpectedResponse) > 0:  # and msgType != 2:   # 2 is a simple acknowledge from the panel so ignore those
-                # We've sent something and are waiting for a reponse - this is it
-                if msgType in self.pmExpectedResponse:
-                    # while msgType in self.pmExpectedResponse:
-                    self.pmExpectedResponse.remove(msgType)
-
-            if data is not None and debugp == DebugLevel.FULL:
-                log.debug(f"[processReceivedMessage] Received {msg}   raw data {toString(data)}          response list {[hex(no).upper() for no in self.pmExpectedResponse]}")
-            elif data is not None and debugp == DebugLevel.CMD:
-                log.debug(f"[processReceivedMessage] Received {msg}   raw data {toString(data[1:4])}          response list {[hex(no).upper() for no in self.pmExpectedResponse]}")
-
-            # Handle the message
-            if self.packet_callback is not None:
-                self.packet_callback(data)
-
-        # Send an achnowledge back to the panel
-        def sendAck(data=bytearray(b"")):
-            """ Send ACK if packet is valid """
-
-            iscommand = data is not None and len(data) > 2 and data[1] >= 0x40   # command message types
-            panel_state_enrolled = not self.pmDownloadMode and self.PanelMode in [AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK_BRIDGED, AlPanelMode.POWERLINK]
-
-            # There are 2 types of acknowledge that we can send to the panel
-            #    Normal    : For a normal message
-            #    Powerlink : For when we are in powerlink mode
-            #if not isbase and panel_state_enrolled and ispm:
-            if iscommand and panel_state_enrolled:             # When in Std+, PL Mode and message type is at or above 0x40
-                message = pmSendMsg[Send.ACK_PLINK]
-            else:
-                message = pmSendMsg[Send.ACK]   # MSG_ACK
-            assert message is not None
-            e = VisonicListEntry(command=message)
-            self._add_message_to_send_queue(message = e, priority = MessagePriority.ACK)
+    def _process_crc_failure(self):
+        self._countChecksum(ChecksumVariant.FAILED)
+        msgType = self.ReceiveData[1]
+        if msgType != Receive.UNKNOWN_F1:  # ignore CRC errors on F1 message
+            self.pmCrcErrorCount += 1
+            if self.pmCrcErrorCount >= MAX_CRC_ERROR:
+                self.pmCrcErrorCount = 0
+                interval = self._getUTCTimeFunction() - self.pmFirstCRCErrorTime
+                if interval <= timedelta(seconds=CRC_ERROR_PERIOD):
+                    self._report_problem(AlTerminationType.CRC_ERROR)
+                self.pmFirstCRCErrorTime = self._getUTCTimeFunction()
+
+    def _process_received_message(self, ackneeded, debugp, data, msg):
+        msgType = data[1]
+        # log.debug(f"[data receiver] *** Received validated message {hexify(msgType)}   data {toString(data)}")
+        # Send an ACK if needed
+        if ackneeded:
+            # log.debug(f"[data receiver] Sending an ack as needed by last panel status message {hexify(msgType)}")
+            self._send_ack(data=data)
+
+        # Check response
+        if len(self.pmExpectedResponse) > 0:  # and msgType != 2:   # 2 is a simple acknowledge from the panel so ignore those
+            # We've sent something and are waiting for a reponse - this is it
+            if msgType in self.pmExpectedResponse:
+                self.pmExpectedResponse.remove(msgType)
+                self._wake_despatcher()
+
+        if data is not None and debugp == DebugLevel.FULL and isTraceEnabled(log):
+            log.debug(f"[processReceivedMessage] Received {msg}   raw data {toString(data)}          response list {[hex(no).upper() for no in self.pmExpectedResponse]}")
+        elif data is not None and debugp == DebugLevel.CMD and isTraceEnabled(log):
+            log.debug(f"[processReceivedMessage] Received {msg}   raw data {toString(data[1:4])}          response list {[hex(no).upper() for no in self.pmExpectedResponse]}")
+
+        # Handle the message
+        if self.packet_callback is not None:
+            self.packet_callback(data)
+
+    # Send an achnowledge back to the panel
+    def _send_ack(self, data=bytearray(b"")):
+        """ Send ACK if packet is valid """
+
+        iscommand = data is not None and len(data) > 2 and data[1] >= 0x40   # command message types
+        panel_state_enrolled = not self.pmDownloadMode and self.PanelMode in [AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK_BRIDGED, AlPanelMode.POWERLINK]
+
+        # There are 2 types of acknowledge that we can send to the panel
+        #    Normal    : For a normal message
+        #    Powerlink : For when we are in powerlink mode
+        if iscommand and panel_state_enrolled:             # When in Std+, PL Mode and message type is at or above 0x40
+            message = pmSendMsg[Send.ACK_PLINK]
+        else:
+            message = pmSendMsg[Send.ACK]   # MSG_ACK
+        assert message is not None
+        e = VisonicListEntry(command=message)
+        self._add_message_to_send_queue(message = e, priority = MessagePriority.ACK)
+
+    # Process a chunk of received bytes to build up the received PDUs (Protocol Description Unit)
+    #    The chunk is searched for Packet.HEADER and Packet.FOOTER and sliced using the lengths in pmReceiveMsg,
+    #    the only bytes looked at individually are those where a decision has to be made:
+    #        the message type, the F4 sub type, the variable length byte, the flexible footer window and the last byte of the PDU
+    #       self.pmIncomingPduLen is only used in these functions
+    #       self.pmCrcErrorCount is only used in these functions
+    #       self.pmCurrentPDU is only used in these functions
+    def _handle_received_data(self, data):
+        """Frame a chunk of incoming data in to PDUs."""
+        view = memoryview(data)                                              # slices of the view do not copy the data
+        pos = 0
+        end = len(data)
+        while pos < end:
+            if self.suspendAllOperations:
+                return
 
+            pdu_len = len(self.ReceiveData)                                  # Length of the received data so far
 
-        if self.suspendAllOperations:
-            return
+            # If this is the start of a new message,
+            #      then look for a PACKET_HEADER (message preamble) and throw away everything before it
+            if pdu_len == 0:
+                self.resetMessageData()
+                pos = data.find(Packet.HEADER, pos)
+                if pos < 0:
+                    return                                                   # we're trying to resync and there's no Packet.HEADER preamble byte in this chunk
+                self.ReceiveData.append(Packet.HEADER)
+                pos += 1
 
-        pdu_len = len(self.ReceiveData)                                      # Length of the received data so far
-        # If we're receiving a variable length message and we're at the position in the message where we get the variable part
-        if not isinstance(self.pmCurrentPDU, dict):
-            # log.debug(f"[data receiver] {self.pmCurrentPDU.isvariablelength} {pdu_len == self.pmCurrentPDU.varlenbytepos}")
-            if self.pmCurrentPDU.isvariablelength and pdu_len == self.pmCurrentPDU.varlenbytepos:
-                # Determine total length of the message by getting the variable part int(data) and adding it to the fixed length part
-                self.pmIncomingPduLen = self.pmCurrentPDU.length + int(data)
-                self.pmFlexibleLength = self.pmCurrentPDU.flexiblelength
-                #log.debug(f"[data receiver] Variable length Message Being Received  Message Type {hex(self.ReceiveData[1]).upper()}     pmIncomingPduLen {self.pmIncomingPduLen}   data var {int(data)}")
-
-        # If we were expecting a message of a particular length (i.e. self.pmIncomingPduLen > 0) and what we have is already greater then that length then dump the message and resynchronise.
-        if 0 < self.pmIncomingPduLen <= pdu_len:                             # waiting for pmIncomingPduLen bytes but got more and haven't been able to validate a PDU
-            log.info(f"[data receiver] PDU Too Large: Dumping current buffer {toString(self.ReceiveData)}    The next byte is {hex(data).upper()}")
-            pdu_len = 0                                                      # Reset the incoming data to 0 length
-            self.resetMessageData()
+            elif pdu_len == 1:
+                self._handle_received_message_type(data[pos])
+                pos += 1
+
+            elif pdu_len == 2 and isinstance(self.pmCurrentPDU, dict):
+                self._handle_received_message_subtype(data[pos])
+                pos += 1
+
+            elif self.pmIncomingPduLen == 0:
+                pos = self._handle_received_unknown_length(data, view, pos, end)
 
-        # If this is the start of a new message, 
-        #      then check to ensure it is a PACKET_HEADER (message preamble)
-        if pdu_len == 0:
-            self.resetMessageData()
-            if data == Packet.HEADER:  # preamble
-                self.ReceiveData.append(data)
-                #log.debug(f"[data receiver] Starting PDU {toString(self.ReceiveData)}")
-            # else we're trying to resync and walking through the bytes waiting for a Packet.HEADER preamble byte
-
-        elif pdu_len == 1:
-            #log.debug(f"[data receiver] Received message Type {data}")
-            if data != Receive.DUMMY_MESSAGE and data in pmReceiveMsg:       # Is it a message type that we know about
-                self.pmCurrentPDU = pmReceiveMsg[data]                       # set to current message type parameter settings for length, does it need an ack etc
-                self.ReceiveData.append(data)                                # Add on the message type to the buffer
-                if not isinstance(self.pmCurrentPDU, dict):
-                    self.pmIncomingPduLen = self.pmCurrentPDU.length         # for variable length messages this is the fixed length and will work with this algorithm until updated.
-                #log.debug(f"[data receiver] Building PDU: It's a message {hex(data).upper()}; pmIncomingPduLen = {self.pmIncomingPduLen}   variable = {self.pmCurrentPDU.isvariablelength}")
-            elif data == Receive.DUMMY_MESSAGE or data == 0xFD:              # Special case for pocket and PowerMaster 10
-                log.info(f"[data receiver] Received message type {hexify(data)} so not processing it")
-                self.resetMessageData()
-            else:
-                # build an unknown PDU. As the length is not known, leave self.pmIncomingPduLen set to 0 so we just look for Packet.FOOTER as the end of the PDU
-                self.pmCurrentPDU = pmReceiveMsg[0]                          # Set to unknown message structure to get settings, varlenbytepos is -1
-                self.pmIncomingPduLen = 0                                    # self.pmIncomingPduLen should already be set to 0 but just to make sure !!!
-                log.warning(f"[data receiver] Warning : Construction of incoming packet unknown - Message Type {hex(data).upper()}")
-                self.ReceiveData.append(data)                                # Add on the message type to the buffer
-
-        elif pdu_len == 2 and isinstance(self.pmCurrentPDU, dict):
-            #log.debug(f"[data receiver] Building PDU: It's a variable message {hex(self.ReceiveData[0]).upper()} {hex(data).upper()}")
-            if data in self.pmCurrentPDU:
-                self.pmCurrentPDU = self.pmCurrentPDU[data]
-                #log.debug("[data receiver] Building PDU:   doing it properly")
             else:
-                self.pmCurrentPDU = self.pmCurrentPDU[0]                     # All should have a 0 entry so use as default when unknown
-                log.debug(f"[data receiver] Building PDU: It's a variable message {hex(self.ReceiveData[0]).upper()} {hex(data).upper()} BUT it is unknown")
-            self.pmIncomingPduLen = self.pmCurrentPDU.length                 # for variable length messages this is the fixed length and will work with this algorithm until updated.
+                pos = self._handle_received_known_length(data, view, pos, end)
+
+    def _handle_received_message_type(self, data):
+        #log.debug(f"[data receiver] Received message Type {data}")
+        if data != Receive.DUMMY_MESSAGE and data in pmReceiveMsg:           # Is it a message type that we know about
+            self.pmCurrentPDU = pmReceiveMsg[data]                           # set to current message type parameter settings for length, does it need an ack etc
+            self.ReceiveData.append(data)                                    # Add on the message type to the buffer
+            if not isinstance(self.pmCurrentPDU, dict):
+                self.pmIncomingPduLen = self.pmCurrentPDU.length             # for variable length messages this is the fixed length and will work with this algorithm until updated.
+        elif data == Receive.DUMMY_MESSAGE or data == 0xFD:                  # Special case for pocket and PowerMaster 10
+            log.info(f"[data receiver] Received message type {hexify(data)} so not processing it")
+            self.resetMessageData()
+        else:
+            # build an unknown PDU. As the length is not known, leave self.pmIncomingPduLen set to 0 so we just look for Packet.FOOTER as the end of the PDU
+            self.pmCurrentPDU = pmReceiveMsg[0]                              # Set to unknown message structure to get settings, varlenbytepos is -1
+            self.pmIncomingPduLen = 0                                        # self.pmIncomingPduLen should already be set to 0 but just to make sure !!!
+            log.warning(f"[data receiver] Warning : Construction of incoming packet unknown - Message Type {hex(data).upper()}")
             self.ReceiveData.append(data)                                    # Add on the message type to the buffer
 
-        elif self.pmFlexibleLength > 0 and data == Packet.FOOTER and pdu_len + 1 < self.pmIncomingPduLen and (self.pmIncomingPduLen - pdu_len) < self.pmFlexibleLength:
+    def _handle_received_message_subtype(self, data):
+        #log.debug(f"[data receiver] Building PDU: It's a variable message {hex(self.ReceiveData[0]).upper()} {hex(data).upper()}")
+        if data in self.pmCurrentPDU:
+            self.pmCurrentPDU = self.pmCurrentPDU[data]
+        else:
+            self.pmCurrentPDU = self.pmCurrentPDU.get(0, pmReceiveMsg[0])    # Use the 0 entry as default when unknown, if there isn't one then treat it as an unknown message and wait for the Packet.FOOTER
+            if isTraceEnabled(log):
+                log.debug(f"[data receiver] Building PDU: It's a variable message {hex(self.ReceiveData[0]).upper()} {hex(data).upper()} BUT it is unknown")
+        self.pmIncomingPduLen = self.pmCurrentPDU.length                     # for variable length messages this is the fixed length and will work with this algorithm until updated.
+        self.ReceiveData.append(data)                                        # Add on the message type to the buffer
+
+    def _handle_received_unknown_length(self, data, view, pos, end) -> int:
+        """ The PDU length is not known so look for a Packet.FOOTER where the checksum is correct, return the new position in data """
+        # Bytes can be added to the buffer while it is no longer than PACKET_MAX_SIZE, include the byte after that in the search as it could be the footer
+        pdu_len = len(self.ReceiveData)
+        limit = pos + max(0, PACKET_MAX_SIZE + 1 - pdu_len) + 1
+        footer = data.find(Packet.FOOTER, pos, min(end, limit))
+        if footer >= 0:
+            self.ReceiveData += view[pos:footer + 1]
+            self._handle_received_pdu_end()
+            return footer + 1
+        if limit <= end:
+            # No footer and the buffer would exceed PACKET_MAX_SIZE
+            self.ReceiveData += view[pos:limit - 1]
+            if isTraceEnabled(log):
+                log.debug(f"[data receiver] Dumping Current PDU {toString(self.ReceiveData)}")
+            self.resetMessageData()
+            return limit
+        # log.debug(f"[data receiver] Current PDU {toString(self.ReceiveData)}   adding {toString(data[pos:end])}")
+        self.ReceiveData += view[pos:end]
+        return end
+
+    def _handle_received_known_length(self, data, view, pos, end) -> int:
+        """ The PDU length is known so add all bytes up to the next decision point in one go, return the new position in data """
+        pdu_len = len(self.ReceiveData)
+        pdu = self.pmCurrentPDU
+
+        # Work out how far the buffer can be extended before a byte needs to be examined
+        target = min(self.pmIncomingPduLen - 1, PACKET_MAX_SIZE + 1)         # the last byte of the PDU
+        if pdu.isvariablelength and pdu_len <= pdu.varlenbytepos:
+            target = min(target, pdu.varlenbytepos)                          # the variable length byte
+        if self.pmFlexibleLength > 0:
+            target = min(target, self.pmIncomingPduLen - self.pmFlexibleLength + 1)  # the start of the flexible footer window
+
+        if pdu_len < target:
+            n = min(target - pdu_len, end - pos)
+            self.ReceiveData += view[pos:pos + n]
+            return pos + n
+
+        databyte = data[pos]
+
+        # If we're receiving a variable length message and we're at the position in the message where we get the variable part
+        if pdu.isvariablelength and pdu_len == pdu.varlenbytepos:
+            # Determine total length of the message by getting the variable part int(databyte) and adding it to the fixed length part
+            self.pmIncomingPduLen = pdu.length + int(databyte)
+            self.pmFlexibleLength = pdu.flexiblelength
+            #log.debug(f"[data receiver] Variable length Message Being Received  Message Type {hex(self.ReceiveData[1]).upper()}     pmIncomingPduLen {self.pmIncomingPduLen}   data var {int(databyte)}")
+
+        # If we were expecting a message of a particular length and what we have is already greater then that length then dump the message and resynchronise.
+        if self.pmIncomingPduLen <= pdu_len:                                 # waiting for pmIncomingPduLen bytes but got more and haven't been able to validate a PDU
+            log.info(f"[data receiver] PDU Too Large: Dumping current buffer {toString(self.ReceiveData)}    The next byte is {hex(databyte).upper()}")
+            self.resetMessageData()
+            return pos                                                       # this byte is looked at again as the potential start of a new PDU
+
+        if self.pmFlexibleLength > 0 and databyte == Packet.FOOTER and pdu_len + 1 < self.pmIncomingPduLen and (self.pmIncomingPduLen - pdu_len) < self.pmFlexibleLength:
             # Only do this when:
             #       Looking for "flexible" messages
             #              At the time of writing this, only the 0x3F EPROM Download PDU does this with some PowerMaster panels
@@ -3140,71 +3503,76 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
             # Do not do this when (pdu_len + 1 == self.pmIncomingPduLen) i.e. the correct length
             # There is possibly a fault with some panels as they sometimes do not send the full EPROM data.
             #    - Rather than making it panel specific I decided to make this a generic capability
-            self.ReceiveData.append(data)  # add byte to the message buffer
-            if self.pmCurrentPDU.ignorechecksum or self._validatePDU(self.ReceiveData):  # if the message passes CRC checks then process it
+            self.ReceiveData.append(databyte)  # add byte to the message buffer
+            if pdu.ignorechecksum or self._validatePDU(self.ReceiveData):  # if the message passes CRC checks then process it
                 # We've got a validated message
-                log.debug(f"[data receiver] Validated PDU: Got Validated PDU type {hexify(int(self.ReceiveData[1]))}   data {toString(self.ReceiveData)}")
-                processReceivedMessage(ackneeded=self.pmCurrentPDU.ackneeded, debugp=self.pmCurrentPDU.debugprint, msg=self.pmCurrentPDU.msg, data=self.ReceiveData)
+                if isTraceEnabled(log):
+                    log.debug(f"[data receiver] Validated PDU: Got Validated PDU type {hexify(int(self.ReceiveData[1]))}   data {toString(self.ReceiveData)}")
+                self._process_received_message(ackneeded=pdu.ackneeded, debugp=pdu.debugprint, msg=pdu.msg, data=self.ReceiveData)
                 self.resetMessageData()
 
-        elif (self.pmIncomingPduLen == 0 and data == Packet.FOOTER) or (pdu_len + 1 == self.pmIncomingPduLen): # postamble (the +1 is to include the current data byte)
-            # (waiting for Packet.FOOTER and got it) OR (actual length == calculated expected length)
-            self.ReceiveData.append(data)  # add byte to the message buffer
-            #log.debug(f"[data receiver] Building PDU: Checking it {toString(self.ReceiveData)}")
-            msgType = self.ReceiveData[1]
-            if self.pmCurrentPDU.ignorechecksum or self._validatePDU(self.ReceiveData):
-                # We've got a validated message
-                #log.debug(f"[data receiver] Building PDU: Got Validated PDU type {hexify(int(msgType))}   data {toString(self.ReceiveData)}")
-                if self.pmCurrentPDU.varlenbytepos < 0:  # is it an unknown message i.e. varlenbytepos is -1
-                    log.warning(f"[data receiver] Received Valid but Unknown PDU {hex(msgType)}")
-                    sendAck()  # assume we need to send an ack for an unknown message
-                else:  # Process the received known message
-                    processReceivedMessage(ackneeded=self.pmCurrentPDU.ackneeded, debugp=self.pmCurrentPDU.debugprint, msg=self.pmCurrentPDU.msg, data=self.ReceiveData)
+        elif pdu_len + 1 == self.pmIncomingPduLen:                           # actual length == calculated expected length (the +1 is to include the current data byte)
+            self.ReceiveData.append(databyte)  # add byte to the message buffer
+            self._handle_received_pdu_end()
+
+        elif pdu_len <= PACKET_MAX_SIZE:
+            self.ReceiveData.append(databyte)
+
+        else:
+            if isTraceEnabled(log):
+                log.debug(f"[data receiver] Dumping Current PDU {toString(self.ReceiveData)}")
+            self.resetMessageData()
+
+        return pos + 1
+
+    def _handle_received_pdu_end(self):
+        """ ReceiveData holds a complete PDU (waiting for Packet.FOOTER and got it OR actual length == calculated expected length), validate it and process it """
+        #log.debug(f"[data receiver] Building PDU: Checking it {toString(self.ReceiveData)}")
+        msgType = self.ReceiveData[1]
+        if self.pmCurrentPDU.ignorechecksum or self._validatePDU(self.ReceiveData):
+            # We've got a validated message
+            #log.debug(f"[data receiver] Building PDU: Got Validated PDU type {hexify(int(msgType))}   data {toString(self.ReceiveData)}")
+            if self.pmCurrentPDU.varlenbytepos < 0:  # is it an unknown message i.e. varlenbytepos is -1
+                log.warning(f"[data receiver] Received Valid but Unknown PDU {hex(msgType)}")
+                self._send_ack()  # assume we need to send an ack for an unknown message
+            else:  # Process the received known message
+                self._process_received_message(ackneeded=self.pmCurrentPDU.ackneeded, debugp=self.pmCurrentPDU.debugprint, msg=self.pmCurrentPDU.msg, data=self.ReceiveData)
+            self.resetMessageData()
+        else:
+            # CRC check failed
+            a = self._calculatePDUChecksum(self.ReceiveData)  # this is just used to output to the log file
+            if len(self.ReceiveData) > PACKET_MAX_SIZE:
+                # If the length exceeds the max PDU size from the panel then stop and resync
+                log.warning(f"[data receiver] PDU with CRC error Message = {toString(self.ReceiveData)}   checksum calcs {hex(a).upper()}")
+                self._process_crc_failure()
                 self.resetMessageData()
-            else:
-                # CRC check failed
-                a = self._calculateCRC(self.ReceiveData[1:-2])[0]  # this is just used to output to the log file
-                if len(self.ReceiveData) > PACKET_MAX_SIZE:
-                    # If the length exceeds the max PDU size from the panel then stop and resync
-                    log.warning(f"[data receiver] PDU with CRC error Message = {toString(self.ReceiveData)}   checksum calcs {hex(a).upper()}")
-                    processCRCFailure()
-                    self.resetMessageData()
-                elif self.pmIncomingPduLen == 0:
-                    if msgType in pmReceiveMsg:
-                        # A known message with zero length and an incorrect checksum. Reset the message data and resync
-                        log.warning(f"[data receiver] Warning : Construction of zero length incoming packet validation failed - Message = {toString(self.ReceiveData)}  checksum calcs {hex(a).upper()}")
-
-                        # Send an ack even though the its an invalid packet to prevent the panel getting confused
-                        if self.pmCurrentPDU.ackneeded:
-                            # log.debug(f"[data receiver] Sending an ack as needed by last panel status message {hexify(msgType)}")
-                            sendAck(data=self.ReceiveData)
-
-                        # Dump the message and carry on
-                        processCRCFailure()
-                        self.resetMessageData()
-                    else:  # if msgType != Receive.UNKNOWN_F1:        # ignore CRC errors on F1 message
-                        # When self.pmIncomingPduLen == 0 then the message is unknown, the length is not known and we're waiting for a Packet.FOOTER where the checksum is correct, so carry on
-                        log.debug(f"[data receiver] Building PDU: Length is {len(self.ReceiveData)} bytes (apparently PDU not complete)  {toString(self.ReceiveData)}  checksum calcs {hex(a).upper()}")
-                else:
-                    # When here then the message is a known message type of the correct length but has failed it's validation
-                    log.warning(f"[data receiver] Warning : Construction of incoming packet validation failed - Message = {toString(self.ReceiveData)}   checksum calcs {hex(a).upper()}")
+            elif self.pmIncomingPduLen == 0:
+                if msgType in pmReceiveMsg:
+                    # A known message with zero length and an incorrect checksum. Reset the message data and resync
+                    log.warning(f"[data receiver] Warning : Construction of zero length incoming packet validation failed - Message = {toString(self.ReceiveData)}  checksum calcs {hex(a).upper()}")
 
                     # Send an ack even though the its an invalid packet to prevent the panel getting confused
                     if self.pmCurrentPDU.ackneeded:
-                        # log.debug(f"[data receiver] Sending an ack as needed by last panel status message {hexify(msgType)}")
-                        sendAck(data=self.ReceiveData)
+                        self._send_ack(data=self.ReceiveData)
 
                     # Dump the message and carry on
-                    processCRCFailure()
+                    self._process_crc_failure()
                     self.resetMessageData()
+                else:
+                    # When self.pmIncomingPduLen == 0 then the message is unknown, the length is not known and we're waiting for a Packet.FOOTER where the checksum is correct, so carry on
+                    if isTraceEnabled(log):
+                        log.debug(f"[data receiver] Building PDU: Length is {len(self.ReceiveData)} bytes (apparently PDU not complete)  {toString(self.ReceiveData)}  checksum calcs {hex(a).upper()}")
+            else:
+                # When here then the message is a known message type of the correct length but has failed it's validation
+                log.warning(f"[data receiver] Warning : Construction of incoming packet validation failed - Message = {toString(self.ReceiveData)}   checksum calcs {hex(a).upper()}")
 
-        elif pdu_len <= PACKET_MAX_SIZE:
-            # log.debug(f"[data receiver] Current PDU {toString(self.ReceiveData)}   adding {hexify(data)}")
-            self.ReceiveData.append(data)
-        else:
-            log.debug(f"[data receiver] Dumping Current PDU {toString(self.ReceiveData)}")
-            self.resetMessageData()
-        # log.debug(f"[data receiver] Building PDU {toString(self.ReceiveData)}")
+                # Send an ack even though the its an invalid packet to prevent the panel getting confused
+                if self.pmCurrentPDU.ackneeded:
+                    self._send_ack(data=self.ReceiveData)
+
+                # Dump the message and carry on
+                self._process_crc_failure()
+                self.resetMessageData()
 
     def _add_message_to_send_queue(self, message : Send | bytearray | VisonicListEntry, priority : MessagePriority = MessagePriority.NORMAL, options : list = [], response : list = None):
         if message is not None:
@@ -3220,6 +3588,10 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                 log.error(f"[_add_message_to_send_queue] Message not added as not a string and not a bytearray, it is of type {type(message)}")
                 return
 
+            if isinstance(message, Send) and message in pmSendMsgCoalesce and (f := self.SendQueue.find(e, priority)) is not None:
+                log.debug(f"[_add_message_to_send_queue] Not adding panel message at priority {priority} as it is already in the queue {f[0]} {str(f[1])}")
+                return
+
             if (f := self.SendQueue.find(e)) is not None:
                 if f[0] != MessagePriority.ACK:     # Multiple acknowledge messages are allowed
                     if priority == f[0]:
@@ -3227,7 +3599,7 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
                     else:
                         log.info(f"[_add_message_to_send_queue] Adding panel message at priority {priority} that is already in the queue {f[0]} {str(f[1])}   (the priority is different)")
 
-            # The SendQueue is set up as a PriorityQueue and needs a < function implementing in VisonicListEntry based on time, oldest < newest
+            # The SendQueue has a queue for each priority level, each one in the order they were added (oldest first)
             # By doing this it's like having three queues in one, an immediate queue, a high priority queue, and a low priority queue, each one date ordered oldest first
             # 0 < 1 so 0 is the high priority queue
             # So when get is called it looks at the high priority queue first and if nothing then looks at the low priority queue
@@ -3238,7 +3610,23 @@ class ProtocolBase(AlPanelInterfaceHelper, AlPanelDataStream, MyChecksumCalc):
             #    self.loop
             #)
             #log.info("Putting command on the queue")
-            self.loop.call_soon_threadsafe(self.SendQueue.put_nowait, (int(priority), e) )            
+            if self._on_event_loop():
+                # Put it straight on the queue so a burst of messages in the same tick can be coalesced
+                self._put_on_send_queue((int(priority), e))
+            else:
+                self.loop.call_soon_threadsafe(self._put_on_send_queue, (int(priority), e) )
+
+    def _on_event_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except (RuntimeError, AttributeError):
+            return False
+
+    def _put_on_send_queue(self, item):
+        # This must be called in the event loop
+        self.SendQueue.put_nowait(item)
+        self.Metrics.queued(item[0], self.SendQueue.depth(item[0]))
+        self._wake_despatcher()   # the despatcher may be waiting for a response, an immediate or ack pdu can still be sent
 
 # This class performs transactions based on messages (ProtocolBase is the raw data)
 class PacketHandling(ProtocolBase):
@@ -3276,6 +3664,20 @@ class PacketHandling(ProtocolBase):
         self.builderMessage = {}  # Temporary variable
         self.builderData = {}     # Temporary variable
 
+        # Sensor reconciliation, the settings received in a message only mark the sensors for update and they are updated once when the message has been processed
+        self.SensorUpdatePending = False    # Set when panel settings that the sensors use have been received
+        self.SensorInputs = {}              # The panel settings that each zone was last updated from, only zones that differ from this are updated again
+        self.SensorInputsCommon = None      # The panel settings common to all zones that they were last updated from
+        self.PanelDataPresent = None        # The last result of _check_panel_data_present as (fingerprint, (mandatory, optional))
+
+        # Zone bitmaps, only the zones whose bit has changed since the last bitmap of the same kind are passed to the sensor
+        self.ZoneBitmaps = {}               # The last bitmap of each kind keyed by (func, startzone, endzone)
+        self.ZoneSetters = {}               # The bound sensor function keyed by (zone, func)
+        self.ZoneMotionMask = None          # Bitmap of the zones that are motion or camera sensors
+
+        # The message decode table, built once per connection with the functions bound to this instance
+        self._decodeMessageFunction = { k : v._replace(func = getattr(self, v.func) if v.func is not None else None) for k, v in pmDecodeMessage.items() }
+
     def sensor_change_handler(self, sensor : SensorDevice, s : AlSensorCondition):
         log.debug("=============================================================== Sensor Change ===========================================================================")
         log.debug(f"     {self.PanelMode.name:<18}   {str(s):<11}   Sensor {sensor}")
@@ -3323,6 +3725,7 @@ class PacketHandling(ProtocolBase):
                 if self.onNewSensorHandler is not None:
                     self.onNewSensorHandler(False, self.SensorList[sensor])
                 del self.SensorList[sensor]
+                self._reset_zone_bitmaps()
                 return True
             return False
 
@@ -3405,6 +3808,7 @@ class PacketHandling(ProtocolBase):
                 self.SensorList[sensor].sid = device_type
                 self.SensorList[sensor].stype = sensorType
                 self.SensorList[sensor].model = sensorModel
+                self._reset_zone_bitmaps()
 
         if zoneChime is not None and 0 <= zoneChime <= 2:
             #log.debug(f"[_update_sensor]   Setting Zone Chime {zoneChime}  {pmZoneChimeKey[zoneChime]}")
@@ -3451,7 +3855,9 @@ class PacketHandling(ProtocolBase):
             self.SensorList[sensor].enrolled = enrolled
 
         if created_new_sensor:
+            self._reset_zone_bitmaps()
             self.SensorList[sensor].onChange(self.sensor_change_handler)
+            self.SensorList[sensor].setNotifier(self.notifyDeviceChange)
             if self.onNewSensorHandler is not None:
                 self.onNewSensorHandler(True, self.SensorList[sensor])
 
@@ -3501,7 +3907,7 @@ class PacketHandling(ProtocolBase):
 
             # Process siren settings
             setting = self.epromManager.lookupEprom(EPROM.SIRENS_MAS)
-            self.PanelSettings[PanelSetting.SirenEnrolled] = [setting[i][0] != 0 or setting[i][1] != 0 or setting[i][2] != 0 or setting[i][3] != 0 or setting[i][4] != 0 for i in range(0, min(len(setting), sirenCnt))]
+            self.PanelSettings[PanelSetting.SirenEnrolled] = PanelBits.fromlist([setting[i][0] != 0 or setting[i][1] != 0 or setting[i][2] != 0 or setting[i][3] != 0 or setting[i][4] != 0 for i in range(0, min(len(setting), sirenCnt))])
             logSetting("siren", setting)
             for i in range(0, min(len(setting), sirenCnt)):
                 #self.PanelSettings[PanelSetting.SirenEnrolled].append(v)
@@ -3527,7 +3933,7 @@ class PacketHandling(ProtocolBase):
             # Process siren settings
             setting = self.epromManager.lookupEprom(EPROM.SIRENS_MAX)
             logSetting("siren", setting)
-            self.PanelSettings[PanelSetting.SirenEnrolled] = [setting[i][0] != 0 or setting[i][1] != 0 or setting[i][2] != 0 for i in range(0, min(len(setting), sirenCnt))]
+            self.PanelSettings[PanelSetting.SirenEnrolled] = PanelBits.fromlist([setting[i][0] != 0 or setting[i][1] != 0 or setting[i][2] != 0 for i in range(0, min(len(setting), sirenCnt))])
             for i in range(0, min(len(setting), sirenCnt)):
                 if setting[i][0] != 0 or setting[i][1] != 0 or setting[i][2] != 0:
                     log.debug(f"[_process_EPROM_keypads_sirens] Found a PowerMax siren {i}")
@@ -3592,6 +3998,15 @@ class PacketHandling(ProtocolBase):
         return False
 
     def _check_panel_data_present(self, forceall, output_to_log) -> (set, set):
+        # The result only depends on the panel type and capabilities and on the length of each panel setting, 
+        #    so when none of these have changed then return the last result (unless it is forced or has to be logged)
+        fingerprint = None
+        if not forceall:
+            fingerprint = (self.PanelType, self.isPowerMaster(), self.ForceStandardMode, tuple(self.PanelCapabilities.items()),
+                           tuple(len(self.PanelSettings[s]) if s in self.PanelSettings else -1 for s in pmPanelDataPresentSettings))
+            if not output_to_log and self.PanelDataPresent is not None and self.PanelDataPresent[0] == fingerprint:
+                return self.PanelDataPresent[1]
+
         #zoneCnt = pmPanelConfig[CFG.WIRELESS][self.PanelType] + pmPanelConfig[CFG.WIRED][self.PanelType]
         zoneCnt = self._get_panel_capability(IndexName.ZONES)
         if self.isPowerMaster():
@@ -3640,6 +4055,8 @@ class PacketHandling(ProtocolBase):
                     mandatory.add(s)
                 else:
                     optional.add(s)
+        if fingerprint is not None:
+            self.PanelDataPresent = (fingerprint, (mandatory, optional))
         return (mandatory, optional)
 
     # _process_EPROM_settings
@@ -3751,7 +4168,7 @@ class PacketHandling(ProtocolBase):
                 self.PanelSettings[PanelSetting.ZoneTypes] = bytearray(zoneCnt)
                 self.PanelSettings[PanelSetting.DeviceTypesZones] = bytearray(zoneCnt)
                 self.PanelSettings[PanelSetting.ZoneChime] = bytearray(zoneCnt)
-                self.PanelSettings[PanelSetting.ZoneEnrolled] = [False] * zoneCnt  # bytearray(zoneCnt)
+                self.PanelSettings[PanelSetting.ZoneEnrolled] = PanelBits(0, zoneCnt)
                 motiondel = [0 for i in range(zoneCnt)]
 
                 for i in range(zoneCnt):
@@ -3795,7 +4212,7 @@ class PacketHandling(ProtocolBase):
 
     def _update_all_sirens(self) -> bool:
         count = self._get_panel_capability(IndexName.SIRENS)
-        se = self.PanelSettings.get(PanelSetting.SirenEnrolled, [])
+        se = self.PanelSettings.get(PanelSetting.SirenEnrolled, PanelBits())
         dt = self.PanelSettings.get(PanelSetting.DeviceTypesSirens, bytearray())
         log.debug(f"[Process Settings]     Updating sirens {se=}  {toString(dt)=}")
         for i in range(min(count, len(se), len(dt))):
@@ -3805,8 +4222,21 @@ class PacketHandling(ProtocolBase):
             #    log.debug(f"[Process Settings]       Siren {i} not enrolled")
         return False
 
+    def _get_sensor_inputs(self, sensor) -> tuple:
+        # The panel settings for this zone that _update_sensor uses, when these have not changed then there is nothing for _update_sensor to do
+        return ( self._get_panel_setting(PanelSetting.ZoneEnrolled,     sensor),
+                 self._get_panel_setting(PanelSetting.ZoneTypes,        sensor),
+                 self._get_panel_setting(PanelSetting.ZoneChime,        sensor),
+                 self._get_panel_setting(PanelSetting.DeviceTypesZones, sensor),
+                 self._get_panel_setting(PanelSetting.ZoneDelay,        sensor),
+                 self._get_panel_setting(PanelSetting.ZoneNames,        sensor),
+                 self._get_panel_setting(PanelSetting.PartitionData,    sensor),
+                 sensor in self.SensorList )
+
     def _update_all_sensors(self) -> bool:
 
+        self.SensorUpdatePending = False
+
         if self.PanelType is None:
             return False
 
@@ -3816,7 +4246,30 @@ class PacketHandling(ProtocolBase):
         # Do not create or update sensors until all mandatory data has been obtained
         if self.ForceStandardMode or len(mandatory) == 0:
             # Only when we have all EPROM or B0 Zone Data, or we're in Standard Emulation Mode
-            
+
+            # When a setting that all zones use has changed then update all of them
+            common = ( self.isPowerMaster(), self.ForceStandardMode, self.partitionsEnabled, self._get_panel_capability(IndexName.PARTITIONS),
+                       tuple(self.PanelSettings.get(PanelSetting.ZoneNameString, ())), tuple(self.PanelSettings.get(PanelSetting.ZoneCustNameStr, ())) )
+            if common != self.SensorInputsCommon:
+                self.SensorInputsCommon = common
+                self.SensorInputs = {}
+
+            #zoneCnt = pmPanelConfig[CFG.WIRELESS][self.PanelType] + pmPanelConfig[CFG.WIRED][self.PanelType]
+            zoneCnt = self._get_panel_capability(IndexName.ZONES)
+
+            # Only update the zones where the panel settings have changed
+            dirty = False
+            for i in range(zoneCnt):
+                inputs = self._get_sensor_inputs(i)
+                if self.SensorInputs.get(i) != inputs:
+                    dirty = True
+                    tmp = self._update_sensor( sensor = i )
+                    retval = retval or tmp
+                    self.SensorInputs[i] = self._get_sensor_inputs(i)
+
+            if not dirty and PANEL_STATUS.DOOR_ZONES in self.PanelStatus:
+                return retval   # Nothing has changed so the zone lists are the same
+
             # List of door/window sensors
             doorZoneStr = ""
             # List of motion sensors
@@ -3828,13 +4281,7 @@ class PacketHandling(ProtocolBase):
 
             log.debug("[Process Settings]   Processing Zone devices")
 
-            #zoneCnt = pmPanelConfig[CFG.WIRELESS][self.PanelType] + pmPanelConfig[CFG.WIRED][self.PanelType]
-            zoneCnt = self._get_panel_capability(IndexName.ZONES)
             for i in range(zoneCnt):
-
-                tmp = self._update_sensor( sensor = i )
-                retval = retval or tmp
-
                 if i in self.SensorList:
                     sensorType = self.SensorList[i].stype
                     if sensorType == AlSensorType.MAGNET or sensorType == AlSensorType.WIRED:
@@ -3874,6 +4321,7 @@ class PacketHandling(ProtocolBase):
             else:
                 self.SwitchList[0] = X10Device(type=x10Type, location=x10Location, id=0, enabled=True)
                 self.SwitchList[0].onChange(self.switch_change_handler)
+                self.SwitchList[0].setNotifier(self.notifyDeviceChange)
                 log.debug(f"[Process Settings]             Creating PGM Switch")
                 if self.onNewSwitchHandler is not None:
                     self.onNewSwitchHandler(True, self.SwitchList[0])  
@@ -3923,6 +4371,7 @@ class PacketHandling(ProtocolBase):
                         else:
                             self.SwitchList[i] = X10Device(type=x10Type, location=x10Location, id=i, enabled=True)
                             self.SwitchList[i].onChange(self.switch_change_handler)
+                            self.SwitchList[i].setNotifier(self.notifyDeviceChange)
                             if self.onNewSwitchHandler is not None:
                                 self.onNewSwitchHandler(True, self.SwitchList[i])                                    
 
@@ -3949,6 +4398,7 @@ class PacketHandling(ProtocolBase):
             if sf is not None:
                 log.debug(f"[_process_zone_event]               Processing event {eventType}  calling {pmZoneEventAction[eventType].func}({str(pmZoneEventAction[eventType].parameter)})")
                 sf(pmZoneEventAction[eventType].parameter)
+                self._reset_zone_bitmaps()
             self.SensorList[key].setProblem(pmZoneEventAction[eventType].problem)
         else:
             log.debug(f"[_process_zone_event]               Not processing zone {eventZone}   event {eventType}")
@@ -3966,19 +4416,44 @@ class PacketHandling(ProtocolBase):
                     log.debug(f"[_process_X10_state_update]      X10 device {i} changed to {self.SwitchList[i].state} ({status})")
                     self.SwitchList[i].pushChange()
 
+    def _reset_zone_bitmaps(self):
+        # A sensor has been created, removed or changed outside of _do_sensor_update so apply the next bitmap of each kind to all the zones
+        self.ZoneBitmaps = {}
+        self.ZoneSetters = {}
+        self.ZoneMotionMask = None
+
     def _do_sensor_update(self, data : bytearray, func : str, msg : str, startzone : int = 0, endzone : int = 32):
         endzone_min = min(endzone, self._get_panel_capability(IndexName.ZONES))
         no_of_bytes = (1 + ((endzone_min - startzone - 1) // 8)) if endzone_min > startzone else None
         if no_of_bytes is not None and len(data) >= no_of_bytes:
             val = self._makeInt(data)
-            log.debug(f"{msg} : {val:032b}       startzone={startzone}    {f'corrected endzone={endzone_min-1}' if endzone_min != endzone else f'endzone={endzone_min-1}'}      {no_of_bytes=}")
-            for i in range(startzone, endzone_min):
+            if isTraceEnabled(log):
+                log.debug(f"{msg} : {val:032b}       startzone={startzone}    {f'corrected endzone={endzone_min-1}' if endzone_min != endzone else f'endzone={endzone_min-1}'}      {no_of_bytes=}")
+            mask = (1 << (endzone_min - startzone)) - 1
+            key = (func, startzone, endzone_min)
+            last = self.ZoneBitmaps.get(key)
+            self.ZoneBitmaps[key] = val
+            # Only the zones whose bit has flipped, or all of them the first time
+            changed = mask if last is None else (val ^ last) & mask
+            if func == ZoneFunctions.DO_TRIGGER:
+                # A trigger is an event and not a state so every set bit is passed on
+                changed |= val & mask
+            elif func == ZoneFunctions.DO_STATUS:
+                # Motion and camera sensors do not keep the status so they are always updated
+                if self.ZoneMotionMask is None:
+                    self.ZoneMotionMask = sum(1 << i for i, s in self.SensorList.items() if s.getSensorType() in (AlSensorType.MOTION, AlSensorType.CAMERA))
+                changed |= (self.ZoneMotionMask >> startzone) & mask
+            while changed:
+                bit = changed & -changed
+                changed ^= bit
+                i = startzone + bit.bit_length() - 1
                 if i in self.SensorList:
-                    sf = getattr(self.SensorList[i], func)
-                    if sf is not None:
-                        sf(bool(val & (1 << (i-startzone)) != 0))
+                    if (sf := self.ZoneSetters.get((i, func))) is None:
+                        sf = self.ZoneSetters[(i, func)] = getattr(self.SensorList[i], func)
+                    sf(val & bit != 0)
         else:
-            log.debug(f"{msg} : len(data)={len(data)}  data={toString(data)} not processed    {startzone=}    {endzone=}   {endzone_min=}   {no_of_bytes=}")
+            if isTraceEnabled(log):
+                log.debug(f"{msg} : len(data)={len(data)}  data={toString(data)} not processed    {startzone=}    {endzone=}   {endzone_min=}   {no_of_bytes=}")
 
     # This function handles a received message packet and processes it
     def _processReceivedPacket(self, packet):
@@ -4003,7 +4478,8 @@ class PacketHandling(ProtocolBase):
         self.lastPacket = packet
 
         if self.lastPacketCounter == SAME_PACKET_ERROR:
-            log.debug(f"[_processReceivedPacket] Had the same packet for {SAME_PACKET_ERROR} times in a row : {toString(packet)}")
+            if isTraceEnabled(log):
+                log.debug(f"[_processReceivedPacket] Had the same packet for {SAME_PACKET_ERROR} times in a row : {toString(packet)}")
             self._report_problem(AlTerminationType.SAME_PACKET_ERROR)
             return
         #else:
@@ -4026,12 +4502,11 @@ class PacketHandling(ProtocolBase):
         #        log.debug("[_processReceivedPacket] Had a response timeout PROBLEM but received a data packet and entering Standard Mode")
         #        self.PanelMode = AlPanelMode.STANDARD
 
-        #processAB         = not self.pmDownloadMode and self.PanelMode in [AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK]
-        processAB         = not self.pmDownloadMode and not self.ForceStandardMode and self.PanelMode not in [AlPanelMode.POWERLINK_BRIDGED]
-        processNormalData = not self.pmDownloadMode and self.PanelMode in [AlPanelMode.STANDARD, AlPanelMode.MINIMAL_ONLY, AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK_BRIDGED, AlPanelMode.POWERLINK]
-        processB0         = self.EnableB0ReceiveProcessing or processNormalData
+        pushchange = self._handle_msgtype(packet)
 
-        pushchange = self._handle_msgtype(packet, processAB, processNormalData, processB0, self.pmDownloadMode)
+        if self.SensorUpdatePending:
+            # The message contained panel settings for the sensors, update them once for the whole message
+            self._update_all_sensors()
 
         if self.sendPanelEventData(): # sent at least 1 event so no need to send PUSH_CHANGE
             pushchange = False
@@ -4041,58 +4516,51 @@ class PacketHandling(ProtocolBase):
         elif oldPowerMaster != self.PowerMaster or pushchange:
             self.sendPanelUpdate(AlCondition.PUSH_CHANGE)
 
-    def _handle_msgtype(self, packet, processAB, processNormalData, processB0, processDownload) -> bool:
+        # Send the changes from this packet to the host, once
+        self.flushNotifications()
 
-        if len(packet) < 4:
-            return False
+        self._wake_sequencer(SequencerEvent.PacketReceived)
 
-        pushchange = False
-        log.debug(f"[_processReceivedPacket] {Receive(packet[1]).name if packet[1] in Receive else f'Unknown Message Type {packet[1]}' } {processAB=} {processB0=} {processNormalData=} {processDownload=}")
-
-        # Leave this here as it needs to be created dynamically to create the condition and message columns
-        DecodeMessage = collections.namedtuple('DecodeMessage', 'condition, func, pushchange, message')
-        _decodeMessageFunction = {
-            Receive.ACKNOWLEDGE       : DecodeMessage(                True , self._handle_msgtype02, False, None ),  # ACK
-            Receive.TIMEOUT           : DecodeMessage(                True , self._handle_msgtype06, False, None ),  # Timeout
-            Receive.UNKNOWN_07        : DecodeMessage(                True , self._handle_msgtype07, False, None ),  # No idea what this means
-            Receive.ACCESS_DENIED     : DecodeMessage(                True , self._handle_msgtype08, False, None ),  # Access Denied
-            Receive.LOOPBACK_TEST     : DecodeMessage(                True , self._handle_msgtype0B, False, None ),  # # LOOPBACK TEST, STOP (0x0B) IS THE FIRST COMMAND SENT TO THE PANEL WHEN THIS INTEGRATION STARTS
-            Receive.EXIT_DOWNLOAD     : DecodeMessage(                True , self._handle_msgtype0F, False, None ),  # Exit
-            Receive.UNKNOWN_1F        : DecodeMessage(               False , None                 , False, "WARNING: Message 0x1F is not decoded" ),
-            Receive.NOT_USED          : DecodeMessage(               False , None                 , False, "WARNING: Message 0x22 is not decoded, are you using an old Powermax Panel as this is not supported?" ),
-            Receive.DOWNLOAD_RETRY    : DecodeMessage(                True , self._handle_msgtype25, False, None ),  # Download retry
-            Receive.DOWNLOAD_SETTINGS : DecodeMessage(     processDownload , self._handle_msgtype33, False, f"Received 33 Message, we are in {self.PanelMode.name} mode (so I'm ignoring the message), data: {toString(packet)}"),  # Settings send after a MSGV_START
-            Receive.PANEL_INFO        : DecodeMessage(                True , self._handle_msgtype3C, False, None ),  # Message when start the download
-            Receive.DOWNLOAD_BLOCK    : DecodeMessage(     processDownload , self._handle_msgtype3F, False, f"Received 3F Message, we are in {self.PanelMode.name} mode (so I'm ignoring the message), data: {toString(packet)}"),  # Download information
-            Receive.EVENT_LOG         : DecodeMessage(   processNormalData , self._handle_msgtypeA0, False, None ),  # Event log
-            Receive.ZONE_NAMES        : DecodeMessage(   processNormalData , self._handle_msgtypeA3,  True, None ),  # Zone Names
-            Receive.STATUS_UPDATE     : DecodeMessage(   processNormalData , self._handle_msgtypeA5,  True, None ),  # Zone Information/Update
-            Receive.ZONE_TYPES        : DecodeMessage(   processNormalData , self._handle_msgtypeA6,  True, None ),  # Zone Types
-            Receive.PANEL_STATUS      : DecodeMessage(   processNormalData , self._handle_msgtypeA7,  True, None ),  # Panel Information/Update
-            Receive.POWERLINK         : DecodeMessage(           processAB , self._handle_msgtypeAB,  True, f"Received AB Message, we are in {self.PanelMode.name} mode and Download is set to {processDownload} (so I'm ignoring the message), data: {toString(packet)}"),  # 
-            Receive.X10_NAMES         : DecodeMessage(   processNormalData , self._handle_msgtypeAC,  True, None ),  # X10 Names
-            Receive.IMAGE_MGMT        : DecodeMessage(   processNormalData , self._handle_msgtypeAD,  True, None ),  # No idea what this means, it might ...  send it just before transferring F4 video data ?????
-            Receive.POWERMASTER       : DecodeMessage(           processB0 , self._handle_msgtypeB0,  True, None ),  # 
-            Receive.IMAGE_DATA        : DecodeMessage(   processNormalData , self._handle_msgtypeF4,  None, None ),  # F4 Message from a Powermaster, can't decode it yet but this will accept it and ignore it
-            Receive.REDIRECT          : DecodeMessage(                True , self._handle_msgtypeC0, False, None ),
-            Receive.PROXY_COMMAND     : DecodeMessage(                True , self._handle_msgtypeE1, False, None ),
-            Receive.PROXY             : DecodeMessage(                True , self._handle_msgtypeE0, False, None )
-        }
+    def _decode_condition(self, condition : DecodeCondition) -> bool:
+        # Evaluate the condition against the current panel mode and download flags, this is only done for the message type that has been received
+        if condition == DecodeCondition.ALWAYS:
+            return True
+        if condition == DecodeCondition.DOWNLOAD:
+            return self.pmDownloadMode
+        if condition == DecodeCondition.NORMAL_DATA:
+            return not self.pmDownloadMode and self.PanelMode in [AlPanelMode.STANDARD, AlPanelMode.MINIMAL_ONLY, AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK_BRIDGED, AlPanelMode.POWERLINK]
+        if condition == DecodeCondition.POWERLINK:
+            #return not self.pmDownloadMode and self.PanelMode in [AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK]
+            return not self.pmDownloadMode and not self.ForceStandardMode and self.PanelMode not in [AlPanelMode.POWERLINK_BRIDGED]
+        if condition == DecodeCondition.POWERMASTER:
+            return self.EnableB0ReceiveProcessing or self._decode_condition(DecodeCondition.NORMAL_DATA)
+        return False
+
+    def _handle_msgtype(self, packet, forceall : bool = False) -> bool:
 
         if len(packet) < 4:  # there must at least be a header, command, checksum and footer
-            log.warning(f"[_processReceivedPacket] Received invalid packet structure, not processing it {toString(packet)}")
-        elif packet[1] in _decodeMessageFunction:
-            dm = _decodeMessageFunction[packet[1]]
-            if dm.condition:
+            return False
+
+        pushchange = False
+        trace = isTraceEnabled(log)
+        if trace:
+            log.debug(f"[_processReceivedPacket] {Receive(packet[1]).name if packet[1] in Receive else f'Unknown Message Type {packet[1]}' } {self.PanelMode.name} {forceall=} download={self.pmDownloadMode}")
+
+        self.Metrics.received[packet[1]] += 1
+        if (dm := self._decodeMessageFunction.get(packet[1])) is not None:
+            if dm.func is not None and (forceall or self._decode_condition(dm.condition)):
+                start = time.perf_counter()
                 pushchange = dm.func(packet[2:-2])    # Use the return value if the function returns
+                self.Metrics.handled(packet[1], time.perf_counter() - start)
                 if pushchange is None:
                     pushchange = dm.pushchange        # If the function does not return a value then use the dm value
-            elif dm.message is not None:
-                log.debug(f"[_processReceivedPacket]     {dm.message}")
-            else:
+            elif dm.message is not None and trace:
+                log.debug(f"[_processReceivedPacket]     {dm.message.format(mode = self.PanelMode.name, download = self.pmDownloadMode, data = toString(packet))}")
+            elif trace:
                 log.debug(f"[_processReceivedPacket]     Received data not processed, data bytes are {toString(packet)}")
-        elif processNormalData or processAB:
-            log.debug(f"[_processReceivedPacket] Unknown/Unhandled packet type {toString(packet)}")
+        elif forceall or self._decode_condition(DecodeCondition.NORMAL_DATA) or self._decode_condition(DecodeCondition.POWERLINK):
+            if trace:
+                log.debug(f"[_processReceivedPacket] Unknown/Unhandled packet type {toString(packet)}")
         return pushchange
 
     def _handle_msgtype02(self, data):  # ACK
@@ -4119,12 +4587,14 @@ class PacketHandling(ProtocolBase):
 
     def _handle_msgtype07(self, data):
         """MsgType=07 - No idea what this means"""
-        log.debug(f"[handle_msgtype07] No idea what this message means, data = {toString(data)}")
+        if isTraceEnabled(log):
+            log.debug(f"[handle_msgtype07] No idea what this message means, data = {toString(data)}")
         self._check_unknown("    and its different", "handle_msgtype07", toString(data))
         # Assume that we need to send an ack
 
     def _handle_msgtype08(self, data):
-        log.debug(f"[handle_msgtype08] Access Denied  len {len(data)} data {toString(data)}")
+        if isTraceEnabled(log):
+            log.debug(f"[handle_msgtype08] Access Denied  len {len(data)} data {toString(data)}")
         self.AccessDeniedReceived = True
         self.AccessDeniedMessage = self.pmLastSentMessage
         if len(data) > 0 and data[0] == Packet.POWERLINK_TERMINAL:
@@ -4139,7 +4609,8 @@ class PacketHandling(ProtocolBase):
 
     def _handle_msgtype0F(self, data):  # EXIT
         """ Handle EXIT from the panel """
-        log.debug(f"[handle_msgtype0F] Exit    data is {toString(data)}")
+        if isTraceEnabled(log):
+            log.debug(f"[handle_msgtype0F] Exit    data is {toString(data)}")
         # This is sent by the panel during download to tell us to stop the download
         self.ExitReceived = True
 
@@ -4147,7 +4618,8 @@ class PacketHandling(ProtocolBase):
         """ MsgType=25 - Download retry. Unit is not ready to enter download mode """
         # Format: <MsgType> <?> <?> <delay in sec>
         iDelay = data[2]
-        log.debug(f"[handle_msgtype25] Download Retry, have to wait {iDelay} seconds     data is {toString(data)}")
+        if isTraceEnabled(log):
+            log.debug(f"[handle_msgtype25] Download Retry, have to wait {iDelay} seconds     data is {toString(data)}")
         self.DownloadRetryReceived = True
 
     def _handle_msgtype33(self, data):
@@ -4156,7 +4628,8 @@ class PacketHandling(ProtocolBase):
 
         if len(data) != 10:
             log.debug(f"[handle_msgtype33] ERROR: MSGTYPE=0x33 Expected len=14, Received={len(data)}")
-            log.debug(f"[handle_msgtype33]                            {toString(data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[handle_msgtype33]                            {toString(data)}")
             return
 
         # Data Format is: <index> <page> <8 data bytes>
@@ -4206,42 +4679,51 @@ class PacketHandling(ProtocolBase):
         #    # Write to memory map structure, but remove the first 3 bytes (index/page/length) from the data
         #    self.epromManager.saveEPROMSettings(iPage, iIndex, data[3:])
 
-        blocklen = self.epromManager.findLength(iPage, iIndex)
-
-        if iLength == len(data) - 3 and blocklen is not None and blocklen == iLength:
+        if not self.downloadScheduler.isOutstanding(iIndex, iPage):
+            # A late or duplicate block, the block that has been requested is still outstanding
+            log.debug(f"[handle_msgtype3F] Ignoring page {iPage} Index {iIndex} as it has not been requested")
+        elif iLength == len(data) - 3 and self.downloadScheduler.received(iIndex, iPage, iLength):
             # Write to memory map structure, but remove the first 3 bytes (index/page/length) from the data
             self.epromManager.saveEPROMSettings(iPage, iIndex, data[3:])
+            if self.epromManager.checkCache(self.PanelType, self.ModelType, self.isPowerMaster()):
+                # The sentinel blocks are the same as the EPROM cache so the other blocks have been loaded from it
+                self.downloadScheduler.update(self.epromManager.populatEPROMDownload(self.isPowerMaster()))
             # Are we finished yet?
-            if len(self.myDownloadList) > 0:
+            if not self.downloadScheduler.isComplete():
                 self.pmDownloadInProgress = True
-                self._add_message_to_send_queue(Send.DL, options=[ [1, self.myDownloadList.pop(0)] ])  # Read the next block of EPROM data
+                self._request_download_block()  # Read the next block of EPROM data
             else:
-                self.myDownloadList = self.epromManager.populatEPROMDownload(self.isPowerMaster())
-                if len(self.myDownloadList) == 0:
+                self.downloadScheduler.start(self.epromManager.populatEPROMDownload(self.isPowerMaster()))
+                if self.downloadScheduler.isComplete():
                     # This is the message to tell us that the panel has finished download mode, so we too should stop download mode
                     log.debug("[handle_msgtype3F] Download Complete")
                     self.pmDownloadInProgress = False
                     self.pmDownloadMode = False
                     self.pmDownloadComplete = True
+                    self._wake_sequencer(SequencerEvent.DownloadComplete)
                 else:
                     log.debug("[handle_msgtype3F] Download seemed to be complete but not got all EPROM data yet")
                     self.pmDownloadInProgress = True
-                    self._add_message_to_send_queue(Send.DL, options=[ [1, self.myDownloadList.pop(0)] ])  # Read the next block of EPROM data
-        elif self.pmDownloadRetryCount <= DOWNLOAD_PDU_RETRY_COUNT:
-            log.warning(f"[handle_msgtype3F] Invalid EPROM data block length (received: {len(data)-3}, Expected: {iLength},  blocklen: {blocklen}). Adding page {iPage} Index {iIndex} to the end of the list to redownload")
+                    self._request_download_block()  # Read the next block of EPROM data
+        elif self.downloadScheduler.failed(iIndex, iPage):
+            log.warning(f"[handle_msgtype3F] Invalid EPROM data block length (received: {len(data)-3}, Expected: {iLength}). Adding page {iPage} Index {iIndex} to the end of the list to redownload")
             log.warning(f"[handle_msgtype3F]                            {toString(data)}")
-            # Add it back on to the end to re-download it
-            self.myDownloadList.append(bytearray([iIndex, iPage, blocklen, 0]))
             # Increment counter
             self.pmDownloadRetryCount += 1
+            self._request_download_block()
         else:
-            log.warning(f"[handle_msgtype3F] Invalid EPROM data block length (received: {len(data)-3}, Expected: {iLength},  blocklen: {blocklen}). Giving up on page {iPage} Index {iIndex}")
-            self.myDownloadList = []
+            log.warning(f"[handle_msgtype3F] Invalid EPROM data block length (received: {len(data)-3}, Expected: {iLength}). Giving up on page {iPage} Index {iIndex}")
+            self.downloadScheduler.start([])
             log.debug("[handle_msgtype3F] Download InComplete")
             self.pmDownloadInProgress = False
             self.pmDownloadMode = False
             self.pmDownloadComplete = False
 
+    def _request_download_block(self):
+        """ Request the next EPROM block, the despatcher waits for the 3F before sending anything else """
+        if (block := self.downloadScheduler.next()) is not None:
+            self._add_message_to_send_queue(Send.DL, options=[ [1, block] ])
+
     def _handle_msgtypeA0(self, data):
         """ MsgType=A0 - Event Log """
         # From my Powermaster30  [handle_MsgTypeA0] Packet = 5f 02 01 64 58 5c 58 d3 41 51
@@ -4286,7 +4768,8 @@ class PacketHandling(ProtocolBase):
 
     def _handle_msgtypeA3(self, data):
         """ MsgType=A3 - Zone Names """
-        log.debug(f"[handle_MsgTypeA3] Packet = {toString(data)}")
+        if isTraceEnabled(log):
+            log.debug(f"[handle_MsgTypeA3] Packet = {toString(data)}")
         msgCnt = int(data[0])
         offset = 8 * (int(data[1]) - 1)
         log.debug(f"            Message Count is {msgCnt}   offset={offset}     self.PanelMode = {str(self.PanelMode)}")
@@ -4399,14 +4882,16 @@ class PacketHandling(ProtocolBase):
                 vala = self._makeInt(data[2:6])
                 valb = self._makeInt(data[6:10])
                 if vala != 0 or valb != 0:
-                    log.debug(f"[handle_msgtypeA5]      Unknown A5 Message: {toString(data)}")
+                    if isTraceEnabled(log):
+                        log.debug(f"[handle_msgtypeA5]      Unknown A5 Message: {toString(data)}")
                     # [handle_msgtypeA5]      Unknown A5 Message: 10 05 00 00 00 00 00 00 43 21 43        # 4321 is the 1st account number
                 self._check_unknown("[handle_msgtypeA5]              This A5 Message is different to last time", f"handle_msgtypeA5_{eventType}", toString(data))
         self.sendPanelUpdate(AlCondition.PUSH_CHANGE)  # push through a panel update to the HA Frontend
 
     def _handle_msgtypeA6(self, data):
         """ MsgType=A6 - Zone Types """
-        log.debug(f"[handle_MsgTypeA6] Packet = {toString(data)}")
+        if isTraceEnabled(log):
+            log.debug(f"[handle_MsgTypeA6] Packet = {toString(data)}")
         msgCnt = int(data[0])
         offset = 8 * (int(data[1]) - 1)
         log.debug(f"            Message Count is {msgCnt}   offset={offset}     self.PanelMode={str(self.PanelMode)}")
@@ -4470,7 +4955,8 @@ class PacketHandling(ProtocolBase):
         #    msgCnt = 1
 
         if msgCnt == 255 and (piu := self.getPartitionsInUse()) is not None:
-            log.debug(f"[handle_msgtypeA7]      A7 FF message (partitions), cannot rely on anything in this message for a powermaster with partitions, data={toString(data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[handle_msgtypeA7]      A7 FF message (partitions), cannot rely on anything in this message for a powermaster with partitions, data={toString(data)}")
             ## I have tried for many hours to make sense of this message data for my PowerMAster 30 panel with 2 partitons set up for testing.
             ## It looked like I had it with the code below and then it gave me ARMED_AWAY and DISARMED messages when they were not commanded, not even within the same hour.
             ## It looks like other messages that come in slow time e.g. low battery, maybe system reset, may be able to be processed.  Need to think about this more!
@@ -4528,7 +5014,8 @@ class PacketHandling(ProtocolBase):
             #  10:43:26.033 [handle_msgtypeA7]      A7 FF message (no partitions) contains,   unknown byte is 0x51  : data=ff 51 61 51 01 00 11 06 00 00 43
             #  10:45:04.772 [handle_msgtypeA7]      A7 FF message (no partitions) contains,   unknown byte is 0x53  : data=ff 53 00 61 00 ff 00 0c 00 00 43
 
-            log.debug(f"[handle_msgtypeA7]      A7 FF message (no partitions) contains,   unknown byte is {hex(int(data[1]))}  : data={toString(data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[handle_msgtypeA7]      A7 FF message (no partitions) contains,   unknown byte is {hex(int(data[1]))}  : data={toString(data)}")
             self._check_unknown("[handle_msgtypeA7]              A7 Message unknown byte is different to last time", f"handle_msgtypeA7_{msgCnt}", data[1])
 
             # The first entry always looks valid, so for now, process it          
@@ -4558,7 +5045,8 @@ class PacketHandling(ProtocolBase):
             #             03 00 2f 55 2f 1b 00 1c
             self._check_unknown("[handle_msgtypeA7]              A7 Message, count is different to last time", "handle_msgtypeA7_msgCnt", msgCnt)
             self._check_unknown("[handle_msgtypeA7]              A7 Message unknown byte is different to last time", "handle_msgtypeA7_norm", data[1])
-            log.debug(f"[handle_msgtypeA7]      A7 message (no partitions) contains {msgCnt} messages,   unknown byte is {hex(int(data[1]))}    data={toString(data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[handle_msgtypeA7]      A7 message (no partitions) contains {msgCnt} messages,   unknown byte is {hex(int(data[1]))}    data={toString(data)}")
             for i in range(msgCnt):
                 eventZone = int(data[2 + (2 * i)])
                 eventType = int(data[3 + (2 * i)])
@@ -4570,7 +5058,8 @@ class PacketHandling(ProtocolBase):
 
     def _handle_msgtypeAB(self, data) -> bool:  # PowerLink Message
         """ MsgType=AB - Panel Powerlink Messages """
-        log.debug(f"[handle_msgtypeAB]  data {toString(data)}")
+        if isTraceEnabled(log):
+            log.debug(f"[handle_msgtypeAB]  data {toString(data)}")
 
         # Restart the timer
         self._reset_watchdog_timeout()
@@ -4647,12 +5136,14 @@ class PacketHandling(ProtocolBase):
     # X10 Names (0xAC) I think
     def _handle_msgtypeAC(self, data):  # PowerLink Message
         """ MsgType=AC - ??? """
-        log.debug(f"[handle_msgtypeAC]  data {toString(data)}")
+        if isTraceEnabled(log):
+            log.debug(f"[handle_msgtypeAC]  data {toString(data)}")
         self._check_unknown("[handle_msgtypeAC]              AC Message is different to last time", f"handle_msgtypeAC", toString(data))
 
     def _handle_msgtypeAD(self, data):  # PowerLink Message
         """ MsgType=AD - Panel Powerlink Messages """
-        log.debug(f"[handle_msgtypeAD]  data {toString(data)}")
+        if isTraceEnabled(log):
+            log.debug(f"[handle_msgtypeAD]  data {toString(data)}")
         #if data[2] == 0x00: # the request was accepted by the panel
         #    if self.PanelMode in [AlPanelMode.POWERLINK, AlPanelMode.POWERLINK_BRIDGED]:
         #        log.debug(f"[handle_msgtypeAD]      adding Image FB to send list")
@@ -4730,6 +5221,7 @@ class PacketHandling(ProtocolBase):
                         self.SensorList[sensor].do_trigger(True)
                     else:
                         log.debug("[_decode_4B]          ***************************** Sensor Updated with an unused code *****************************")
+                    self._reset_zone_bitmaps()
                     log.debug(f"[_decode_4B]                  my time {self.SensorList[sensor].triggertime}    panels time {trigger}")
 
                     self.SensorList[sensor].statuslog = trigger
@@ -4774,46 +5266,46 @@ class PacketHandling(ProtocolBase):
         return data.hex(" ")
 
     def _update_panel_setting(self, key, length, datasize, data, display : bool = False, msg : str = "") -> bool:
+        before = self.PanelSettings[key]
+        bits = datasize == RAW.BITS.value and pmPanelSettingCodes[key].item is None
+
+        if bits:
+            # The bits are overwritten from the data in to a new PanelBits, so the change is an integer comparison with the one before
+            if not isinstance(before, PanelBits):
+                before = PanelBits.fromlist(before)
+            self.PanelSettings[key] = before.overwrite(data, length)
+            changed = self.PanelSettings[key] != before
+            if not isTraceEnabled(log):
+                return changed
 
-        s = pmPanelSettingCodes[key].tostring(self.PanelSettings[key])              # Save the data before the update
+        s = pmPanelSettingCodes[key].tostring(before)              # Save the data before the update
 
         if pmPanelSettingCodes[key].item is not None:
             if len(data) > pmPanelSettingCodes[key].item:
                 self.PanelSettings[key] = data[pmPanelSettingCodes[key].item]
-        elif datasize == RAW.BITS.value:
-            if len(self.PanelSettings[key]) < length * 8 :
-                # replace as current length less than the new data
-                #log.debug(f"[_update_panel_setting]              {key=}  replace")
-                self.PanelSettings[key] = []
-                for i in range(0, length):
-                    for j in range(0,8):  # 8 bits in a byte
-                        self.PanelSettings[key].append((data[i] & (1 << j)) != 0)
-            else:
-                # overwrite as current length is same as or more than new data
-                #log.debug(f"[_update_panel_setting]              {key=}  overwrite")
-                for i in range(0, length):
-                    for j in range(0,8):  # 8 bits in a byte
-                        self.PanelSettings[key][(i*8)+j] = (data[i] & (1 << j)) != 0
-        else:
+        elif not bits:
             self.PanelSettings[key] = data
 
         v = pmPanelSettingCodes[key].tostring(self.PanelSettings[key])
-        if display:
-            if len(s) > 100 or len(v) > 100:
-                if s != v:
-                    log.debug(f"[_update_panel_setting]              changed=True      {key=}   ({msg})")
-                    log.debug(f"[_update_panel_setting]                        replacing {s}")
-                    log.debug(f"[_update_panel_setting]                        with      {v}")
+        if not bits:
+            changed = s != v
+        if isTraceEnabled(log):
+            if display:
+                if len(s) > 100 or len(v) > 100:
+                    if changed:
+                        log.debug(f"[_update_panel_setting]              changed=True      {key=}   ({msg})")
+                        log.debug(f"[_update_panel_setting]                        replacing {s}")
+                        log.debug(f"[_update_panel_setting]                        with      {v}")
+                    else:
+                        log.debug(f"[_update_panel_setting]              changed=False     {key=}   ({msg})    data is {v}")
                 else:
-                    log.debug(f"[_update_panel_setting]              changed=False     {key=}   ({msg})    data is {v}")
+                    if changed:
+                        log.debug(f"[_update_panel_setting]              changed=True      {key=}   ({msg})    replacing {s}  with {v}")
+                    else:
+                        log.debug(f"[_update_panel_setting]              changed=False     {key=}   ({msg})    data is {v}")
             else:
-                if s != v:
-                    log.debug(f"[_update_panel_setting]              changed=True      {key=}   ({msg})    replacing {s}  with {v}")
-                else:
-                    log.debug(f"[_update_panel_setting]              changed=False     {key=}   ({msg})    data is {v}")
-        else:
-            log.debug(f"[_update_panel_setting]              changed={s != v}     {key=}   ({msg})")
-        return s != v
+                log.debug(f"[_update_panel_setting]              changed={changed}     {key=}   ({msg})")
+        return changed
 
     def _extract_35_data(self, ch):
         #03 35 0b ff 08 ff 06 00 00 01 00 00 00 02 43
@@ -4828,7 +5320,8 @@ class PacketHandling(ProtocolBase):
         dat = self._settings_data_type_formatter(datatype, data)
 
         if not OBFUS:
-            log.debug(f"[_extract_35_data]           dataContent={hex(dataContent)} panel setting   { DataType(datatype) }  {datalen=}    data={toString(data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[_extract_35_data]           dataContent={hex(dataContent)} panel setting   { DataType(datatype) }  {datalen=}    data={toString(data)}")
             log.debug(f"[_extract_35_data]               dat type = {type(dat)}   dat = {dat}")
 
         processed_data = False
@@ -4838,41 +5331,40 @@ class PacketHandling(ProtocolBase):
             if d.processinstandard or not self.ForceStandardMode: #  self.PanelMode in [AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK, AlPanelMode.POWERLINK_BRIDGED]:
                 if (d.length == 0 or ch.length == d.length) and datatype == d.datatype:
                     # Check the PanelSettings to see if there's one that refers to this dataContent
-                    for key in pmPanelSettingCodes:
-                        if pmPanelSettingCodes[key].PMasterB035Panel == dataContent:
-                            log.debug(f"[_extract_35_data]          Matched it {key=}")
-                            processed_data = True
-                            if d.sequence is not None and isinstance(d.sequence, list): # We have a list of sequence identifiers e.g. [1,2,255]
-                                # We should really check to make sure that we get all messages in the list but not yet --> TODO
-                                # I'm assuming that 0x35 messages (and 0x42 maybe) are the only messages with sequences
-                                if ch.datasize == RAW.BYTE.value and datatype == DataType.SPACE_PADDED_STRING_LIST:
-                                    if key not in self.builderData:
-                                        self.builderData[key] = []                    # empty the data list to concatenate the sequenced message data
-                                        self.builderMessage[key] = d.sequence         # get the list of sequences there needs to be to complete the data
-                                    if ch.sequence in self.builderMessage[key]:
-                                        self.builderData[key].extend(dat)    # Add actual data to the end of the list, we assume that the panel sends the data in order and we don't need to check the order
-                                        self.builderMessage[key].remove(ch.sequence)  # Got this sequence data so remove from the list
+                    if (key := pmPanelSettingB035.get(dataContent)) is not None:
+                        log.debug(f"[_extract_35_data]          Matched it {key=}")
+                        processed_data = True
+                        if d.sequence is not None and isinstance(d.sequence, list): # We have a list of sequence identifiers e.g. [1,2,255]
+                            # We should really check to make sure that we get all messages in the list but not yet --> TODO
+                            # I'm assuming that 0x35 messages (and 0x42 maybe) are the only messages with sequences
+                            if ch.datasize == RAW.BYTE.value and datatype == DataType.SPACE_PADDED_STRING_LIST:
+                                if key not in self.builderData:
+                                    self.builderData[key] = []                    # empty the data list to concatenate the sequenced message data
+                                    self.builderMessage[key] = d.sequence         # get the list of sequences there needs to be to complete the data
+                                if ch.sequence in self.builderMessage[key]:
+                                    self.builderData[key].extend(dat)    # Add actual data to the end of the list, we assume that the panel sends the data in order and we don't need to check the order
+                                    self.builderMessage[key].remove(ch.sequence)  # Got this sequence data so remove from the list
+                                else:
+                                    log.debug(f"[_extract_35_data]                        building {key}   Unexpected data sequence {ch.sequence} or sequence sent more than once")
+                                if ch.sequence == 255:
+                                    if len(self.builderMessage[key]) > 0:
+                                        # Received the sequence end but we are missing some of the sequence
+                                        log.debug(f"[_extract_35_data]                        building {key}   We have the sequence terminator message but we still have missing sequenced messages {self.builderMessage[key]}.  Dumping all message data and not using it")
                                     else:
-                                        log.debug(f"[_extract_35_data]                        building {key}   Unexpected data sequence {ch.sequence} or sequence sent more than once")
-                                    if ch.sequence == 255:
-                                        if len(self.builderMessage[key]) > 0:
-                                            # Received the sequence end but we are missing some of the sequence
-                                            log.debug(f"[_extract_35_data]                        building {key}   We have the sequence terminator message but we still have missing sequenced messages {self.builderMessage[key]}.  Dumping all message data and not using it")
-                                        else:
-                                            # copy across to use it
-                                            self.PanelSettings[key] = self.builderData[key]
-                                    if d.display:
-                                        log.debug(f"[_extract_35_data]                        building {key}   {self.builderData[key]}")
-                                    building = ch.sequence != 255
-                            else:
-                                self._update_panel_setting(key = key, length = ch.length, datasize = ch.datasize, data = data, display = d.display, msg = d.msg)
-                            break
+                                        # copy across to use it
+                                        self.PanelSettings[key] = self.builderData[key]
+                                if d.display:
+                                    log.debug(f"[_extract_35_data]                        building {key}   {self.builderData[key]}")
+                                building = ch.sequence != 255
+                        else:
+                            self._update_panel_setting(key = key, length = ch.length, datasize = ch.datasize, data = data, display = d.display, msg = d.msg)
                 else:
                     log.debug(f"[_extract_35_data]               {d.msg} data lengths differ: {ch.length=} {d.length=}   type: {datatype=} {d.datatype=}")
             else:
                 log.debug(f"[_extract_35_data]               {d.msg} not processed as this specifically prevented in standard mode")
         else:
-            log.debug(f"[_extract_35_data]               dataContent={hex(dataContent)} panel setting unknown      {datatype=}  {datalen=}    data={toString(ch.data[3:])}")
+            if isTraceEnabled(log):
+                log.debug(f"[_extract_35_data]               dataContent={hex(dataContent)} panel setting unknown      {datatype=}  {datalen=}    data={toString(ch.data[3:])}")
 
         if not building:
             # remove it from the dictionary
@@ -4970,27 +5462,27 @@ class PacketHandling(ProtocolBase):
             if d.processinstandard or not self.ForceStandardMode: #  self.PanelMode in [AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK, AlPanelMode.POWERLINK_BRIDGED]:
                 if (d.length == 0 or ch.length == d.length) and datatype == d.datatype:
                     # Check the PanelSettings to see if there's one that refers to this dataContent
-                    for key in pmPanelSettingCodes:
-                        if pmPanelSettingCodes[key].PMasterB042Panel == dataContent:
-                            log.debug(f"[_extract_42_data]          Matched it {key=}")
-                            processed_data = True
-                            if ch.datasize == RAW.BYTE.value and datatype == DataType.SPACE_PADDED_STRING_LIST:
-                                s = f"{self.PanelSettings[key]}"              # Save the data before the update
-                                log.debug(f"[_extract_42_data]               dat {dat}")
-                                if len(self.PanelSettings[key]) <= start_entry:
-                                    aa = [f"Undefined{i}" for i in range(len(self.PanelSettings[key]), start_entry+1)]
-                                    self.PanelSettings[key].extend(aa)
-                                self.PanelSettings[key][start_entry:start_entry+no_of_entries] = dat[0:no_of_entries]
-                                log.debug(f"[_extract_42_data]               before {s}")
-                                log.debug(f"[_extract_42_data]               after  {self.PanelSettings[key]}")
-                            else:                        
-                                self._update_panel_setting(key = key, length = ch.length, datasize = ch.datasize, data = ch.data[14:], display = d.display, msg = d.msg)
+                    if (key := pmPanelSettingB042.get(dataContent)) is not None:
+                        log.debug(f"[_extract_42_data]          Matched it {key=}")
+                        processed_data = True
+                        if ch.datasize == RAW.BYTE.value and datatype == DataType.SPACE_PADDED_STRING_LIST:
+                            s = f"{self.PanelSettings[key]}"              # Save the data before the update
+                            log.debug(f"[_extract_42_data]               dat {dat}")
+                            if len(self.PanelSettings[key]) <= start_entry:
+                                aa = [f"Undefined{i}" for i in range(len(self.PanelSettings[key]), start_entry+1)]
+                                self.PanelSettings[key].extend(aa)
+                            self.PanelSettings[key][start_entry:start_entry+no_of_entries] = dat[0:no_of_entries]
+                            log.debug(f"[_extract_42_data]               before {s}")
+                            log.debug(f"[_extract_42_data]               after  {self.PanelSettings[key]}")
+                        else:                        
+                            self._update_panel_setting(key = key, length = ch.length, datasize = ch.datasize, data = ch.data[14:], display = d.display, msg = d.msg)
                 else:
                     log.debug(f"[_extract_42_data]               {d.msg} data lengths differ: {ch.length=} {d.length=}   type: {datatype=} {d.datatype=}")
             else:
                 log.debug(f"[_extract_42_data]               {d.msg} not processed as this specifically prevented in standard mode")
         else:
-            log.debug(f"[_extract_42_data]               dataContent={hex(dataContent)} panel setting unknown      {datatype=}  data={toString(ch.data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[_extract_42_data]               dataContent={hex(dataContent)} panel setting unknown      {datatype=}  data={toString(ch.data)}")
 
         if dataContent == 0x000F and data_item_size == 2 and isinstance(dat,str) and len(dat) == 4: #
             processed_data = True
@@ -5146,12 +5638,12 @@ class PacketHandling(ProtocolBase):
                 #log.debug(f"[handle_msgtypeB0]          Got PANEL_SETTINGS_35 {ch}")
                 # I'm 100% sure this is correct
                 self._extract_35_data(ch)
-                self._update_all_sensors()
+                self.SensorUpdatePending = True
 
             case (B0SubType.PANEL_SETTINGS_42, _    , _    ,  _ ):
                 #log.debug(f"[handle_msgtypeB0]          Got PANEL_SETTINGS_42 {ch}")
                 self._extract_42_data(ch)
-                self._update_all_sensors()
+                self.SensorUpdatePending = True
 
             case (B0SubType.PANEL_STATE_1,    RAW.BYTE, IndexName.MIXED,  20):
                 # Panel state change, added just in case the panel abbreviates this message 
@@ -5206,7 +5698,8 @@ class PacketHandling(ProtocolBase):
                 for i in range(0, b):
                     d = ch.data[(i*ds)+1] * 256 + ch.data[i*ds]
                     t = IndexName(i).name if i in IndexName else f'Type {i}'
-                    log.debug(f"[handle_msgtypeB0]              Got {st.name:<20}   {t:<14}   {toString(ch.data[i*ds:(i+1)*ds])}    decimal {d:>4}")
+                    if isTraceEnabled(log):
+                        log.debug(f"[handle_msgtypeB0]              Got {st.name:<20}   {t:<14}   {toString(ch.data[i*ds:(i+1)*ds])}    decimal {d:>4}")
                     if i in IndexName:
                         if IndexName(i) == IndexName.ZONES:
                             self.PanelCapabilities[IndexName.ZONES] = pmPanelConfig[CFG.WIRELESS][self.PanelType] + pmPanelConfig[CFG.WIRED][self.PanelType]
@@ -5299,9 +5792,11 @@ class PacketHandling(ProtocolBase):
                     if ch.length % ds == 0:  # If it's exactly divisible
                         b = ch.length // ds
                         for i in range(0, b):
-                            log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20}   MIXED     Block {i:<3}   {toString(ch.data[i*ds:(i+1)*ds])}")
+                            if isTraceEnabled(log):
+                                log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20}   MIXED     Block {i:<3}   {toString(ch.data[i*ds:(i+1)*ds])}")
                 if b < 0:      
-                    log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20}  MIXED   data = {toString(ch.data)}")
+                    if isTraceEnabled(log):
+                        log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20}  MIXED   data = {toString(ch.data)}")
                 self._check_unknown("[handle_msgtypeB0]              B0 Message PANEL_STATE_4 is different to last time", f"handle_msgtypeB0_PANEL_STATE_4", toString(ch.data))
 
             case (B0SubType.ZONE_OPENCLOSE, RAW.BITS,  IndexName.ZONES,  _ ):
@@ -5344,11 +5839,11 @@ class PacketHandling(ProtocolBase):
 
             case (B0SubType.SENSOR_ENROL,   RAW.BITS,  IndexName.ZONES,  _ ):
                 # I'm 100% sure this is correct
-                self._update_all_sensors()
+                self.SensorUpdatePending = True
 
             case (B0SubType.SENSOR_ENROL,   RAW.BITS,  IndexName.SIRENS, _ ):
                 count = pmPanelConfig[CFG.SIRENS][self.PanelType]
-                self.PanelSettings[PanelSetting.SirenEnrolled] = [(ch.data[0] >> i) & 0x01 == 1 for i in range(min(ch.length * 8, count))]
+                self.PanelSettings[PanelSetting.SirenEnrolled] = PanelBits(ch.data[0], min(ch.length * 8, count))
                 self.PanelStatus[PANEL_STATUS.SIRENS] = stringFromRawBits(ch.data[0], min(ch.length * 8, count), "[_process_chunk] Found an Enrolled PowerMaster siren")
                 self._update_all_sirens()
 
@@ -5378,15 +5873,15 @@ class PacketHandling(ProtocolBase):
 
             case (B0SubType.DEVICE_TYPES,   RAW.BYTE, IndexName.ZONES,  _ ):
                 # I'm 100% sure this is correct
-                self._update_all_sensors()
+                self.SensorUpdatePending = True
 
             case (B0SubType.ZONE_NAMES,     RAW.BYTE, IndexName.ZONES,  _ ):
                 # I'm 100% sure this is correct
-                self._update_all_sensors()
+                self.SensorUpdatePending = True
 
             case (B0SubType.ZONE_TYPES,     RAW.BYTE, IndexName.ZONES,  _ ):
                 # I'm 100% sure this is correct
-                self._update_all_sensors()
+                self.SensorUpdatePending = True
 
             case (B0SubType.ZONE_TEMPERATURE, RAW.BYTE, IndexName.ZONES,  _ ):
                 #log.debug(f"[handle_msgtypeB0]          Got Zone Temperatures Chunk {ch}")
@@ -5480,7 +5975,8 @@ class PacketHandling(ProtocolBase):
                         for i in range(0, ch.length, datalength):
                             logentry = offset + (i // datalength)
                             self.B0_PANEL_LOG_Counter = max(self.B0_PANEL_LOG_Counter, logentry)
-                            log.debug(f"[handle_msgtypeB0]            Processing log entry {logentry}     data = {toString(ch.data[i:i+datalength])}")
+                            if isTraceEnabled(log):
+                                log.debug(f"[handle_msgtypeB0]            Processing log entry {logentry}     data = {toString(ch.data[i:i+datalength])}")
                             self._process_B0_log_entry(eventTotal, logentry + 1, ch.data[i:i+datalength])
                 elif seq_type == SEQUENCE.MAIN:
                     log.debug(f"[handle_msgtypeB0]          Got Main Event Log Chunk {ch}")
@@ -5490,7 +5986,8 @@ class PacketHandling(ProtocolBase):
                     if ch.length % datalength == 0:  # is the length divisible by datalength exactly
                         for i in range(0, ch.length, datalength):
                             logentry = offset + (i // datalength)
-                            log.debug(f"[handle_msgtypeB0]               Processing log entry {logentry}     data = {toString(ch.data[i:i+datalength])}")
+                            if isTraceEnabled(log):
+                                log.debug(f"[handle_msgtypeB0]               Processing log entry {logentry}     data = {toString(ch.data[i:i+datalength])}")
                             self._process_B0_log_entry(eventTotal, logentry + 1, ch.data[i:i+datalength])
 
             case (B0SubType.WIRELESS_DEV_MISSING,    RAW.BITS, IndexName.ZONES,  _ ):
@@ -5561,12 +6058,15 @@ class PacketHandling(ProtocolBase):
                             if ch.length % ds == 0:  # If it's exactly divisible
                                 b = ch.length // ds
                                 for i in range(0, b):
-                                    log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20}   MIXED     Block {i:<3}   {toString(ch.data[i*ds:(i+1)*ds])}")
+                                    if isTraceEnabled(log):
+                                        log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20}   MIXED     Block {i:<3}   {toString(ch.data[i*ds:(i+1)*ds])}")
                         if b < 0:      
-                            log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20}  MIXED   data = {toString(ch.data)}")
+                            if isTraceEnabled(log):
+                                log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20}  MIXED   data = {toString(ch.data)}")
                     else:
                         t = IndexName(ch.index).name if ch.index in IndexName else f"Unknown Index {ch.index}"
-                        log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20} {t:<18}  data = {toString(ch.data)}")
+                        if isTraceEnabled(log):
+                            log.debug(f"[handle_msgtypeB0]                     Got Unprocessed {st:<20} {t:<18}  data = {toString(ch.data)}")
                     #log.debug(f"@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@")
 
     # Only Powermasters send this message
@@ -5591,7 +6091,8 @@ class PacketHandling(ProtocolBase):
                         retval.append(c)
                     current = current + length + 4
                 if current-2 != overall_length:
-                    log.debug(f"[handle_msgtypeB0] ******************************************************** Message not fully processed for {msgType}   {overall_length - (current-2)} bytes not processed     control byte = {hexify(data[current])}    data is {toString(data[current:])} ********************************************************")
+                    if trace:
+                        log.debug(f"[handle_msgtypeB0] ******************************************************** Message not fully processed for {msgType}   {overall_length - (current-2)} bytes not processed     control byte = {hexify(data[current])}    data is {toString(data[current:])} ********************************************************")
                 if current-2 == overall_length:
                     return retval
             #else:
@@ -5599,9 +6100,9 @@ class PacketHandling(ProtocolBase):
             return []
 
         def isitchunky(chunks) -> bool:
-            if len(chunks) == 0:
+            if trace and len(chunks) == 0:
                 log.debug(f"[handle_msgtypeB0]                        ++++++++++++++++++++++++++++++++ Message not chunky +++++++++++++++++++++++++++++++++++++++++++++++++")                
-            else:
+            elif trace:
                 for chunk in chunks:
                     log.debug(f"[handle_msgtypeB0]                    Decoded Chunk {chunk}")
             return len(chunks) > 0
@@ -5615,6 +6116,7 @@ class PacketHandling(ProtocolBase):
         msgType = data[0]
         subType = data[1]
         msgLen  = data[2]
+        trace = isTraceEnabled(log)     # evaluate once, the debug messages below create strings from the whole message
         #seq_type = SEQUENCE(msgType) if msgType in SEQUENCE else SEQUENCE.UNDEFINED
         #
         #if seq_type == SEQUENCE.SUB:
@@ -5627,40 +6129,45 @@ class PacketHandling(ProtocolBase):
             # Do not process this B0 message as it seems to be incorrect
             return
 
+        self.Metrics.receivedB0[subType] += 1
+
         if subType in self.B0_Waiting:
             self.B0_Waiting.remove(subType)
 
-        if OBFUS:
+        if trace and OBFUS:
             log.debug(f"[handle_msgtypeB0] Received {self.PanelModel or "UNKNOWN_PANEL_MODEL"} message {hexify(msgType):>02}/{hexify(subType):>02} (len = {msgLen})    data = <OBFUSCATED>")
-        else:
+        elif trace:
             log.debug(f"[handle_msgtypeB0] Received {self.PanelModel or "UNKNOWN_PANEL_MODEL"} message {hexify(msgType):>02}/{hexify(subType):>02} (len = {msgLen})    data = {toString(data)}")
 
         msgInfo = pmSendMsgB0_reverseLookup[subType] if subType in pmSendMsgB0_reverseLookup else None
 
-        log.debug(f"[handle_msgtypeB0]    msgInfo: {'unknown' if msgInfo is None else msgInfo}")
+        if trace:
+            log.debug(f"[handle_msgtypeB0]    msgInfo: {'unknown' if msgInfo is None else msgInfo}")
 
         if msgInfo is None:
             # Message unknown
-            log.debug(f"[handle_msgtypeB0]             Message {notknown} {msgType=} {subType=} not known about, lets see if its chunky.   data = {toString(data)}")
+            if trace:
+                log.debug(f"[handle_msgtypeB0]             Message {notknown} {msgType=} {subType=} not known about, lets see if its chunky.   data = {toString(data)}")
             isitchunky(chunkme(data[:-2]))
 
         elif msgInfo.chunky:
             # Process the messages that we know about and we believe are chunked
             chunks = chunkme(data[:-2]) # exclude b0 counter and Packet.POWERLINK_TERMINAL at the end
             if len(chunks) == 0:
-                log.debug(f"[handle_msgtypeB0] ******************************************************** Message not chunky (we thought it was) and not processed further ************************************************* data = {toString(data)}")
+                if trace:
+                    log.debug(f"[handle_msgtypeB0] ******************************************************** Message not chunky (we thought it was) and not processed further ************************************************* data = {toString(data)}")
             else:
                 for chunk in chunks:
-                    log.debug(f"[handle_msgtypeB0]       {toString(data[:2])}     Decode Chunk: {chunk}")
+                    if trace:
+                        log.debug(f"[handle_msgtypeB0]       {toString(data[:2])}     Decode Chunk: {chunk}")
                     # Check the PanelSettings to see if there's one that refers to this message chunk
-                    for key, value in pmPanelSettingCodes.items():
-                        if value.PMasterB0Mess is not None and value.PMasterB0Mess in pmSendMsgB0 and pmSendMsgB0[value.PMasterB0Mess].data == subType and pmPanelSettingCodes[key].PMasterB0Index == chunk.index:
-                            self._update_panel_setting(key = key, length = chunk.length, datasize = chunk.datasize, data = chunk.data, display = True, msg = f"{subType=}")
-                            break
+                    if (key := pmPanelSettingB0Chunk.get((subType, chunk.index))) is not None:
+                        self._update_panel_setting(key = key, length = chunk.length, datasize = chunk.datasize, data = chunk.data, display = True, msg = f"{subType=}")
                     self._process_chunk(chunk)
 
         elif subType == pmSendMsgB0[B0SubType.INVALID_COMMAND].data: # msgInfo.data == "INVALID_COMMAND":  # 
-            log.debug(f"[handle_msgtypeB0]             The Panel Indicates a B0 INVALID_COMMAND sent to the panel:   data={toString(data)}")
+            if trace:
+                log.debug(f"[handle_msgtypeB0]             The Panel Indicates a B0 INVALID_COMMAND sent to the panel:   data={toString(data)}")
             if msgLen % 2 == 0: # msgLen is an even number
                 for i in range(0, msgLen, 2):
                     command = data[3+i]
@@ -5677,7 +6184,8 @@ class PacketHandling(ProtocolBase):
         elif subType == pmSendMsgB0[B0SubType.PANEL_STATE_2].data and msgLen == 15: #  I've only seen a message length of 15 with all 3 partitions populated
             # Panel State (without zone data and not chunky)
             # 03 0f 0f 07 08 0f 00 00 00 43 03 00 87 00 87 00 07 24 43
-            log.debug(f"[handle_msgtypeB0]             Panel State short (15) has been provided data={toString(data)}")
+            if trace:
+                log.debug(f"[handle_msgtypeB0]             Panel State short (15) has been provided data={toString(data)}")
             # Check to make sure its not chunky
             #isitchunky(chunkme(data[:-2]))
             # process the data
@@ -5687,22 +6195,26 @@ class PacketHandling(ProtocolBase):
                     # Repeat 2 bytes (11 to 12) for more than 1 partition.  Message length is 15 so we do not need to check the length.
                     self._updatePartitionStatus(i, data[offset + 11], data[offset + 12], 0, 0)
             else:
-                log.debug(f"[handle_msgtypeB0]             The message is chunky so I don't know how to process it:  data={toString(data)}")
+                if trace:
+                    log.debug(f"[handle_msgtypeB0]             The message is chunky so I don't know how to process it:  data={toString(data)}")
                 
         elif subType == pmSendMsgB0[B0SubType.PANEL_STATE_2].data and msgLen == 11: #  This is a test, I've only seen a message length of 15 with all 3 partitions populated
             # Panel State (without zone data and not chunky)
-            log.debug(f"[handle_msgtypeB0]             Panel State short (11) has been provided data={toString(data)}")
+            if trace:
+                log.debug(f"[handle_msgtypeB0]             Panel State short (11) has been provided data={toString(data)}")
             # Check to make sure its not chunky
             #isitchunky(chunkme(data[:-2]))
             if len(chunkme(data[:-2])) == 0:                   # Check to make sure its not chunky
                 # process the data, assume 1 partition 
                 self._updatePartitionStatus(0, data[11], data[12], 0, 0)
             else:
-                log.debug(f"[handle_msgtypeB0]             The message is chunky so I don't know how to process it:  data={toString(data)}")
+                if trace:
+                    log.debug(f"[handle_msgtypeB0]             The message is chunky so I don't know how to process it:  data={toString(data)}")
 
         else:
             # Process the messages that we know about and are not chunked
-            log.debug(f"[handle_msgtypeB0]             Message {msgInfo.data} known about but not chunky and not currently processed data={toString(data)}")
+            if trace:
+                log.debug(f"[handle_msgtypeB0]             Message {msgInfo.data} known about but not chunky and not currently processed data={toString(data)}")
             if msgInfo.data in self.B0_temp and self.B0_temp[msgInfo.data] != data:
                 log.debug(f"[handle_msgtypeB0]                 and its different to last time")
             self.B0_temp[msgInfo.data] = data
@@ -5732,9 +6244,49 @@ class PacketHandling(ProtocolBase):
         """ MsgType=E1 - Visonic Proxy Command Ringback """
         log.info(f"Integration has received a proxy command ringback, this indicates that Rx and Tx are incorrectly connected. Are you testing Ringback?")
 
+    def _eprom_cache_saved(self, filename : str, f : asyncio.Future):
+        """ Called in the event loop when saveCacheFile has finished """
+        try:
+            f.result()
+        except Exception as ex:
+            log.warning(f"[_sequencer] Unable to save the EPROM cache file {filename} : {ex}")
+            return
+        log.debug(f"[_sequencer] Saved the EPROM cache file {filename}")
+
+    def _image_checked(self, zone : int, t, buffer : bytearray, f : asyncio.Future):
+        """ Called in the event loop when checkImage has finished with an image from _handle_msgtypeF4 """
+        try:
+            width, height, total = f.result()
+        except Exception as ex:
+            log.debug(f"[handle_msgtypeF4]           Image check failed {ex}")
+            return
+
+        log.debug(f"[handle_msgtypeF4]           Got Image width {width}    height {height}      total = {total} = {hex(total)}")
+
+        if zone - 1 in self.SensorList and width <= 1024 and height <= 768:
+            log.debug(f"[handle_msgtypeF4]           Saving Image sensor {zone}   width {width}    height {height}")
+            self.SensorList[zone - 1].jpg_data = buffer
+            self.SensorList[zone - 1].jpg_time = t
+            self.SensorList[zone - 1].hasJPG = True
+            self.SensorList[zone - 1].pushChange(AlSensorCondition.CAMERA)
+            spill, remove = self.ImageHistory.add(zone, buffer, t)
+            if len(spill) > 0 or len(remove) > 0:
+                self.loop.create_task(self._image_files(spill, remove))
+
+    async def _image_files(self, spill : list, remove : list):
+        """ Move images from the image history to the spill directory, one at a time so the files are written and removed in order """
+        async with self.imageFileLock:
+            written = await self.loop.run_in_executor(None, self.ImageHistory.writeFiles, spill, remove)
+            if len(orphans := self.ImageHistory.spilled(written)) > 0:
+                await self.loop.run_in_executor(None, self.ImageHistory.writeFiles, [], orphans)
+
+    async def _image_clear_files(self):
+        """ Remove the images from last time from the spill directory, before any are written """
+        async with self.imageFileLock:
+            await self.loop.run_in_executor(None, self.ImageHistory.clearFiles)
+
     def _handle_msgtypeF4(self, data) -> bool:  # Static JPG Image
         """ MsgType=F4 - Static JPG Image """
-        from PIL import Image, UnidentifiedImageError                        
 
         #log.debug(f"[handle_msgtypeF4]  data {toString(data)}")
 
@@ -5749,7 +6301,8 @@ class PacketHandling(ProtocolBase):
         pushchange = False
 
         if msgtype == 0x03:     # JPG Header 
-            log.debug(f"[handle_msgtypeF4]  data {toString(data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[handle_msgtypeF4]  data {toString(data)}")
             pushchange = True
             zone = (10 * int(data[5] // 16)) + (data[5] % 16)         # the // does integer floor division so always rounds down
             unique_id = data[6]
@@ -5847,25 +6400,13 @@ class PacketHandling(ProtocolBase):
                         # get time now to store image
                         t = self._getTimeFunction()
 
-                        # Assume a corrupt image
-                        width = 100000
-                        height = 100000
-                        # Get the width and height of the image. I assume that if PIL can't load the image then it is corrupt.
+                        # Get the width and height of the image in an executor, the panel keeps sending data while the image is checked.
                         #   The panel always sends 11 images:
                         #           images 1 to 10 are sent first in order and are always good, 
                         #           image 11 (marked as image 0) is always corrupt and has lots more bytes than the other 10
                         #                I wonder if its a different image/video format --> But the PIL library doesn't recognise it
-                        try:
-                            img = Image.open(io.BytesIO(buffer))
-                            width, height = img.size
-                        except Exception as ex:
-                            log.debug(f"Image Exception {ex}")
-
-                        total = 0
-                        for b in buffer:
-                            total = total + b
-
-                        log.debug(f"[handle_msgtypeF4]           Got Image width {width}    height {height}      total = {total} = {hex(total)}")
+                        f = self.loop.run_in_executor(None, checkImage, buffer)
+                        f.add_done_callback(partial(self._image_checked, zone, t, buffer))
 
                         # Got all the data so write it out to a jpg file
                         #fn = f"camera_image_z{zone:0>2}_{t.day:0>2}{t.month:0>2}{t.year - 2000:0>2}_{t.hour:0>2}{t.minute:0>2}{t.second:0>2}.jpg"
@@ -5873,13 +6414,6 @@ class PacketHandling(ProtocolBase):
                         #    f1.write(buffer)
                         #    f1.close()
 
-                        if zone - 1 in self.SensorList and width <= 1024 and height <= 768:
-                            log.debug(f"[handle_msgtypeF4]           Saving Image sensor {zone}   width {width}    height {height}")
-                            self.SensorList[zone - 1].jpg_data = buffer
-                            self.SensorList[zone - 1].jpg_time = t
-                            self.SensorList[zone - 1].hasJPG = True
-                            self.SensorList[zone - 1].pushChange(AlSensorCondition.CAMERA)
-
                         if self.PanelMode in [AlPanelMode.POWERLINK, AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK_BRIDGED, AlPanelMode.STANDARD]:
                             # Assume that we are managing the interaction/protocol with the panel
                             fnoseA = 0x15
@@ -5904,12 +6438,14 @@ class PacketHandling(ProtocolBase):
                     self.ImageManager.terminateImage()
 
         elif msgtype == 0x01:
-            log.debug(f"[handle_msgtypeF4]  data {toString(data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[handle_msgtypeF4]  data {toString(data)}")
             log.debug(f"[handle_msgtypeF4]           Message Type not processed")
             pushchange = True
 
         else:
-            log.debug(f"[handle_msgtypeF4]  not seen data {toString(data)}")
+            if isTraceEnabled(log):
+                log.debug(f"[handle_msgtypeF4]  not seen data {toString(data)}")
             log.debug(f"[handle_msgtypeF4]           Message Type not processed")
 
         return pushchange
@@ -5951,7 +6487,12 @@ class VisonicProtocol(PacketHandling):
     ############################################################################################################
 
     def handle_msgtype_testing(self, packet) -> bool:
-        return self._handle_msgtype(packet, True, True, True, True)   # process any of the messages for testing
+        retval = self._handle_msgtype(packet, forceall = True)   # process any of the messages for testing
+        # As _processReceivedPacket, update the sensors once and send the changes from this packet to the host
+        if self.SensorUpdatePending:
+            self._update_all_sensors()
+        self.flushNotifications()
+        return retval
 
     def getEventData(self, partition : int | None) -> dict:
         if partition is not None:
@@ -5991,6 +6532,10 @@ class VisonicProtocol(PacketHandling):
                     TEXT_DL_MESSAGE_RETRIES: self.pmDownloadRetryCount                                       # This is for individual 3F download failures
                 }
             self.merge(a,c)
+            if include_extended_status:
+                self.merge(a, { TEXT_CRC_FAILURES: self.getChecksumCounters().get(ChecksumVariant.FAILED.name.lower(), 0),
+                                TEXT_RESENDS: self.Metrics.resends,
+                                TEXT_RESPONSE_TIMEOUTS: self.Metrics.responseTimeouts })
             if include_extended_status and len(self.PanelStatus) > 0:
                 # r = {**d, **self.PanelStatus}
                 self.merge(a, self.PanelStatus)
@@ -6085,6 +6630,21 @@ class VisonicProtocol(PacketHandling):
             return AlCommandStatus.FAIL_X10_PROBLEM
         return AlCommandStatus.FAIL_DOWNLOAD_IN_PROGRESS
 
+    def getImageFrameCount(self, device : int) -> int:
+        return self.ImageHistory.getFrameCount(device)
+
+    def getImageFrame(self, device : int, index : int) -> ImageFrame | None:
+        return self.ImageHistory.getFrame(device, index)
+
+    def getProtocolMetrics(self) -> dict:
+        m = self.Metrics.asDict(name = lambda k : Receive(k).name.lower() if k in Receive else hex(k),
+                                nameB0 = lambda k : pmSendMsgB0_reverseLookup[k].data.name.lower() if k in pmSendMsgB0_reverseLookup else hex(k),
+                                namePriority = lambda k : MessagePriority(k).name.lower() )
+        m["checksum"] = self.getChecksumCounters()
+        m["watchdog timeouts"] = self.WatchdogTimeoutCounter
+        m["queue depth"] = { MessagePriority(k).name.lower() : v for k, v in self.SendQueue.depths().items() }
+        return m
+
     def getJPG(self, device : int, count : int) -> AlCommandStatus:
         if not self.pmDownloadMode:
             if self.PanelMode in [AlPanelMode.STANDARD, AlPanelMode.STANDARD_PLUS, AlPanelMode.POWERLINK_BRIDGED, AlPanelMode.POWERLINK]: